@@ -8,32 +8,182 @@ Published under the MIT License (https://opensource.org/licenses/mit-license.php
 """
 import uno
 from com.sun.star.awt.MessageBoxType import MESSAGEBOX, INFOBOX, WARNINGBOX, ERRORBOX, QUERYBOX
-from com.sun.star.beans import PropertyValue
 import os
+import socket
+import threading
 from configparser import ConfigParser
 from ywcnvlib.uno_tools import *
 from ywcnvlib.yw_cnv_uno import YwCnvUno
+from ywcnvlib.yw7_file_cnv import Yw7FileCnv
 from ywcnvlib.ui_uno import UiUno
+from ywcnvlib.manuscript_formatter import ManuscriptFormatter
+from ywcnvlib.phase_timer import PHASE_TIMER
+from ywcnvlib.service_client import ServiceClient
+from ywcnvlib.service_client import SKIPPED
 
 from pywriter.pywriter_globals import *
-from pywriter.odt_w.odt_w_proof import OdtWProof
-from pywriter.odt_w.odt_w_manuscript import OdtWManuscript
-from pywriter.odt_w.odt_w_scenedesc import OdtWSceneDesc
-from pywriter.odt_w.odt_w_chapterdesc import OdtWChapterDesc
-from pywriter.odt_w.odt_w_partdesc import OdtWPartDesc
-from pywriter.odt_w.odt_w_brief_synopsis import OdtWBriefSynopsis
-from pywriter.odt_w.odt_w_characters import OdtWCharacters
-from pywriter.odt_w.odt_w_items import OdtWItems
-from pywriter.odt_w.odt_w_locations import OdtWLocations
-from pywriter.odt_w.odt_w_xref import OdtWXref
-from pywriter.odt_w.odt_w_notes import OdtWNotes
-from pywriter.odt_w.odt_w_todo import OdtWTodo
-from pywriter.ods_w.ods_w_charlist import OdsWCharList
-from pywriter.ods_w.ods_w_loclist import OdsWLocList
-from pywriter.ods_w.ods_w_itemlist import OdsWItemList
-from pywriter.ods_w.ods_w_scenelist import OdsWSceneList
 
 INI_FILE = 'openyw.ini'
+CACHE_DIR = 'openyw_cache'
+TIMING_LOG = 'openyw_timing.log'
+TIMING_VARIABLE = 'YW_CNV_TIMING'
+# Environment variable for the phase timing: "1", or the log file path.
+TEXT_DOCUMENT = 'com.sun.star.text.TextDocument'
+# Service of the documents that are exported through the document model.
+CONFIG_LOCK = threading.Lock()
+# Serializes the configuration file updates of concurrently running macros.
+SERVICE_TIMEOUT = 60.0
+# Seconds to wait for the conversion service, unless configured otherwise.
+
+
+def set_up_timing():
+    """Enable the phase timing, if requested by environment variable or configuration file.
+
+    The environment variable takes precedence. It is either "1", or the log file path.
+    In the configuration file, the TIMING section may have the options
+    "enabled" (yes/no), "log_file" (path), and "trace_memory" (yes/no).
+    """
+    scriptLocation = os.path.dirname(__file__)
+    logPath = uno.fileUrlToSystemPath(f'{scriptLocation}/{TIMING_LOG}')
+    traceMemory = True
+    setting = os.environ.get(TIMING_VARIABLE, '')
+    if not setting:
+        config = ConfigParser()
+        try:
+            config.read(uno.fileUrlToSystemPath(f'{scriptLocation}/{INI_FILE}'))
+            setting = config.get('TIMING', 'enabled', fallback='')
+            logPath = config.get('TIMING', 'log_file', fallback=logPath)
+            traceMemory = config.getboolean('TIMING', 'trace_memory', fallback=True)
+        except:
+            pass
+    if setting.lower() in ('', '0', 'no', 'false', 'off'):
+        PHASE_TIMER.disable()
+        return
+
+    if not setting.lower() in ('1', 'yes', 'true', 'on'):
+        logPath = setting
+    PHASE_TIMER.enable(logPath, traceMemory)
+
+
+def update_config(section, option, value):
+    """Set an option in the configuration file, keeping the other settings.
+
+    Positional arguments:
+        section -- str: section name.
+        option -- str: option name.
+        value -- str: option value.
+
+    The file is read again and replaced as a whole, so a concurrent reader never sees it half written.
+    """
+    scriptLocation = os.path.dirname(__file__)
+    iniFile = uno.fileUrlToSystemPath(f'{scriptLocation}/{INI_FILE}')
+    with CONFIG_LOCK:
+        config = ConfigParser()
+        try:
+            config.read(iniFile)
+        except:
+            pass
+        if not config.has_section(section):
+            config.add_section(section)
+        config.set(section, option, value)
+        with open(f'{iniFile}.tmp', 'w') as f:
+            config.write(f)
+        os.replace(f'{iniFile}.tmp', iniFile)
+
+
+def get_service_client():
+    """Return a client for the conversion service, or None if no service is configured.
+
+    In the configuration file, the SERVICE section may have the options
+    "address": the socket file path, or "localhost:<port>",
+    and "timeout": seconds to wait for a connection and a response.
+    The timeout is always finite, so a hung service cannot block the office application.
+    """
+    scriptLocation = os.path.dirname(__file__)
+    config = ConfigParser()
+    try:
+        config.read(uno.fileUrlToSystemPath(f'{scriptLocation}/{INI_FILE}'))
+        address = config.get('SERVICE', 'address', fallback='')
+        timeout = config.getfloat('SERVICE', 'timeout', fallback=SERVICE_TIMEOUT)
+    except:
+        return None
+
+    if not address:
+        return None
+
+    if not timeout > 0:
+        timeout = SERVICE_TIMEOUT
+    return ServiceClient(address, timeout)
+
+
+def convert(sourcePath, suffix, title, document=None):
+    """Convert a file, and return True on success.
+
+    Positional arguments:
+        sourcePath -- str: absolute path of the source file.
+        suffix -- str: export target file suffix, or None for importing into the yWriter project.
+        title -- str: title of the message boxes.
+
+    Optional arguments:
+        document -- Writer document model to import instead of the saved file.
+
+    Have the conversion service convert the file, if configured and running,
+    and if the document model has no unsaved changes.
+    Otherwise, convert within the office application.
+    As with the conversion within the office application,
+    the user is asked before an existing target file is overwritten.
+    If the service does not respond in time, report an error instead of converting
+    within the office application, because the service may still write the target file.
+    """
+    ui = UiUno(title)
+    client = get_service_client()
+    if client is not None and (document is None or not document.isModified()):
+        try:
+            result = submit_conversion(client, sourcePath, suffix, False)
+            if result['status'] == SKIPPED:
+                if not ui.ask_yes_no(_('Overwrite existing file "{}"?').format(norm_path(result['target']))):
+                    ui.set_info_how(f'!{_("Action canceled by user")}.')
+                    return False
+
+                result = submit_conversion(client, sourcePath, suffix, True)
+        except socket.timeout:
+            ui.set_info_how(f'!{_("Conversion service does not respond")}.')
+            return False
+
+        except OSError:
+            pass
+        except Exception as ex:
+            ui.set_info_how(f'!{str(ex)}')
+            return False
+
+        else:
+            for warning in result['warnings']:
+                ui.show_warning(warning)
+            if suffix is None or result['message'].startswith('!'):
+                ui.set_info_how(result['message'])
+            return not result['message'].startswith('!')
+
+    set_up_timing()
+    converter = YwCnvUno()
+    converter.ui = ui
+    converter.document = document
+    converter.run(sourcePath, suffix=suffix)
+    return converter.newFile is not None
+
+
+def submit_conversion(client, sourcePath, suffix, overwrite):
+    """Have the conversion service convert a file, and return the result.
+
+    Positional arguments:
+        client -- ServiceClient instance.
+        sourcePath -- str: absolute path of the source file.
+        suffix -- str: export target file suffix, or None for importing into the yWriter project.
+        overwrite -- bool: if True, overwrite an existing target file; otherwise skip it.
+    """
+    if suffix is None:
+        return client.import_document(sourcePath, overwrite)
+
+    return client.export_project(sourcePath, [suffix], overwrite)[0]
 
 
 def open_yw7(suffix, newExt):
@@ -63,6 +213,7 @@ def open_yw7(suffix, newExt):
     # Get the last opened yWriter project (if existing).
     scriptLocation = os.path.dirname(__file__)
     inifile = uno.fileUrlToSystemPath(f'{scriptLocation}/{INI_FILE}')
+    Yw7FileCnv.novelCache.cacheDir = uno.fileUrlToSystemPath(f'{scriptLocation}/{CACHE_DIR}')
     config = ConfigParser()
     lastFile = None
     try:
@@ -91,11 +242,7 @@ def open_yw7(suffix, newExt):
     dirName, fileName = os.path.split(newFile)
     thisDir = uno.fileUrlToSystemPath(f'{dirName}/')
     lockFile = f'{thisDir}.~lock.{fileName}#'
-    if not config.has_section('FILES'):
-        config.add_section('FILES')
-    config.set('FILES', 'yw_last_open', uno.fileUrlToSystemPath(ywFile))
-    with open(inifile, 'w') as f:
-        config.write(f)
+    update_config('FILES', 'yw_last_open', uno.fileUrlToSystemPath(ywFile))
 
     # Check if import file is already open in LibreOffice:
     if os.path.isfile(lockFile):
@@ -103,13 +250,7 @@ def open_yw7(suffix, newExt):
         return
 
     # Open yWriter project and convert data.
-    workdir = os.path.dirname(sourcePath)
-    os.chdir(workdir)
-    converter = YwCnvUno()
-    converter.ui = UiUno(_('Import from yWriter'))
-    kwargs = {'suffix': suffix}
-    converter.run(sourcePath, **kwargs)
-    if converter.newFile:
+    if convert(sourcePath, suffix, _('Import from yWriter')):
         desktop = XSCRIPTCONTEXT.getDesktop()
         desktop.loadComponentFromURL(newFile, "_blank", 0, ())
 
@@ -121,100 +262,127 @@ def import_yw():
 
 def proof_yw():
     '''Import scenes from yWriter 7 to a Writer document.'''
-    open_yw7(OdtWProof.SUFFIX, OdtWProof.EXTENSION)
+    open_yw7('_proof', '.odt')
 
 
 def get_brf_synopsis():
     '''Import chapter and scene titles from yWriter 7 to a Writer document.'''
-    open_yw7(OdtWBriefSynopsis.SUFFIX, OdtWBriefSynopsis.EXTENSION)
+    open_yw7('_brf_synopsis', '.odt')
 
 
 def get_manuscript():
     '''Import scenes from yWriter 7 to a Writer document.'''
-    open_yw7(OdtWManuscript.SUFFIX, OdtWManuscript.EXTENSION)
+    open_yw7('_manuscript', '.odt')
 
 
 def get_partdesc():
     '''Import part descriptions from yWriter 7 to a Writer document.'''
-    open_yw7(OdtWPartDesc.SUFFIX, OdtWPartDesc.EXTENSION)
+    open_yw7('_parts', '.odt')
 
 
 def get_chapterdesc():
     '''Import chapter descriptions from yWriter 7 to a Writer document.'''
-    open_yw7(OdtWChapterDesc.SUFFIX, OdtWChapterDesc.EXTENSION)
+    open_yw7('_chapters', '.odt')
 
 
 def get_scenedesc():
     '''Import scene descriptions from yWriter 7 to a Writer document.'''
-    open_yw7(OdtWSceneDesc.SUFFIX, OdtWSceneDesc.EXTENSION)
+    open_yw7('_scenes', '.odt')
 
 
 def get_chardesc():
     '''Import character descriptions from yWriter 7 to a Writer document.'''
-    open_yw7(OdtWCharacters.SUFFIX, OdtWCharacters.EXTENSION)
+    open_yw7('_characters', '.odt')
 
 
 def get_locdesc():
     '''Import location descriptions from yWriter 7 to a Writer document.'''
-    open_yw7(OdtWLocations.SUFFIX, OdtWLocations.EXTENSION)
+    open_yw7('_locations', '.odt')
 
 
 def get_itemdesc():
     '''Import item descriptions from yWriter 7 to a Writer document.'''
-    open_yw7(OdtWItems.SUFFIX, OdtWItems.EXTENSION)
+    open_yw7('_items', '.odt')
 
 
 def get_xref():
     '''Generate cross references from yWriter 7 to a Writer document.'''
-    open_yw7(OdtWXref.SUFFIX, OdtWXref.EXTENSION)
+    open_yw7('_xref', '.odt')
 
 
 def get_scenelist():
     '''Import a scene list from yWriter 7 to a Calc document.'''
-    open_yw7(OdsWSceneList.SUFFIX, OdsWSceneList.EXTENSION)
+    open_yw7('_scenelist', '.ods')
+
+
+def get_statistics():
+    '''Generate project statistics from yWriter 7 to a Calc document.'''
+    open_yw7('_statistics', '.ods')
 
 
 def get_notes():
     '''Import Notes chapters from yWriter 7 to a Writer document.'''
-    open_yw7(OdtWNotes.SUFFIX, OdtWNotes.EXTENSION)
+    open_yw7('_notes', '.odt')
 
 
 def get_todo():
     '''Import Todo chapters from yWriter 7 to a Writer document.'''
-    open_yw7(OdtWTodo.SUFFIX, OdtWTodo.EXTENSION)
+    open_yw7('_todo', '.odt')
 
 
 def get_charlist():
     '''Import a character list from yWriter 7 to a Calc document.'''
-    open_yw7(OdsWCharList.SUFFIX, OdsWCharList.EXTENSION)
+    open_yw7('_charlist', '.ods')
 
 
 def get_loclist():
     '''Import a location list from yWriter 7 to a Calc document.'''
-    open_yw7(OdsWLocList.SUFFIX, OdsWLocList.EXTENSION)
+    open_yw7('_loclist', '.ods')
 
 
 def get_itemlist():
     '''Import an item list from yWriter 7 to a Calc document.'''
-    open_yw7(OdsWItemList.SUFFIX, OdsWItemList.EXTENSION)
+    open_yw7('_itemlist', '.ods')
+
+
+def save_before_export():
+    """Return True, if text documents are to be saved before exporting.
+
+    In the configuration file, the EXPORT section may have the option
+    "save_document" (yes/no). Default is no.
+    """
+    scriptLocation = os.path.dirname(__file__)
+    config = ConfigParser()
+    try:
+        config.read(uno.fileUrlToSystemPath(f'{scriptLocation}/{INI_FILE}'))
+        return config.getboolean('EXPORT', 'save_document', fallback=False)
+
+    except:
+        return False
 
 
 def export_yw():
-    """Save the document if modified, and call the converter script."""
-    thisComponent = XSCRIPTCONTEXT.getDocument()
+    """Call the converter script, reading a text document directly from the office application.
 
+    Text documents are saved first only if modified and requested by the configuration file.
+    Other documents are saved if modified, because they are read from the file.
+    Documents without unsaved changes can be imported by the conversion service.
+    """
+    thisComponent = XSCRIPTCONTEXT.getDocument()
+    isTextDocument = thisComponent.supportsService(TEXT_DOCUMENT)
+    document = None
+    if isTextDocument:
+        document = thisComponent
     if thisComponent.isModified():
-        thisComponent.store()
+        if not isTextDocument or save_before_export():
+            thisComponent.store()
 
     documentUrl = thisComponent.getURL()
     if documentUrl:
         sourcePath = uno.fileUrlToSystemPath(documentUrl)
     else:
         sourcePath = ''
-    converter = YwCnvUno()
-    converter.ui = UiUno(_('Export to yWriter'))
-    kwargs = {'suffix': None}
-    converter.run(sourcePath, **kwargs)
+    convert(sourcePath, None, _('Export to yWriter'), document)
 
 
 def to_blank_lines():
@@ -223,165 +391,7 @@ def to_blank_lines():
     Replace the three-lines "* * *" scene dividers with single blank lines. 
     Change the style of the scene-dividing paragraphs from  _Heading 4_  to  _Heading 5_.
     """
-    pStyles = XSCRIPTCONTEXT.getDocument().StyleFamilies.getByName('ParagraphStyles')
-    # pStyles = ThisComponent.StyleFamilies.getByName("ParagraphStyles")
-    document = XSCRIPTCONTEXT.getDocument().CurrentController.Frame
-    # document   = ThisComponent.CurrentController.Frame
-    ctx = XSCRIPTCONTEXT.getComponentContext()
-    smgr = ctx.getServiceManager()
-    dispatcher = smgr.createInstanceWithContext(
-        "com.sun.star.frame.DispatchHelper", ctx)
-    # dispatcher = createUnoService("com.sun.star.frame.DispatchHelper")
-
-    #--- Save cursor position.
-    oViewCursor = XSCRIPTCONTEXT.getDocument().CurrentController.getViewCursor()
-    # oViewCursor = ThisComponent.CurrentController().getViewCursor()
-    oSaveCursor = XSCRIPTCONTEXT.getDocument().Text.createTextCursorByRange(oViewCursor)
-    # oSaveCursor = ThisComponent.Text.createTextCursorByRange(oViewCursor)
-
-    #--- Replace "Heading 4" by "Heading 5".
-    args1 = []
-    for __ in range(19):
-        args1.append(PropertyValue())
-    # dim args1(18) as new com.sun.star.beans.PropertyValue
-    args1[0].Name = "SearchItem.StyleFamily"
-    args1[0].Value = 2
-    args1[1].Name = "SearchItem.CellType"
-    args1[1].Value = 0
-    args1[2].Name = "SearchItem.RowDirection"
-    args1[2].Value = True
-    args1[3].Name = "SearchItem.AllTables"
-    args1[3].Value = False
-    args1[4].Name = "SearchItem.Backward"
-    args1[4].Value = False
-    args1[5].Name = "SearchItem.Pattern"
-    args1[5].Value = True
-    args1[6].Name = "SearchItem.Content"
-    args1[6].Value = False
-    args1[7].Name = "SearchItem.AsianOptions"
-    args1[7].Value = False
-    args1[8].Name = "SearchItem.AlgorithmType"
-    args1[8].Value = 0
-    args1[9].Name = "SearchItem.SearchFlags"
-    args1[9].Value = 65536
-    args1[10].Name = "SearchItem.SearchString"
-    args1[10].Value = pStyles.getByName("Heading 4").DisplayName
-    args1[11].Name = "SearchItem.ReplaceString"
-    args1[11].Value = pStyles.getByName("Heading 5").DisplayName
-    args1[12].Name = "SearchItem.Locale"
-    args1[12].Value = 255
-    args1[13].Name = "SearchItem.ChangedChars"
-    args1[13].Value = 2
-    args1[14].Name = "SearchItem.DeletedChars"
-    args1[14].Value = 2
-    args1[15].Name = "SearchItem.InsertedChars"
-    args1[15].Value = 2
-    args1[16].Name = "SearchItem.TransliterateFlags"
-    args1[16].Value = 1280
-    args1[17].Name = "SearchItem.Command"
-    args1[17].Value = 3
-    args1[18].Name = "Quiet"
-    args1[18].Value = True
-    dispatcher.executeDispatch(document, ".uno:ExecuteSearch", "", 0, args1)
-
-    #--- Find all "Heading 5".
-    args2 = []
-    for __ in range(19):
-        args2.append(PropertyValue())
-    # dim args2(18) as new com.sun.star.beans.PropertyValue
-    args2[0].Name = "SearchItem.StyleFamily"
-    args2[0].Value = 2
-    args2[1].Name = "SearchItem.CellType"
-    args2[1].Value = 0
-    args2[2].Name = "SearchItem.RowDirection"
-    args2[2].Value = True
-    args2[3].Name = "SearchItem.AllTables"
-    args2[3].Value = False
-    args2[4].Name = "SearchItem.Backward"
-    args2[4].Value = False
-    args2[5].Name = "SearchItem.Pattern"
-    args2[5].Value = True
-    args2[6].Name = "SearchItem.Content"
-    args2[6].Value = False
-    args2[7].Name = "SearchItem.AsianOptions"
-    args2[7].Value = False
-    args2[8].Name = "SearchItem.AlgorithmType"
-    args2[8].Value = 0
-    args2[9].Name = "SearchItem.SearchFlags"
-    args2[9].Value = 65536
-    args2[10].Name = "SearchItem.SearchString"
-    args2[10].Value = pStyles.getByName("Heading 5").DisplayName
-    args2[11].Name = "SearchItem.ReplaceString"
-    args2[11].Value = pStyles.getByName("Heading 5").DisplayName
-    args2[12].Name = "SearchItem.Locale"
-    args2[12].Value = 255
-    args2[13].Name = "SearchItem.ChangedChars"
-    args2[13].Value = 2
-    args2[14].Name = "SearchItem.DeletedChars"
-    args2[14].Value = 2
-    args2[15].Name = "SearchItem.InsertedChars"
-    args2[15].Value = 2
-    args2[16].Name = "SearchItem.TransliterateFlags"
-    args2[16].Value = 1280
-    args2[17].Name = "SearchItem.Command"
-    args2[17].Value = 1
-    args2[18].Name = "Quiet"
-    args2[18].Value = True
-    dispatcher.executeDispatch(document, ".uno:ExecuteSearch", "", 0, args2)
-
-    #--- Delete scene dividers.
-    args3 = []
-    for __ in range(19):
-        args3.append(PropertyValue())
-    # dim args3(18) as new com.sun.star.beans.PropertyValue
-    args3[0].Name = "SearchItem.StyleFamily"
-    args3[0].Value = 2
-    args3[1].Name = "SearchItem.CellType"
-    args3[1].Value = 0
-    args3[2].Name = "SearchItem.RowDirection"
-    args3[2].Value = True
-    args3[3].Name = "SearchItem.AllTables"
-    args3[3].Value = False
-    args3[4].Name = "SearchItem.Backward"
-    args3[4].Value = False
-    args3[5].Name = "SearchItem.Pattern"
-    args3[5].Value = False
-    args3[6].Name = "SearchItem.Content"
-    args3[6].Value = False
-    args3[7].Name = "SearchItem.AsianOptions"
-    args3[7].Value = False
-    args3[8].Name = "SearchItem.AlgorithmType"
-    args3[8].Value = 0
-    args3[9].Name = "SearchItem.SearchFlags"
-    args3[9].Value = 71680
-    args3[10].Name = "SearchItem.SearchString"
-    args3[10].Value = "* * *"
-    args3[11].Name = "SearchItem.ReplaceString"
-    args3[11].Value = ""
-    args3[12].Name = "SearchItem.Locale"
-    args3[12].Value = 255
-    args3[13].Name = "SearchItem.ChangedChars"
-    args3[13].Value = 2
-    args3[14].Name = "SearchItem.DeletedChars"
-    args3[14].Value = 2
-    args3[15].Name = "SearchItem.InsertedChars"
-    args3[15].Value = 2
-    args3[16].Name = "SearchItem.TransliterateFlags"
-    args3[16].Value = 1280
-    args3[17].Name = "SearchItem.Command"
-    args3[17].Value = 3
-    args3[18].Name = "Quiet"
-    args3[18].Value = True
-    dispatcher.executeDispatch(document, ".uno:ExecuteSearch", "", 0, args3)
-
-    #--- Reset search options with a dummy search.
-    args3[9].Value = 65536
-    args3[10].Value = "#"
-    args3[17].Value = 1
-    dispatcher.executeDispatch(document, ".uno:ExecuteSearch", "", 0, args3)
-
-    #--- Restore cursor position.
-    oViewCursor.gotoRange(oSaveCursor, False)
+    ManuscriptFormatter(XSCRIPTCONTEXT.getDocument()).to_blank_lines()
 
 
 def indent_paragraphs():
@@ -390,88 +400,7 @@ def indent_paragraphs():
     Select all paragraphs that start with '> ' 
     and change their paragraph style to _Quotations_.
     """
-    pStyles = XSCRIPTCONTEXT.getDocument().StyleFamilies.getByName('ParagraphStyles')
-    # pStyles = ThisComponent.StyleFamilies.getByName("ParagraphStyles")
-    document = XSCRIPTCONTEXT.getDocument().CurrentController.Frame
-    # document   = ThisComponent.CurrentController.Frame
-    ctx = XSCRIPTCONTEXT.getComponentContext()
-    smgr = ctx.getServiceManager()
-    dispatcher = smgr.createInstanceWithContext("com.sun.star.frame.DispatchHelper", ctx)
-    # dispatcher = createUnoService("com.sun.star.frame.DispatchHelper")
-
-    #--- Save cursor position.
-    oViewCursor = XSCRIPTCONTEXT.getDocument().CurrentController.getViewCursor()
-    # oViewCursor = ThisComponent.CurrentController().getViewCursor()
-    oSaveCursor = XSCRIPTCONTEXT.getDocument().Text.createTextCursorByRange(oViewCursor)
-    # oSaveCursor = ThisComponent.Text.createTextCursorByRange(oViewCursor)
-
-    #--- Assign all paragraphs beginning with '> ' the 'Quotations' style.
-    args1 = []
-    for __ in range(19):
-        args1.append(PropertyValue())
-    # dim args1(18) as new com.sun.star.beans.PropertyValue
-    args1[0].Name = "SearchItem.StyleFamily"
-    args1[0].Value = 2
-    args1[1].Name = "SearchItem.CellType"
-    args1[1].Value = 0
-    args1[2].Name = "SearchItem.RowDirection"
-    args1[2].Value = True
-    args1[3].Name = "SearchItem.AllTables"
-    args1[3].Value = False
-    args1[4].Name = "SearchItem.Backward"
-    args1[4].Value = False
-    args1[5].Name = "SearchItem.Pattern"
-    args1[5].Value = False
-    args1[6].Name = "SearchItem.Content"
-    args1[6].Value = False
-    args1[7].Name = "SearchItem.AsianOptions"
-    args1[7].Value = False
-    args1[8].Name = "SearchItem.AlgorithmType"
-    args1[8].Value = 1
-    args1[9].Name = "SearchItem.SearchFlags"
-    args1[9].Value = 65536
-    args1[10].Name = "SearchItem.SearchString"
-    args1[10].Value = "^> "
-    args1[11].Name = "SearchItem.ReplaceString"
-    args1[11].Value = ""
-    args1[12].Name = "SearchItem.Locale"
-    args1[12].Value = 255
-    args1[13].Name = "SearchItem.ChangedChars"
-    args1[13].Value = 2
-    args1[14].Name = "SearchItem.DeletedChars"
-    args1[14].Value = 2
-    args1[15].Name = "SearchItem.InsertedChars"
-    args1[15].Value = 2
-    args1[16].Name = "SearchItem.TransliterateFlags"
-    args1[16].Value = 1280
-    args1[17].Name = "SearchItem.Command"
-    args1[17].Value = 1
-    args1[18].Name = "Quiet"
-    args1[18].Value = True
-    dispatcher.executeDispatch(document, ".uno:ExecuteSearch", "", 0, args1)
-    if is_anything_selected(XSCRIPTCONTEXT.getDocument()):
-        args2 = []
-        for __ in range(2):
-            args2.append(PropertyValue())
-        # dim args2(1) as new com.sun.star.beans.PropertyValue
-        args2[0].Name = "Template"
-        args2[0].Value = pStyles.getByName("Quotations").DisplayName
-        args2[1].Name = "Family"
-        args2[1].Value = 2
-        dispatcher.executeDispatch(document, ".uno:StyleApply", "", 0, args2)
-
-        #--- Delete the markup.
-        args1[17].Value = 3
-        dispatcher.executeDispatch(document, ".uno:ExecuteSearch", "", 0, args1)
-
-    #--- Reset search options with a dummy search.
-    args1[8].Value = 0
-    args1[10].Value = "#"
-    args1[17].Value = 1
-    dispatcher.executeDispatch(document, ".uno:ExecuteSearch", "", 0, args1)
-
-    #--- Restore cursor position.
-    oViewCursor.gotoRange(oSaveCursor, False)
+    ManuscriptFormatter(XSCRIPTCONTEXT.getDocument()).indent_paragraphs()
 
 
 def replace_bullets():
@@ -480,120 +409,9 @@ def replace_bullets():
     Select all paragraphs that start with '- ' 
     and apply a list paragraph style.
     """
-    document = XSCRIPTCONTEXT.getDocument().CurrentController.Frame
-    # document   = ThisComponent.CurrentController.Frame
-    ctx = XSCRIPTCONTEXT.getComponentContext()
-    smgr = ctx.getServiceManager()
-    dispatcher = smgr.createInstanceWithContext("com.sun.star.frame.DispatchHelper", ctx)
-    # dispatcher = createUnoService("com.sun.star.frame.DispatchHelper")
-
-    #--- Save cursor position.
-    oViewCursor = XSCRIPTCONTEXT.getDocument().CurrentController.getViewCursor()
-    # oViewCursor = ThisComponent.CurrentController().getViewCursor()
-    oSaveCursor = XSCRIPTCONTEXT.getDocument().Text.createTextCursorByRange(oViewCursor)
-    # oSaveCursor = ThisComponent.Text.createTextCursorByRange(oViewCursor)
-
-    #--- Find all list strokes.
-    args1 = []
-    for __ in range(19):
-        args1.append(PropertyValue())
-    # dim args1(18) as new com.sun.star.beans.PropertyValue
-    args1[0].Name = "SearchItem.StyleFamily"
-    args1[0].Value = 2
-    args1[1].Name = "SearchItem.CellType"
-    args1[1].Value = 0
-    args1[2].Name = "SearchItem.RowDirection"
-    args1[2].Value = True
-    args1[3].Name = "SearchItem.AllTables"
-    args1[3].Value = False
-    args1[4].Name = "SearchItem.Backward"
-    args1[4].Value = False
-    args1[5].Name = "SearchItem.Pattern"
-    args1[5].Value = False
-    args1[6].Name = "SearchItem.Content"
-    args1[6].Value = False
-    args1[7].Name = "SearchItem.AsianOptions"
-    args1[7].Value = False
-    args1[8].Name = "SearchItem.AlgorithmType"
-    args1[8].Value = 1
-    args1[9].Name = "SearchItem.SearchFlags"
-    args1[9].Value = 65536
-    args1[10].Name = "SearchItem.SearchString"
-    args1[10].Value = "^- "
-    args1[11].Name = "SearchItem.ReplaceString"
-    args1[11].Value = ""
-    args1[12].Name = "SearchItem.Locale"
-    args1[12].Value = 255
-    args1[13].Name = "SearchItem.ChangedChars"
-    args1[13].Value = 2
-    args1[14].Name = "SearchItem.DeletedChars"
-    args1[14].Value = 2
-    args1[15].Name = "SearchItem.InsertedChars"
-    args1[15].Value = 2
-    args1[16].Name = "SearchItem.TransliterateFlags"
-    args1[16].Value = 1280
-    args1[17].Name = "SearchItem.Command"
-    args1[17].Value = 1
-    args1[18].Name = "Quiet"
-    args1[18].Value = True
-    dispatcher.executeDispatch(document, ".uno:ExecuteSearch", "", 0, args1)
-    if is_anything_selected(XSCRIPTCONTEXT.getDocument()):
-        #--- Apply list bullets to search result.
-        args2 = []
-        for __ in range(1):
-            args2.append(PropertyValue())
-        # dim args2(0) as new com.sun.star.beans.PropertyValue
-        args2[0].Name = "On"
-        args2[0].Value = True
-        dispatcher.executeDispatch(document, ".uno:DefaultBullet", "", 0, args2)
-
-        #--- Delete list strokes.
-        dispatcher.executeDispatch(document, ".uno:Delete", "", 0, [])
-        # dispatcher.executeDispatch(document, ".uno:Delete", "", 0, Array())
-
-    #--- Reset search options with a dummy search.
-    args1[8].Value = 0
-    args1[10].Value = "#"
-    args1[17].Value = 1
-    dispatcher.executeDispatch(document, ".uno:ExecuteSearch", "", 0, args1)
-
-    #--- Restore cursor position.
-    oViewCursor.gotoRange(oSaveCursor, False)
-
-
-def is_anything_selected(oDoc):
-    """Return True if anything is selected.
-    
-    Positional arguments:
-        oDoc -- ThisComponent
-    
-    Code example by Andrew D. Pitonyak
-    OpenOffice.org Macros Explained
-    OOME Third Edition
-    """
-    # Assume nothing is selected
-    IsAnythingSelected = False
-    if oDoc is None:
-        return False
+    ManuscriptFormatter(XSCRIPTCONTEXT.getDocument()).replace_bullets()
 
-    # The current selection in the current controller.
-    # If there is no current controller, it returns NULL.
-    oSelections = oDoc.getCurrentSelection()
-    if oSelections is None:
-        return False
-
-    if oSelections.getCount() == 0:
-        return False
 
-    if oSelections.getCount() > 1:
-        # There is more than one selection so return True
-        IsAnythingSelected = True
-    else:
-        # There is only one selection so obtain the first selection
-        oSel = oSelections.getByIndex(0)
-        # Create a text cursor that covers the range and then see if it is
-        # collapsed.
-        oCursor = oDoc.Text.createTextCursorByRange(oSel)
-        if not oCursor.isCollapsed():
-            IsAnythingSelected = True
-    return IsAnythingSelected
+def post_process_manuscript():
+    """Replace scene dividers with blank lines, indent quotations, and replace list strokes in one pass."""
+    ManuscriptFormatter(XSCRIPTCONTEXT.getDocument()).post_process()
@@ -0,0 +1,63 @@
+"""Convert yWriter projects and ODF documents in batch mode, without LibreOffice.
+
+Version @release
+Requires Python 3.6+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-cnv
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import sys
+import json
+import argparse
+from pywriter.pywriter_globals import *
+from ywcnvlib.batch_converter import BatchConverter
+
+
+def main(argv=None):
+    """Convert the files specified on the command line, and print a JSON summary.
+
+    Optional arguments:
+        argv -- list of command line arguments. If None, use sys.argv.
+
+    Return the exit code: 0 if all conversions succeeded, 1 if any failed, 2 in case of a usage error.
+    """
+    parser = argparse.ArgumentParser(
+        description='Convert yWriter projects and ODF documents without user interaction.')
+    parser.add_argument('sources', nargs='+', metavar='SOURCE',
+                        help='file, directory, or glob pattern, e.g. "projects/**/*.yw7"')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('-e', '--export', nargs='*', metavar='SUFFIX', dest='suffixes',
+                      help='export the yWriter projects to the formats with these suffixes, e.g. _manuscript _scenelist; '
+                      'all formats if no suffix is given (default)')
+    mode.add_argument('-i', '--import', action='store_true', dest='importMode',
+                      help='import the documents into their yWriter projects')
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help='number of worker processes (default: number of processors)')
+    parser.add_argument('-r', '--recursive', action='store_true',
+                        help='search directories and "**" patterns recursively')
+    parser.add_argument('--no-overwrite', action='store_false', dest='overwrite',
+                        help='skip existing target files')
+    parser.add_argument('--summary', metavar='FILE',
+                        help='also write the summary to FILE')
+    args = parser.parse_args(argv)
+    try:
+        converter = BatchConverter(importMode=args.importMode, suffixes=args.suffixes or None,
+                                   maxWorkers=args.workers, recursive=args.recursive, overwrite=args.overwrite)
+    except Error as ex:
+        sys.stderr.write(f'{str(ex)}\n')
+        return 2
+
+    summary = converter.run(args.sources)
+    text = json.dumps(summary, indent=2)
+    print(text)
+    if args.summary:
+        with open(args.summary, 'w', encoding='utf-8') as f:
+            f.write(text)
+    if summary['failed']:
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,47 @@
+"""Run a local conversion service for yWriter projects and ODF documents, without LibreOffice.
+
+Version @release
+Requires Python 3.6+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-cnv
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import sys
+import argparse
+from pywriter.pywriter_globals import *
+from ywcnvlib.conversion_service import ConversionService
+
+
+def main(argv=None):
+    """Serve conversion jobs at the address specified on the command line until shut down.
+
+    Optional arguments:
+        argv -- list of command line arguments. If None, use sys.argv.
+
+    Return the exit code: 0 after a shutdown request, 2 if the service cannot be started.
+    """
+    parser = argparse.ArgumentParser(
+        description='Convert yWriter projects and ODF documents on request, keeping the parsed projects in memory.')
+    parser.add_argument('address', metavar='ADDRESS',
+                        help='socket file path, or localhost:PORT where Unix domain sockets are not available')
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help='number of jobs run at the same time (default: number of processors)')
+    parser.add_argument('--cache-dir', metavar='DIR', default=None,
+                        help='also keep the parsed projects in DIR between service runs')
+    args = parser.parse_args(argv)
+    try:
+        service = ConversionService(args.address, maxWorkers=args.workers, cacheDir=args.cache_dir)
+    except (Error, OSError) as ex:
+        sys.stderr.write(f'{str(ex)}\n')
+        return 2
+
+    sys.stderr.write(f'Listening on {args.address}\n')
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
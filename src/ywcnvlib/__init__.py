@@ -3,8 +3,38 @@
 Modules:
 
 yw_cnv_uno -- Provide a converter class for universal import and export. 
+class_registry -- Provide a class registry that imports the file classes on demand.
+yw7_file_cnv -- Provide a class for yWriter 7 project import and export with a streaming reader.
+scene_cnv -- Provide a compact scene class with lazy content loading, word and letter counting, and language scanning.
+element_cnv -- Provide compact element classes with slots.
+scene_content_store -- Provide a class for reading scene contents on demand from a memory-mapped yw7 file.
+novel_cnv -- Provide a novel class with batch word counting, a cached language index, ID allocation, a shared index, and statistics.
+novel_index -- Provide a class for cross references and lookups shared by all exporters.
+novel_statistics -- Provide a class for project statistics with array-backed columns.
+novel_cache -- Provide a two-tier cache class for parsed yWriter projects.
+render_plan -- Provide a class for compiled string templates.
+lazy_mapping -- Provide a dictionary class that computes its values on demand.
+file_export_cnv -- Provide a mixin class for template-based file export with compiled render plans.
+markup_translator -- Provide a class for single-pass yWriter-to-ODF markup translation.
+odt_w_formatted_cnv -- Provide a mixin class for ODT export with single-pass markup translation.
+odf_file_cnv -- Provide a mixin class for ODF packaging without temporary files.
+odf_export_cnv -- Provide the ODF export classes used by the converter.
+odt_parser_cnv -- Provide an ODT parser class that streams content.xml through expat.
+odt_document_parser -- Provide a parser class that reads an open Writer document through the document model.
+odt_reader_cnv -- Provide a mixin class for ODT import with a streaming parser or from an open document.
+splitter_cnv -- Provide a class for linear-time splitting of scenes and chapters.
+odt_r_formatted_cnv -- Provide a mixin class for formatted ODT import with linear-time scene splitting.
+ods_parser_cnv -- Provide an ODS parser class that generates the table rows while reading.
+ods_reader_cnv -- Provide a mixin class for ODS import with a row generator.
+odf_import_cnv -- Provide the ODF import classes used by the converter.
+phase_timer -- Provide a class for opt-in timing of the conversion phases.
+batch_converter -- Provide a class for headless batch conversion on a process pool.
+ui_batch -- Provide a non-interactive user interface class for batch conversion.
+conversion_service -- Provide a class for a long-running local conversion service with warm caches.
+service_client -- Provide a client class for the local conversion service.
 ui_uno -- Provide a UNO user interface facade class.
 uno_tools -- Provide Python wrappers for UNO widgets.
+manuscript_formatter -- Provide a class for reformatting marked-up paragraphs of a Writer document.
 
 Copyright (c) 2023 Peter Triesberger
 For further information see https://github.com/peter88213/yw-cnv
@@ -0,0 +1,254 @@
+"""Provide a class for headless batch conversion on a process pool.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-cnv
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import os
+import glob
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pywriter.pywriter_globals import *
+from ywcnvlib.yw_cnv_uno import YwCnvUno
+from ywcnvlib.yw7_file_cnv import Yw7FileCnv
+from ywcnvlib.ui_batch import UiBatch
+from ywcnvlib.service_client import WRITTEN
+from ywcnvlib.service_client import SKIPPED
+from ywcnvlib.service_client import FAILED
+from ywcnvlib.odf_export_cnv import OdtWExportCnv
+from ywcnvlib.odf_import_cnv import OdtRProofCnv
+# Batch conversion needs all file classes, so import their modules right away.
+# This also makes the inlined batch script contain them.
+
+
+class BatchConverter:
+    """Convert many files without user interaction, using several processes.
+
+    Public methods:
+        find_sources(patterns) -- Return a sorted list of the source files matching the patterns.
+        run(patterns) -- Convert all matching source files, and return a summary.
+
+    Public instance variables:
+        importMode -- bool: if True, import ODF documents into their yWriter projects; otherwise export yWriter projects.
+        suffixes -- list of export target file suffixes, e.g. '_manuscript'. If None, write all export targets.
+        maxWorkers -- int: number of worker processes. If 1, convert within the calling process.
+        recursive -- bool: if True, search directories and "**" glob patterns recursively.
+        overwrite -- bool: if True, overwrite existing target files; otherwise skip them.
+
+    In export mode, each yWriter project is read once, and written to all requested formats.
+    In import mode, the documents belonging to the same yWriter project are imported
+    one after another in the same worker, so a project is never written concurrently.
+    """
+
+    def __init__(self, importMode=False, suffixes=None, maxWorkers=None, recursive=False, overwrite=True):
+        """Initialize instance variables.
+
+        Optional arguments:
+            importMode -- bool: if True, import ODF documents; otherwise export yWriter projects.
+            suffixes -- list of export target file suffixes. If None, write all export targets.
+            maxWorkers -- int: number of worker processes. If None, use the number of processors.
+            recursive -- bool: if True, search directories and "**" glob patterns recursively.
+            overwrite -- bool: if True, overwrite existing target files; otherwise skip them.
+
+        Raise the "Error" exception, if a suffix is not an export target suffix.
+        """
+        exportSuffixes = [fileClass.SUFFIX for fileClass in YwCnvUno.EXPORT_TARGET_CLASSES]
+        if suffixes is not None:
+            for suffix in suffixes:
+                if not suffix in exportSuffixes:
+                    raise Error(f'{_("File type is not supported")}: "{suffix}".')
+
+        self.importMode = importMode
+        self.suffixes = suffixes
+        self.maxWorkers = maxWorkers or os.cpu_count() or 1
+        self.recursive = recursive
+        self.overwrite = overwrite
+
+    def find_sources(self, patterns):
+        """Return a sorted list of the source files matching the patterns.
+
+        Positional arguments:
+            patterns -- list of file paths, directory paths, or glob patterns.
+
+        In export mode, select yWriter 7 projects.
+        In import mode, select documents with the file name suffix of an import source, e.g. "_manuscript.odt".
+        """
+        sources = set()
+        for pattern in patterns:
+            if os.path.isdir(pattern):
+                if self.recursive:
+                    pattern = os.path.join(pattern, '**', '*')
+                else:
+                    pattern = os.path.join(pattern, '*')
+            for filePath in glob.glob(pattern, recursive=self.recursive):
+                if os.path.isfile(filePath) and self._is_source(filePath):
+                    sources.add(os.path.abspath(filePath))
+        return sorted(sources)
+
+    def run(self, patterns):
+        """Convert all matching source files, and return a summary.
+
+        Positional arguments:
+            patterns -- list of file paths, directory paths, or glob patterns.
+
+        The summary is a dictionary:
+            mode -- str: "export" or "import".
+            sources -- int: number of source files found.
+            written, skipped, failed -- int: number of target files per conversion status.
+            seconds -- float: wall time.
+            results -- list of dictionaries with source, suffix, target, status, message, and warnings.
+        """
+        startTime = time.perf_counter()
+        sources = self.find_sources(patterns)
+        if self.importMode:
+            jobs = [(import_documents, (documents, self.overwrite)) for documents in self._group_documents(sources)]
+        else:
+            suffixes = self.suffixes
+            if suffixes is None:
+                suffixes = [fileClass.SUFFIX for fileClass in YwCnvUno.EXPORT_TARGET_CLASSES]
+            jobs = [(export_project, (sourcePath, suffixes, self.overwrite)) for sourcePath in sources]
+        results = []
+        if self.maxWorkers > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=min(self.maxWorkers, len(jobs))) as executor:
+                futures = [executor.submit(function, *args) for function, args in jobs]
+                for (__, args), future in zip(jobs, futures):
+                    try:
+                        results.extend(future.result())
+                    except Exception as ex:
+                        results.extend(self._fail_job(args, ex))
+        else:
+            for function, args in jobs:
+                try:
+                    results.extend(function(*args))
+                except Exception as ex:
+                    results.extend(self._fail_job(args, ex))
+        summary = dict(
+            mode='import' if self.importMode else 'export',
+            sources=len(sources),
+            written=0,
+            skipped=0,
+            failed=0,
+            seconds=round(time.perf_counter() - startTime, 3),
+            results=results,
+            )
+        for result in results:
+            summary[result['status']] += 1
+        return summary
+
+    def _is_source(self, filePath):
+        """Return True if the file is a source file of the conversion mode."""
+        if not self.importMode:
+            return filePath.endswith(Yw7FileCnv.EXTENSION)
+
+        return get_import_suffix(filePath) is not None
+
+    def _group_documents(self, documents):
+        """Return a list of document lists, one per yWriter project.
+
+        Positional arguments:
+            documents -- sorted list of import source file paths.
+        """
+        groups = {}
+        for filePath in documents:
+            suffix = get_import_suffix(filePath)
+            fileName, __ = os.path.splitext(filePath)
+            groups.setdefault(fileName[:len(fileName) - len(suffix)], []).append(filePath)
+        return list(groups.values())
+
+    def _fail_job(self, args, ex):
+        """Return a list of failure results for a job that raised an exception.
+
+        Positional arguments:
+            args -- tuple: the job's arguments; the first one is the source path or the list of documents.
+            ex -- the exception raised.
+        """
+        sources = args[0]
+        if not self.importMode:
+            sources = [sources]
+        return [make_result(sourcePath, None, None, FAILED, f'!{str(ex)}') for sourcePath in sources]
+
+
+def get_import_suffix(filePath):
+    """Return the file name suffix of an import source document, or None if the document is not importable."""
+    for fileClass in YwCnvUno.IMPORT_SOURCE_CLASSES:
+        if filePath.endswith(f'{fileClass.SUFFIX}{fileClass.EXTENSION}'):
+            return fileClass.SUFFIX
+
+    return None
+
+
+def make_result(source, suffix, target, status, message, warnings=None):
+    """Return a dictionary describing the conversion of a target file."""
+    return dict(
+        source=source,
+        suffix=suffix,
+        target=target,
+        status=status,
+        message=message,
+        warnings=warnings or [],
+        )
+
+
+def export_project(sourcePath, suffixes, overwrite):
+    """Export a yWriter project to several file formats, and return a list of results.
+
+    Positional arguments:
+        sourcePath -- str: path of the yWriter project file.
+        suffixes -- list of export target file suffixes.
+        overwrite -- bool: if True, overwrite existing target files; otherwise skip them.
+
+    This is a module-level function, so that worker processes can call it.
+    """
+    fileName, __ = os.path.splitext(sourcePath)
+    targetPaths = {}
+    for fileClass in YwCnvUno.EXPORT_TARGET_CLASSES:
+        if fileClass.SUFFIX in suffixes:
+            targetPaths[fileClass.SUFFIX] = f'{fileName}{fileClass.SUFFIX}{fileClass.EXTENSION}'
+    results = []
+    pending = []
+    for suffix in suffixes:
+        targetPath = targetPaths.get(suffix)
+        if not overwrite and targetPath and os.path.isfile(targetPath):
+            results.append(make_result(sourcePath, suffix, targetPath, SKIPPED, f'{_("File exists")}: "{norm_path(targetPath)}".'))
+        else:
+            pending.append(suffix)
+    if pending:
+        converter = YwCnvUno()
+        converter.ui = UiBatch('')
+        messages = converter.export_bundle(sourcePath, suffixes=pending)
+        for suffix in pending:
+            message = messages.get(suffix, f'!{_("File type is not supported")}.')
+            if message.startswith('!'):
+                status = FAILED
+            else:
+                status = WRITTEN
+            results.append(make_result(sourcePath, suffix, targetPaths.get(suffix), status, message))
+    return results
+
+
+def import_documents(documents, overwrite):
+    """Import documents into their yWriter project one after another, and return a list of results.
+
+    Positional arguments:
+        documents -- list of paths of documents belonging to the same yWriter project.
+        overwrite -- bool: if True, overwrite the existing project; otherwise skip the documents.
+
+    This is a module-level function, so that worker processes can call it.
+    """
+    results = []
+    for sourcePath in documents:
+        converter = YwCnvUno()
+        converter.ui = UiBatch('', answer=overwrite)
+        converter.run(sourcePath, suffix=None)
+        message = converter.ui.infoHowText
+        if converter.ui.questions and not overwrite:
+            status = SKIPPED
+        elif message.startswith('!') or converter.newFile is None:
+            status = FAILED
+        else:
+            status = WRITTEN
+        fileName, __ = os.path.splitext(sourcePath)
+        suffix = get_import_suffix(sourcePath)
+        targetPath = f'{fileName[:len(fileName) - len(suffix)]}{Yw7FileCnv.EXTENSION}'
+        results.append(make_result(sourcePath, suffix, targetPath, status, message, converter.ui.warnings))
+    return results
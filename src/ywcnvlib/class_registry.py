@@ -0,0 +1,155 @@
+"""Provide a class registry that imports the file classes on demand.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-cnv
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import importlib
+from pywriter.pywriter_globals import *
+
+
+class LazyClass:
+    """Placeholder for a file class whose module is imported on first use.
+
+    Public methods:
+        resolve() -- Import the class, if not yet done, and return it.
+
+    Public instance variables:
+        SUFFIX -- str: file name suffix of the class.
+        EXTENSION -- str: file extension of the class.
+        className -- str: name of the class.
+        moduleName -- str: name of the module defining the class, relative to the ywcnvlib package.
+
+    The file factories select a class by its SUFFIX and EXTENSION only,
+    so the placeholder answers these without importing anything.
+    Calling the placeholder instantiates the class,
+    and all other attributes are looked up in the class.
+    """
+
+    def __init__(self, moduleName, className, suffix, extension):
+        """Initialize instance variables.
+
+        Positional arguments:
+            moduleName -- str: name of the module defining the class, relative to the ywcnvlib package.
+            className -- str: name of the class.
+            suffix -- str: file name suffix of the class.
+            extension -- str: file extension of the class.
+        """
+        self.moduleName = moduleName
+        self.className = className
+        self.SUFFIX = suffix
+        self.EXTENSION = extension
+        self._fileClass = None
+
+    def resolve(self):
+        """Import the class, if not yet done, and return it.
+
+        If the class is already defined in this module's namespace, e.g. in an inlined script, use it.
+        Raise the "Error" exception, if the registered suffix or extension does not match the class.
+        """
+        if self._fileClass is None:
+            fileClass = globals().get(self.className)
+            if fileClass is None:
+                module = importlib.import_module(f'.{self.moduleName}', __package__)
+                fileClass = getattr(module, self.className)
+            if fileClass.SUFFIX != self.SUFFIX or fileClass.EXTENSION != self.EXTENSION:
+                raise Error(f'Class registry mismatch: {self.className}.')
+
+            self._fileClass = fileClass
+        return self._fileClass
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+    def __getattr__(self, name):
+        if name.startswith('__') and name != '__name__':
+            raise AttributeError(name)
+
+        return getattr(self.resolve(), name)
+
+
+class ClassRegistry:
+    """Registry of the converter's file classes.
+
+    Public methods:
+        register(moduleName, className, suffix, extension) -- Add a file class, and return its placeholder.
+        get_class(suffix, extension) -- Return the class for a suffix and an extension, importing it on demand.
+
+    Public instance variables:
+        classes -- list of LazyClass instances in registration order.
+
+    The classes list can be used as a converter's file class list.
+    """
+
+    def __init__(self):
+        """Initialize instance variables."""
+        self.classes = []
+        self._index = {}
+
+    def register(self, moduleName, className, suffix, extension):
+        """Add a file class, and return its placeholder.
+
+        Positional arguments:
+            moduleName -- str: name of the module defining the class, relative to the ywcnvlib package.
+            className -- str: name of the class.
+            suffix -- str: file name suffix of the class.
+            extension -- str: file extension of the class.
+        """
+        lazyClass = LazyClass(moduleName, className, suffix, extension)
+        self.classes.append(lazyClass)
+        self._index.setdefault((suffix, extension), lazyClass)
+        return lazyClass
+
+    def get_class(self, suffix, extension):
+        """Return the class for a suffix and an extension, importing it on demand.
+
+        Positional arguments:
+            suffix -- str: file name suffix.
+            extension -- str: file extension.
+
+        Raise the "Error" exception, if no class is registered.
+        """
+        try:
+            return self._index[(suffix, extension)].resolve()
+
+        except KeyError:
+            raise Error(f'{_("File type is not supported")}: "{suffix}{extension}".')
+
+
+EXPORT_TARGETS = ClassRegistry()
+EXPORT_TARGETS.register('odf_export_cnv', 'OdtWExportCnv', '', '.odt')
+EXPORT_TARGETS.register('odf_export_cnv', 'OdtWProofCnv', '_proof', '.odt')
+EXPORT_TARGETS.register('odf_export_cnv', 'OdtWManuscriptCnv', '_manuscript', '.odt')
+EXPORT_TARGETS.register('odf_export_cnv', 'OdtWBriefSynopsisCnv', '_brf_synopsis', '.odt')
+EXPORT_TARGETS.register('odf_export_cnv', 'OdtWSceneDescCnv', '_scenes', '.odt')
+EXPORT_TARGETS.register('odf_export_cnv', 'OdtWChapterDescCnv', '_chapters', '.odt')
+EXPORT_TARGETS.register('odf_export_cnv', 'OdtWPartDescCnv', '_parts', '.odt')
+EXPORT_TARGETS.register('odf_export_cnv', 'OdtWCharactersCnv', '_characters', '.odt')
+EXPORT_TARGETS.register('odf_export_cnv', 'OdtWItemsCnv', '_items', '.odt')
+EXPORT_TARGETS.register('odf_export_cnv', 'OdtWLocationsCnv', '_locations', '.odt')
+EXPORT_TARGETS.register('odf_export_cnv', 'OdsWCharListCnv', '_charlist', '.ods')
+EXPORT_TARGETS.register('odf_export_cnv', 'OdsWLocListCnv', '_loclist', '.ods')
+EXPORT_TARGETS.register('odf_export_cnv', 'OdsWItemListCnv', '_itemlist', '.ods')
+EXPORT_TARGETS.register('odf_export_cnv', 'OdsWSceneListCnv', '_scenelist', '.ods')
+EXPORT_TARGETS.register('odf_export_cnv', 'OdsWStatisticsCnv', '_statistics', '.ods')
+EXPORT_TARGETS.register('odf_export_cnv', 'OdtWXrefCnv', '_xref', '.odt')
+EXPORT_TARGETS.register('odf_export_cnv', 'OdtWNotesCnv', '_notes', '.odt')
+EXPORT_TARGETS.register('odf_export_cnv', 'OdtWTodoCnv', '_todo', '.odt')
+# Export target classes in menu order.
+
+IMPORT_SOURCES = ClassRegistry()
+IMPORT_SOURCES.register('odf_import_cnv', 'OdtRProofCnv', '_proof', '.odt')
+IMPORT_SOURCES.register('odf_import_cnv', 'OdtRManuscriptCnv', '_manuscript', '.odt')
+IMPORT_SOURCES.register('odf_import_cnv', 'OdtRSceneDescCnv', '_scenes', '.odt')
+IMPORT_SOURCES.register('odf_import_cnv', 'OdtRChapterDescCnv', '_chapters', '.odt')
+IMPORT_SOURCES.register('odf_import_cnv', 'OdtRPartDescCnv', '_parts', '.odt')
+IMPORT_SOURCES.register('odf_import_cnv', 'OdtRCharactersCnv', '_characters', '.odt')
+IMPORT_SOURCES.register('odf_import_cnv', 'OdtRItemsCnv', '_items', '.odt')
+IMPORT_SOURCES.register('odf_import_cnv', 'OdtRLocationsCnv', '_locations', '.odt')
+IMPORT_SOURCES.register('odf_import_cnv', 'OdtRNotesCnv', '_notes', '.odt')
+IMPORT_SOURCES.register('odf_import_cnv', 'OdtRTodoCnv', '_todo', '.odt')
+IMPORT_SOURCES.register('odf_import_cnv', 'OdsRCharListCnv', '_charlist', '.ods')
+IMPORT_SOURCES.register('odf_import_cnv', 'OdsRLocListCnv', '_loclist', '.ods')
+IMPORT_SOURCES.register('odf_import_cnv', 'OdsRItemListCnv', '_itemlist', '.ods')
+IMPORT_SOURCES.register('odf_import_cnv', 'OdsRSceneListCnv', '_scenelist', '.ods')
+# Import source classes in the order the import source factory tries them.
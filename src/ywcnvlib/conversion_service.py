@@ -0,0 +1,333 @@
+"""Provide a class for a long-running local conversion service with warm caches.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-cnv
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import os
+import re
+import json
+import stat
+import socket
+import socketserver
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pywriter.pywriter_globals import *
+from ywcnvlib.yw_cnv_uno import YwCnvUno
+from ywcnvlib.yw7_file_cnv import Yw7FileCnv
+from ywcnvlib.service_client import WRITTEN
+from ywcnvlib.service_client import FAILED
+from ywcnvlib.batch_converter import export_project
+from ywcnvlib.batch_converter import import_documents
+from ywcnvlib.batch_converter import get_import_suffix
+from ywcnvlib.batch_converter import make_result
+from ywcnvlib.service_client import EXPORT
+from ywcnvlib.service_client import IMPORT
+from ywcnvlib.service_client import PING
+from ywcnvlib.service_client import SHUTDOWN
+from ywcnvlib.service_client import LOOPBACK_HOSTS
+from ywcnvlib.service_client import parse_address
+
+UNCHANGED = 'unchanged'
+# Conversion status of an export target that is up to date.
+
+_HTTP_REQUEST_LINE = re.compile(rb'[A-Z]+ \S+ HTTP/[0-9]')
+# First line of an HTTP request, e.g. sent by a web browser.
+
+
+class ConversionService:
+    """Convert files on request, keeping the file classes and the parsed projects in memory.
+
+    Public methods:
+        handle_request(request) -- Run a job, and return the response.
+        serve_forever() -- Accept jobs until shut down.
+        shutdown() -- Stop accepting jobs.
+
+    Public instance variables:
+        address -- str: socket file path, or (host, port) tuple.
+        maxWorkers -- int: number of jobs run at the same time.
+
+    Jobs are JSON objects sent on a line of their own, see ServiceClient.
+    They are run concurrently on a thread pool, so all jobs share
+    the imported file classes and the in-process tier of the project cache.
+    Export targets that are up to date are not written again:
+    a target is up to date, if neither the project file nor the target file
+    has changed since the service wrote it.
+
+    Each job has its own converter and user interface object.
+    Paths must be absolute, because the working directory is never changed.
+    The jobs of a yWriter project, i.e. its exports and the imports into it,
+    are run one after another, so a project is never read while being written.
+    A TCP service listens only on the loopback interface.
+    A connection is closed on the first line that is not a job,
+    so HTTP requests, e.g. sent by a web page via the browser, are never run.
+    The phase timer is not used, because its measurements are global.
+    """
+
+    def __init__(self, address, maxWorkers=None, cacheDir=None):
+        """Load the file classes, and open the socket.
+
+        Positional arguments:
+            address -- str: socket file path, "host:port", or (host, port) tuple.
+
+        Optional arguments:
+            maxWorkers -- int: number of jobs run at the same time. If None, use the number of processors.
+            cacheDir -- str: directory for the on-disk project snapshots. If None, keep them only in memory.
+
+        Raise the "Error" exception, if the address is not local.
+        Raise OSError, if the socket cannot be opened.
+        """
+        if isinstance(address, str):
+            address = parse_address(address)
+        if not isinstance(address, str) and not address[0] in LOOPBACK_HOSTS:
+            raise Error(f'{_("Not a local address")}: "{address[0]}".')
+
+        self.address = address
+        self.maxWorkers = maxWorkers or os.cpu_count() or 1
+        Yw7FileCnv.novelCache.cacheDir = cacheDir
+        for fileClass in YwCnvUno.EXPORT_TARGET_CLASSES + YwCnvUno.IMPORT_SOURCE_CLASSES:
+            fileClass.resolve()
+        self._executor = ThreadPoolExecutor(max_workers=self.maxWorkers)
+        self._projectLocks = {}
+        # Key: normalized yWriter project path; value: lock held while a job of the project runs.
+        self._artifacts = {}
+        # Key: normalized target path; value: (project signature, target signature) after writing.
+        self._lock = threading.Lock()
+        # Guards the project locks and the artifacts.
+        self._server = self._create_server()
+
+    def serve_forever(self):
+        """Accept jobs until shut down."""
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            self._executor.shutdown(wait=True)
+            if isinstance(self.address, str):
+                try:
+                    os.remove(self.address)
+                except OSError:
+                    pass
+
+    def shutdown(self):
+        """Stop accepting jobs, and let serve_forever() return after the running jobs.
+
+        Must not be called from the thread running serve_forever().
+        """
+        self._server.shutdown()
+
+    def handle_request(self, request):
+        """Run a job, and return the response.
+
+        Positional arguments:
+            request -- dict: job with "action" and the action's arguments.
+
+        The response is a dictionary.
+        For export and import jobs, it has a "results" list with one dictionary per target file,
+        as the batch converter's summary.
+        If the job is invalid, the response has an "error" message instead.
+        """
+        try:
+            action = request['action']
+            if action == PING:
+                return dict(ready=True, workers=self.maxWorkers)
+
+            if action == SHUTDOWN:
+                threading.Thread(target=self.shutdown).start()
+                return dict(ready=False)
+
+            sourcePath = request['source']
+            if not os.path.isabs(sourcePath):
+                raise Error(f'{_("Path is not absolute")}: "{norm_path(sourcePath)}".')
+
+            overwrite = bool(request.get('overwrite', True))
+            if action == EXPORT:
+                suffixes = request.get('suffixes', None)
+                if suffixes is None:
+                    suffixes = [fileClass.SUFFIX for fileClass in YwCnvUno.EXPORT_TARGET_CLASSES]
+                future = self._executor.submit(self._export, sourcePath, list(suffixes), overwrite)
+            elif action == IMPORT:
+                future = self._executor.submit(self._import, sourcePath, overwrite)
+            else:
+                raise Error(f'{_("Unknown action")}: "{action}".')
+
+        except (Error, KeyError, TypeError) as ex:
+            return dict(error=f'{_("Invalid request")}: {str(ex)}')
+
+        return dict(results=future.result())
+
+    def _create_server(self):
+        """Return a socket server that passes the requests to handle_request()."""
+        if isinstance(self.address, str):
+            if _UnixServer is None:
+                raise Error(f'{_("Unix domain sockets are not supported; use host:port")}: "{self.address}".')
+
+            self._remove_stale_socket()
+            server = _UnixServer(self.address, _RequestHandler)
+            os.chmod(self.address, 0o600)
+        else:
+            if ':' in self.address[0]:
+                server = _TcpServer6(self.address, _RequestHandler)
+            else:
+                server = _TcpServer(self.address, _RequestHandler)
+        server.service = self
+        return server
+
+    def _remove_stale_socket(self):
+        """Remove the socket file left over by a service that is no longer running.
+
+        Raise the "Error" exception, if the path is not a socket, or if a service is listening on it.
+        """
+        try:
+            status = os.stat(self.address)
+        except FileNotFoundError:
+            return
+
+        if not stat.S_ISSOCK(status.st_mode):
+            raise Error(f'{_("Not a socket")}: "{norm_path(self.address)}".')
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            try:
+                connection.connect(self.address)
+            except OSError:
+                pass
+            else:
+                raise Error(f'{_("Conversion service is already running")}: "{norm_path(self.address)}".')
+
+        os.remove(self.address)
+
+    def _get_project_lock(self, projectPath):
+        """Return the lock of a yWriter project, creating it, if necessary."""
+        with self._lock:
+            return self._projectLocks.setdefault(os.path.normcase(os.path.realpath(projectPath)), threading.Lock())
+
+    def _export(self, sourcePath, suffixes, overwrite):
+        """Export a yWriter project, skipping the up-to-date targets, and return a list of results.
+
+        Positional arguments:
+            sourcePath -- str: absolute path of the yWriter project file.
+            suffixes -- list of export target file suffixes.
+            overwrite -- bool: if True, overwrite existing target files; otherwise skip them.
+        """
+        try:
+            with self._get_project_lock(sourcePath):
+                signature = Yw7FileCnv.novelCache.get_signature(sourcePath)
+                fileName, __ = os.path.splitext(sourcePath)
+                targetPaths = {}
+                for fileClass in YwCnvUno.EXPORT_TARGET_CLASSES:
+                    targetPaths[fileClass.SUFFIX] = f'{fileName}{fileClass.SUFFIX}{fileClass.EXTENSION}'
+                results = {}
+                pending = []
+                for suffix in suffixes:
+                    targetPath = targetPaths.get(suffix)
+                    if targetPath and signature is not None and self._is_up_to_date(targetPath, signature):
+                        results[suffix] = make_result(sourcePath, suffix, targetPath, UNCHANGED,
+                                                      f'{_("File is up to date")}: "{norm_path(targetPath)}".')
+                    else:
+                        pending.append(suffix)
+                if pending:
+                    for result in export_project(sourcePath, pending, overwrite):
+                        results[result['suffix']] = result
+                        if result['status'] == WRITTEN:
+                            self._remember_artifact(result['target'], signature)
+                return [results[suffix] for suffix in suffixes]
+
+        except Exception as ex:
+            return [make_result(sourcePath, suffix, None, FAILED, f'!{str(ex)}') for suffix in suffixes]
+
+    def _import(self, sourcePath, overwrite):
+        """Import a document into its yWriter project, and return a list with the result.
+
+        Positional arguments:
+            sourcePath -- str: absolute path of the document.
+            overwrite -- bool: if True, overwrite the existing project; otherwise skip the document.
+        """
+        try:
+            suffix = get_import_suffix(sourcePath)
+            if suffix is None:
+                raise Error(f'{_("File type is not supported")}: "{norm_path(sourcePath)}".')
+
+            fileName, __ = os.path.splitext(sourcePath)
+            with self._get_project_lock(f'{fileName[:len(fileName) - len(suffix)]}{Yw7FileCnv.EXTENSION}'):
+                return import_documents([sourcePath], overwrite)
+
+        except Exception as ex:
+            return [make_result(sourcePath, None, None, FAILED, f'!{str(ex)}')]
+
+    def _is_up_to_date(self, targetPath, signature):
+        """Return True, if the target was written from the project version with signature, and not changed since."""
+        with self._lock:
+            artifact = self._artifacts.get(os.path.normcase(os.path.realpath(targetPath)), None)
+        return artifact is not None and artifact == (signature, get_file_signature(targetPath))
+
+    def _remember_artifact(self, targetPath, signature):
+        """Register a written target as up to date for the project version with signature."""
+        if signature is None:
+            return
+
+        targetSignature = get_file_signature(targetPath)
+        if targetSignature is None:
+            return
+
+        with self._lock:
+            self._artifacts[os.path.normcase(os.path.realpath(targetPath))] = (signature, targetSignature)
+
+
+def get_file_signature(filePath):
+    """Return a tuple with the size and modification time of a file, or None if it does not exist."""
+    try:
+        status = os.stat(filePath)
+    except OSError:
+        return None
+
+    return status.st_size, status.st_mtime_ns
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Pass each request line of a connection to the service, and send back the response.
+
+    Close the connection without a response, if it begins like an HTTP request,
+    and after the error response, if a line is not a JSON object.
+    """
+
+    def handle(self):
+        for line in self.rfile:
+            if _HTTP_REQUEST_LINE.match(line):
+                return
+
+            try:
+                request = json.loads(line.decode('utf-8'))
+                if not isinstance(request, dict):
+                    raise ValueError('not an object')
+
+            except ValueError as ex:
+                self._respond(dict(error=f'{_("Invalid request")}: {str(ex)}'))
+                return
+
+            self._respond(self.server.service.handle_request(request))
+
+    def _respond(self, response):
+        """Send a response line."""
+        self.wfile.write(f'{json.dumps(response)}\n'.encode('utf-8'))
+        self.wfile.flush()
+
+
+class _TcpServer(socketserver.ThreadingTCPServer):
+    """TCP socket server with a thread per connection."""
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _TcpServer6(_TcpServer):
+    """IPv6 TCP socket server with a thread per connection."""
+    address_family = socket.AF_INET6
+
+
+if hasattr(socketserver, 'ThreadingUnixStreamServer'):
+
+    class _UnixServer(socketserver.ThreadingUnixStreamServer):
+        """Unix domain socket server with a thread per connection."""
+        daemon_threads = True
+
+else:
+    _UnixServer = None
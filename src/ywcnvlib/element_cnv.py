@@ -0,0 +1,151 @@
+"""Provide compact element classes with slots.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-cnv
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import sys
+from pywriter.model.character import Character
+
+_slotNames = {}
+# Instance variable names held in slots. Key: class.
+
+
+def get_slot_names(elementClass):
+    """Return a tuple with the names of the slots of a class and its base classes."""
+    try:
+        return _slotNames[elementClass]
+
+    except KeyError:
+        pass
+
+    names = []
+    for baseClass in reversed(elementClass.__mro__):
+        for name in baseClass.__dict__.get('__slots__', ()):
+            if not name in names:
+                names.append(name)
+    _slotNames[elementClass] = tuple(names)
+    return _slotNames[elementClass]
+
+
+def get_state(element):
+    """Return a new dictionary with the instance variables of an element, with or without slots.
+
+    Positional arguments:
+        element -- object whose state is returned.
+    """
+    state = {}
+    for name in get_slot_names(element.__class__):
+        try:
+            state[name] = getattr(element, name)
+        except AttributeError:
+            pass
+    state.update(getattr(element, '__dict__', {}))
+    return state
+
+
+def set_state(element, state):
+    """Set the instance variables of an element, with or without slots.
+
+    Positional arguments:
+        element -- object whose state is set.
+        state -- dictionary as returned by get_state().
+    """
+    for name, value in state.items():
+        object.__setattr__(element, name, value)
+
+
+def intern_list(strings):
+    """Return a tuple of the interned strings, or None if strings is None."""
+    if strings is None:
+        return None
+
+    return tuple([sys.intern(string) for string in strings])
+
+
+class BasicElementCnv:
+    """Compact basic element representation.
+
+    Public instance variables:
+        title -- str: title (name).
+        desc -- str: description.
+        kwVar -- dict: custom keyword variables.
+
+    The subclasses have the same instance variables as their pywriter counterparts,
+    but they are held in slots instead of an instance dictionary.
+    Lists of tags and element IDs are stored as tuples of interned strings.
+    """
+    __slots__ = ('title', 'desc', 'kwVar')
+
+    def __init__(self):
+        """Initialize instance variables."""
+        self.title = None
+        self.desc = None
+        self.kwVar = {}
+
+    def __getstate__(self):
+        return get_state(self)
+
+    def __setstate__(self, state):
+        set_state(self, state)
+
+
+class ChapterCnv(BasicElementCnv):
+    """Compact yWriter chapter representation."""
+    __slots__ = ('chLevel', 'chType', 'suppressChapterTitle', 'isTrash', 'suppressChapterBreak', 'srtScenes')
+
+    def __init__(self):
+        """Initialize instance variables.
+
+        Extends the superclass constructor.
+        """
+        super().__init__()
+        self.chLevel = None
+        self.chType = None
+        self.suppressChapterTitle = None
+        self.isTrash = None
+        self.suppressChapterBreak = None
+        self.srtScenes = []
+
+
+class WorldElementCnv(BasicElementCnv):
+    """Compact yWriter location or item representation."""
+    __slots__ = ('image', '_tags', 'aka')
+
+    def __init__(self):
+        """Initialize instance variables.
+
+        Extends the superclass constructor.
+        """
+        super().__init__()
+        self.image = None
+        self._tags = None
+        self.aka = None
+
+    @property
+    def tags(self):
+        return self._tags
+
+    @tags.setter
+    def tags(self, tags):
+        self._tags = intern_list(tags)
+
+
+class CharacterCnv(WorldElementCnv):
+    """Compact yWriter character representation."""
+    MAJOR_MARKER = Character.MAJOR_MARKER
+    MINOR_MARKER = Character.MINOR_MARKER
+
+    __slots__ = ('notes', 'bio', 'goals', 'fullName', 'isMajor')
+
+    def __init__(self):
+        """Initialize instance variables.
+
+        Extends the superclass constructor.
+        """
+        super().__init__()
+        self.notes = None
+        self.bio = None
+        self.goals = None
+        self.fullName = None
+        self.isMajor = None
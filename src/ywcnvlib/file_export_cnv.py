@@ -0,0 +1,657 @@
+"""Provide a mixin class for template-based file export with compiled render plans.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-cnv
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+from pywriter.pywriter_globals import *
+from pywriter.model.character import Character
+from pywriter.model.scene import Scene
+from pywriter.file.file_export import FileExport
+from ywcnvlib.render_plan import RenderPlan
+from ywcnvlib.lazy_mapping import LazyMapping
+
+
+class FileExportCnv(FileExport):
+    """Mixin class for template-based file export with compiled render plans.
+
+    Each template is compiled only once into a RenderPlan.
+    The template mappings are LazyMapping instances, 
+    so only the fields the templates refer to are computed.
+    Scene relations are looked up in the novel's shared index, if it has one.
+
+    Use it as the last base class of a FileExport subclass, 
+    so it comes directly before FileExport in the method resolution order:
+    class OdtWProofCnv(OdtWProof, FileExportCnv)
+
+    READS_SCENE_CONTENT tells the converter whether the export writes most of the scene contents.
+    If not, the project is read with the scene contents loaded on demand.
+
+    The text is generated in fragments, one per rendered template,
+    so it can be written without being held in memory as a whole.
+    """
+    READS_SCENE_CONTENT = False
+
+    _renderPlans = {}
+    # Compiled templates, shared by all exporters. Key: template text.
+
+    _novelIndex = None
+    # NovelIndex instance of the novel, fetched on first use.
+
+    def _render(self, template, get_mapping, *args):
+        """Return the substituted template text.
+        
+        Positional arguments:
+            template -- str: text with string.Template placeholders.
+            get_mapping -- method returning the mapping for the template.
+            args -- arguments for get_mapping.
+
+        Skip the mapping, if the template has no placeholders.
+        """
+        try:
+            renderPlan = self._renderPlans[template]
+        except KeyError:
+            renderPlan = RenderPlan(template)
+            self._renderPlans[template] = renderPlan
+        if renderPlan.isStatic:
+            return renderPlan.render({})
+
+        return renderPlan.render(get_mapping(*args))
+
+    def _get_novel_index(self):
+        """Return the novel's index, or None if the novel has none."""
+        if self._novelIndex is None:
+            get_index = getattr(self.novel, 'get_index', None)
+            if get_index is not None:
+                self._novelIndex = get_index()
+        return self._novelIndex
+
+    def _get_fileHeaderMapping(self):
+        """Return a mapping dictionary for the project section, computing the fields on demand.
+        
+        Overrides the superclass method.
+        """
+        convert = self._convert_from_yw
+        novel = self.novel
+        return LazyMapping(dict(
+            Title=lambda: convert(novel.title, True),
+            Desc=lambda: convert(novel.desc),
+            AuthorName=lambda: convert(novel.authorName, True),
+            AuthorBio=lambda: convert(novel.authorBio, True),
+            FieldTitle1=lambda: convert(novel.fieldTitle1, True),
+            FieldTitle2=lambda: convert(novel.fieldTitle2, True),
+            FieldTitle3=lambda: convert(novel.fieldTitle3, True),
+            FieldTitle4=lambda: convert(novel.fieldTitle4, True),
+            Language=lambda: novel.languageCode,
+            Country=lambda: novel.countryCode,
+        ))
+
+    def _get_chapterMapping(self, chId, chapterNumber):
+        """Return a mapping dictionary for a chapter section, computing the fields on demand. 
+        
+        Positional arguments:
+            chId -- str: chapter ID.
+            chapterNumber -- int: chapter number.
+        
+        Overrides the superclass method.
+        """
+        if chapterNumber == 0:
+            chapterNumber = ''
+        convert = self._convert_from_yw
+        chapter = self.novel.chapters[chId]
+        return LazyMapping(dict(
+            ID=lambda: chId,
+            ChapterNumber=lambda: chapterNumber,
+            Title=lambda: convert(chapter.title, True),
+            Desc=lambda: convert(chapter.desc),
+            ProjectName=lambda: convert(self.projectName, True),
+            ProjectPath=lambda: self.projectPath,
+            Language=lambda: self.novel.languageCode,
+            Country=lambda: self.novel.countryCode,
+        ))
+
+    def _get_chapters(self):
+        """Process the chapters and nested scenes.
+        
+        Return a list of strings.
+        Overrides the superclass method.
+        """
+        return list(self._get_chapter_fragments())
+
+    def _get_chapter_fragments(self):
+        """Generate the text fragments of the chapters and nested scenes."""
+        chapterNumber = 0
+        sceneNumber = 0
+        wordsTotal = 0
+        lettersTotal = 0
+        for chId in self.novel.srtChapters:
+            dispNumber = 0
+            if not self._chapterFilter.accept(self, chId):
+                continue
+
+            chapter = self.novel.chapters[chId]
+            sceneCount = 0
+            notExportCount = 0
+            doNotExport = False
+            template = None
+            for scId in chapter.srtScenes:
+                sceneCount += 1
+                if self.novel.scenes[scId].doNotExport:
+                    notExportCount += 1
+            if sceneCount > 0 and notExportCount == sceneCount:
+                doNotExport = True
+            if chapter.chType == 2:
+                if chapter.chLevel == 1:
+                    if self._todoPartTemplate:
+                        template = self._todoPartTemplate
+                elif self._todoChapterTemplate:
+                    template = self._todoChapterTemplate
+            elif chapter.chType == 1:
+                if chapter.chLevel == 1:
+                    if self._notesPartTemplate:
+                        template = self._notesPartTemplate
+                elif self._notesChapterTemplate:
+                    template = self._notesChapterTemplate
+            elif chapter.chType == 3:
+                if self._unusedChapterTemplate:
+                    template = self._unusedChapterTemplate
+            elif doNotExport:
+                if self._notExportedChapterTemplate:
+                    template = self._notExportedChapterTemplate
+            elif chapter.chLevel == 1 and self._partTemplate:
+                template = self._partTemplate
+            else:
+                template = self._chapterTemplate
+                chapterNumber += 1
+                dispNumber = chapterNumber
+            if template is not None:
+                yield self._render(template, self._get_chapterMapping, chId, dispNumber)
+
+            sceneNumber, wordsTotal, lettersTotal = yield from self._get_scene_fragments(
+                chId, sceneNumber, wordsTotal, lettersTotal, doNotExport)
+
+            template = None
+            if chapter.chType == 2:
+                if self._todoChapterEndTemplate:
+                    template = self._todoChapterEndTemplate
+            elif chapter.chType == 1:
+                if self._notesChapterEndTemplate:
+                    template = self._notesChapterEndTemplate
+            elif chapter.chType == 3:
+                if self._unusedChapterEndTemplate:
+                    template = self._unusedChapterEndTemplate
+            elif doNotExport:
+                if self._notExportedChapterEndTemplate:
+                    template = self._notExportedChapterEndTemplate
+            elif self._chapterEndTemplate:
+                template = self._chapterEndTemplate
+            if template is not None:
+                yield self._render(template, self._get_chapterMapping, chId, dispNumber)
+
+    def _get_characterMapping(self, crId):
+        """Return a mapping dictionary for a character section, computing the fields on demand.
+        
+        Positional arguments:
+            crId -- str: character ID.
+
+        Overrides the superclass method.
+        """
+        convert = self._convert_from_yw
+        character = self.novel.characters[crId]
+
+        def get_tags():
+            if character.tags is not None:
+                return convert(list_to_string(character.tags, divider=self._DIVIDER))
+
+            return convert('')
+
+        def get_status():
+            if character.isMajor:
+                return Character.MAJOR_MARKER
+
+            return Character.MINOR_MARKER
+
+        return LazyMapping(dict(
+            ID=lambda: crId,
+            Title=lambda: convert(character.title, True),
+            Desc=lambda: convert(character.desc),
+            Tags=get_tags,
+            Image=lambda: character.image,
+            AKA=lambda: convert(character.aka, True),
+            Notes=lambda: convert(character.notes),
+            Bio=lambda: convert(character.bio),
+            Goals=lambda: convert(character.goals),
+            FullName=lambda: convert(character.fullName, True),
+            Status=get_status,
+            ProjectName=lambda: convert(self.projectName),
+            ProjectPath=lambda: self.projectPath,
+        ))
+
+    def _get_characters(self):
+        """Process the characters.
+        
+        Return a list of strings.
+        Overrides the superclass method.
+        """
+        if self._characterSectionHeading:
+            lines = [self._characterSectionHeading]
+        else:
+            lines = []
+        for crId in self.novel.srtCharacters:
+            if self._characterFilter.accept(self, crId):
+                lines.append(self._render(self._characterTemplate, self._get_characterMapping, crId))
+        return lines
+
+    def _get_fileHeader(self):
+        """Process the file header.
+        
+        Return a list of strings.
+        Overrides the superclass method.
+        """
+        return [self._render(self._fileHeader, self._get_fileHeaderMapping)]
+
+    def _get_fragments(self):
+        """Generate the text fragments in file order.
+
+        If a class between the subclass and FileExportCnv overrides _get_text(),
+        generate the text of the overriding method as a single fragment.
+        """
+        if type(self)._get_text is not FileExportCnv._get_text:
+            yield self._get_text()
+            return
+
+        yield from self._get_fileHeader()
+        yield from self._get_chapter_fragments()
+        yield from self._get_characters()
+        yield from self._get_locations()
+        yield from self._get_items()
+        yield from self._get_projectNotes()
+        yield self._fileFooter
+
+    def _get_itemMapping(self, itId):
+        """Return a mapping dictionary for an item section, computing the fields on demand.
+        
+        Positional arguments:
+            itId -- str: item ID.
+
+        Overrides the superclass method.
+        """
+        return self._get_world_element_mapping(itId, self.novel.items[itId])
+
+    def _get_items(self):
+        """Process the items. 
+        
+        Return a list of strings.
+        Overrides the superclass method.
+        """
+        if self._itemSectionHeading:
+            lines = [self._itemSectionHeading]
+        else:
+            lines = []
+        for itId in self.novel.srtItems:
+            if self._itemFilter.accept(self, itId):
+                lines.append(self._render(self._itemTemplate, self._get_itemMapping, itId))
+        return lines
+
+    def _get_locationMapping(self, lcId):
+        """Return a mapping dictionary for a location section, computing the fields on demand.
+        
+        Positional arguments:
+            lcId -- str: location ID.
+
+        Overrides the superclass method.
+        """
+        return self._get_world_element_mapping(lcId, self.novel.locations[lcId])
+
+    def _get_locations(self):
+        """Process the locations.
+        
+        Return a list of strings.
+        Overrides the superclass method.
+        """
+        if self._locationSectionHeading:
+            lines = [self._locationSectionHeading]
+        else:
+            lines = []
+        for lcId in self.novel.srtLocations:
+            if self._locationFilter.accept(self, lcId):
+                lines.append(self._render(self._locationTemplate, self._get_locationMapping, lcId))
+        return lines
+
+    def _get_prjNoteMapping(self, pnId):
+        """Return a mapping dictionary for a project note, computing the fields on demand.
+        
+        Positional arguments:
+            pnId -- str: project note ID.
+
+        Overrides the superclass method.
+        """
+        convert = self._convert_from_yw
+        projectNote = self.novel.projectNotes[pnId]
+        return LazyMapping(dict(
+            ID=lambda: pnId,
+            Title=lambda: convert(projectNote.title, True),
+            Desc=lambda: convert(projectNote.desc, True),
+            ProjectName=lambda: convert(self.projectName, True),
+            ProjectPath=lambda: self.projectPath,
+        ))
+
+    def _get_projectNotes(self):
+        """Process the project notes. 
+        
+        Return a list of strings.
+        Overrides the superclass method.
+        """
+        lines = []
+        for pnId in self.novel.srtPrjNotes:
+            lines.append(self._render(self._projectNoteTemplate, self._get_prjNoteMapping, pnId))
+        return lines
+
+    def _get_sceneMapping(self, scId, sceneNumber, wordsTotal, lettersTotal):
+        """Return a mapping dictionary for a scene section, computing the fields on demand.
+        
+        Positional arguments:
+            scId -- str: scene ID.
+            sceneNumber -- int: scene number to be displayed.
+            wordsTotal -- int: accumulated wordcount.
+            lettersTotal -- int: accumulated lettercount.
+        
+        Overrides the superclass method.
+        """
+        if sceneNumber == 0:
+            sceneNumber = ''
+        convert = self._convert_from_yw
+        novel = self.novel
+        scene = novel.scenes[scId]
+
+        def get_tags():
+            if scene.tags is not None:
+                return convert(list_to_string(scene.tags, divider=self._DIVIDER), True)
+
+            return convert('', True)
+
+        def get_character_titles():
+            index = self._get_novel_index()
+            if index is not None:
+                return index.get_character_titles(novel, scId)
+
+            try:
+                return [novel.characters[crId].title for crId in scene.characters]
+
+            except:
+                return []
+
+        def get_characters():
+            return list_to_string(get_character_titles(), divider=self._DIVIDER)
+
+        def get_viewpoint():
+            characterTitles = get_character_titles()
+            if not characterTitles:
+                return ''
+
+            return characterTitles[0]
+
+        def get_locations():
+            if scene.locations is not None:
+                index = self._get_novel_index()
+                if index is not None:
+                    return list_to_string(index.get_location_titles(novel, scId), divider=self._DIVIDER)
+
+                return list_to_string([novel.locations[lcId].title for lcId in scene.locations], divider=self._DIVIDER)
+
+            return ''
+
+        def get_items():
+            if scene.items is not None:
+                index = self._get_novel_index()
+                if index is not None:
+                    return list_to_string(index.get_item_titles(novel, scId), divider=self._DIVIDER)
+
+                return list_to_string([novel.items[itId].title for itId in scene.items], divider=self._DIVIDER)
+
+            return ''
+
+        def get_reaction_scene():
+            if scene.isReactionScene:
+                return Scene.REACTION_MARKER
+
+            return Scene.ACTION_MARKER
+
+        def has_date():
+            return scene.date is not None and scene.date != Scene.NULL_DATE
+
+        def get_date():
+            if has_date():
+                return scene.date
+
+            return ''
+
+        def get_day():
+            if not has_date() and scene.day is not None:
+                return scene.day
+
+            return ''
+
+        def get_combined_date():
+            if has_date():
+                return scene.date
+
+            if scene.day is not None:
+                return f'Day {scene.day}'
+
+            return ''
+
+        def get_time():
+            if scene.time is not None:
+                return scene.time.rsplit(':', 1)[0]
+
+            return ''
+
+        def is_lasting(value):
+            return value is not None and value != '0'
+
+        def get_lasting(value):
+            if is_lasting(value):
+                return value
+
+            return ''
+
+        def get_duration():
+            duration = []
+            if is_lasting(scene.lastsDays):
+                duration.append(f'{scene.lastsDays}d ')
+            if is_lasting(scene.lastsHours):
+                duration.append(f'{scene.lastsHours}h ')
+            if is_lasting(scene.lastsMinutes):
+                duration.append(f'{scene.lastsMinutes}min')
+            return ''.join(duration)
+
+        return LazyMapping(dict(
+            ID=lambda: scId,
+            SceneNumber=lambda: sceneNumber,
+            Title=lambda: convert(scene.title, True),
+            Desc=lambda: convert(scene.desc),
+            WordCount=lambda: str(scene.wordCount),
+            WordsTotal=lambda: wordsTotal,
+            LetterCount=lambda: str(scene.letterCount),
+            LettersTotal=lambda: lettersTotal,
+            Status=lambda: Scene.STATUS[scene.status],
+            SceneContent=lambda: convert(scene.sceneContent),
+            FieldTitle1=lambda: convert(novel.fieldTitle1, True),
+            FieldTitle2=lambda: convert(novel.fieldTitle2, True),
+            FieldTitle3=lambda: convert(novel.fieldTitle3, True),
+            FieldTitle4=lambda: convert(novel.fieldTitle4, True),
+            Field1=lambda: scene.field1,
+            Field2=lambda: scene.field2,
+            Field3=lambda: scene.field3,
+            Field4=lambda: scene.field4,
+            Date=get_date,
+            Time=get_time,
+            Day=get_day,
+            ScDate=get_combined_date,
+            LastsDays=lambda: get_lasting(scene.lastsDays),
+            LastsHours=lambda: get_lasting(scene.lastsHours),
+            LastsMinutes=lambda: get_lasting(scene.lastsMinutes),
+            Duration=get_duration,
+            ReactionScene=get_reaction_scene,
+            Goal=lambda: convert(scene.goal),
+            Conflict=lambda: convert(scene.conflict),
+            Outcome=lambda: convert(scene.outcome),
+            Tags=get_tags,
+            Image=lambda: scene.image,
+            Characters=get_characters,
+            Viewpoint=get_viewpoint,
+            Locations=get_locations,
+            Items=get_items,
+            Notes=lambda: convert(scene.notes),
+            ProjectName=lambda: convert(self.projectName, True),
+            ProjectPath=lambda: self.projectPath,
+            Language=lambda: novel.languageCode,
+            Country=lambda: novel.countryCode,
+        ))
+
+    def _get_scenes(self, chId, sceneNumber, wordsTotal, lettersTotal, doNotExport):
+        """Process the scenes.
+        
+        Positional arguments:
+            chId -- str: chapter ID.
+            sceneNumber -- int: number of previously processed scenes.
+            wordsTotal -- int: accumulated wordcount of the previous scenes.
+            lettersTotal -- int: accumulated lettercount of the previous scenes.
+            doNotExport -- bool: True if the chapter is marked "Do not export".
+        
+        Return a tuple:
+            lines -- list of strings: the lines of the processed scene.
+            sceneNumber -- int: number of all processed scenes.
+            wordsTotal -- int: accumulated wordcount of all processed scenes.
+            lettersTotal -- int: accumulated lettercount of all processed scenes.
+        
+        Overrides the superclass method.
+        """
+        lines = []
+        sceneFragments = self._get_scene_fragments(chId, sceneNumber, wordsTotal, lettersTotal, doNotExport)
+        while True:
+            try:
+                lines.append(next(sceneFragments))
+            except StopIteration as totals:
+                sceneNumber, wordsTotal, lettersTotal = totals.value
+                return lines, sceneNumber, wordsTotal, lettersTotal
+
+    def _get_scene_fragments(self, chId, sceneNumber, wordsTotal, lettersTotal, doNotExport):
+        """Generate the text fragments of a chapter's scenes.
+        
+        Positional arguments:
+            chId -- str: chapter ID.
+            sceneNumber -- int: number of previously processed scenes.
+            wordsTotal -- int: accumulated wordcount of the previous scenes.
+            lettersTotal -- int: accumulated lettercount of the previous scenes.
+            doNotExport -- bool: True if the chapter is marked "Do not export".
+        
+        Return a tuple when exhausted, i.e. as the value of "yield from":
+            sceneNumber -- int: number of all processed scenes.
+            wordsTotal -- int: accumulated wordcount of all processed scenes.
+            lettersTotal -- int: accumulated lettercount of all processed scenes.
+        """
+        firstSceneInChapter = True
+        for scId in self.novel.chapters[chId].srtScenes:
+            dispNumber = 0
+            if not self._sceneFilter.accept(self, scId):
+                continue
+
+            scene = self.novel.scenes[scId]
+            sceneContent = scene.sceneContent
+            if sceneContent is None:
+                sceneContent = ''
+
+            if scene.scType == 2:
+                if self._todoSceneTemplate:
+                    template = self._todoSceneTemplate
+                else:
+                    continue
+
+            elif scene.scType == 1:
+                if self._notesSceneTemplate:
+                    template = self._notesSceneTemplate
+                else:
+                    continue
+
+            elif scene.scType == 3 or self.novel.chapters[chId].chType == 3:
+                if self._unusedSceneTemplate:
+                    template = self._unusedSceneTemplate
+                else:
+                    continue
+
+            elif scene.doNotExport or doNotExport:
+                if self._notExportedSceneTemplate:
+                    template = self._notExportedSceneTemplate
+                else:
+                    continue
+
+            elif sceneContent.startswith('<HTML>'):
+                continue
+
+            elif sceneContent.startswith('<TEX>'):
+                continue
+
+            else:
+                sceneNumber += 1
+                dispNumber = sceneNumber
+                wordsTotal += scene.wordCount
+                lettersTotal += scene.letterCount
+                template = self._sceneTemplate
+                if not firstSceneInChapter and scene.appendToPrev and self._appendedSceneTemplate:
+                    template = self._appendedSceneTemplate
+            if not (firstSceneInChapter or scene.appendToPrev):
+                yield self._sceneDivider
+            if firstSceneInChapter and self._firstSceneTemplate:
+                template = self._firstSceneTemplate
+            yield self._render(template, self._get_sceneMapping, scId, dispNumber, wordsTotal, lettersTotal)
+            firstSceneInChapter = False
+        return sceneNumber, wordsTotal, lettersTotal
+
+    def _get_text(self):
+        """Return the file's text as a string.
+
+        Overrides the superclass method.
+        """
+        return ''.join(self._get_fragments())
+
+    def _get_world_element_mapping(self, elemId, element):
+        """Return a mapping dictionary for a location or item section, computing the fields on demand.
+        
+        Positional arguments:
+            elemId -- str: location or item ID.
+            element -- WorldElement instance.
+        """
+        convert = self._convert_from_yw
+
+        def get_tags():
+            if element.tags is not None:
+                return convert(list_to_string(element.tags, divider=self._DIVIDER), True)
+
+            return convert('', True)
+
+        return LazyMapping(dict(
+            ID=lambda: elemId,
+            Title=lambda: convert(element.title, True),
+            Desc=lambda: convert(element.desc),
+            Tags=get_tags,
+            Image=lambda: element.image,
+            AKA=lambda: convert(element.aka, True),
+            ProjectName=lambda: convert(self.projectName, True),
+            ProjectPath=lambda: self.projectPath,
+        ))
+
+    def _remove_inline_code(self, text):
+        """Return text without inline code.
+
+        Positional arguments:
+            text -- string to process.
+
+        Skip the text, if it contains no inline code at all.
+        Extends the superclass method.
+        """
+        if text and '<' not in text:
+            return text
+
+        return super()._remove_inline_code(text)
@@ -0,0 +1,36 @@
+"""Provide a dictionary class that computes its values on demand.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-cnv
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+
+
+class LazyMapping(dict):
+    """Dictionary that computes missing values on first access.
+
+    Values that are set explicitly override the computed ones,
+    so subclasses of the exporters can still modify the template mappings.
+    """
+
+    def __init__(self, getters):
+        """Initialize an empty dictionary.
+        
+        Positional arguments:
+            getters -- dictionary: key, function without arguments that returns the value.
+        """
+        super().__init__()
+        self._getters = getters
+
+    def __contains__(self, key):
+        """Return True if key is set or can be computed."""
+        return super().__contains__(key) or key in self._getters
+
+    def __missing__(self, key):
+        """Compute, store, and return the value for key.
+        
+        Raise KeyError if key is unknown.
+        """
+        value = self._getters[key]()
+        self[key] = value
+        return value
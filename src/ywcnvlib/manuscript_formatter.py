@@ -0,0 +1,158 @@
+"""Provide a class for reformatting marked-up paragraphs of a Writer document.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-cnv
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import re
+from pywriter.pywriter_globals import *
+
+
+class ManuscriptFormatter:
+    """Reformat the marked-up paragraphs of a Writer document via the document model.
+
+    Public methods:
+        to_blank_lines() -- Replace scene dividers with blank lines.
+        indent_paragraphs() -- Indent paragraphs that start with '> '.
+        replace_bullets() -- Replace list strokes with bullets.
+        post_process() -- Do all of the above in one pass.
+
+    Public instance variables:
+        document -- Writer document model, e.g. XSCRIPTCONTEXT.getDocument().
+
+    All changes of a method call are made with the controllers locked,
+    and form a single undo step.
+    The view cursor and the search options of the user interface are not touched.
+    Only the document model's search, style, and text range interfaces are used,
+    so the class can be run against a stub document.
+    """
+    DIVIDER = '* * *'
+    # Scene divider paragraph text.
+
+    QUOTATION_MARKER = '> '
+    # Beginning of a quotation paragraph.
+
+    LIST_MARKER = '- '
+    # Beginning of a list paragraph.
+
+    DIVIDER_STYLE = 'Heading 4'
+    # Paragraph style of the exported scene dividers.
+
+    BLANK_LINE_STYLE = 'Heading 5'
+    # Paragraph style of the scene dividing blank lines.
+
+    QUOTATION_STYLE = 'Quotations'
+    # Paragraph style of the quotation paragraphs.
+
+    LIST_STYLE = 'List 1'
+    # Numbering style of the bulleted list paragraphs.
+
+    def __init__(self, document):
+        """Initialize instance variables.
+
+        Positional arguments:
+            document -- Writer document model.
+        """
+        self.document = document
+
+    def to_blank_lines(self):
+        """Replace scene dividers with blank lines.
+
+        Replace the three-lines "* * *" scene dividers with single blank lines.
+        Change the style of the scene-dividing paragraphs from  _Heading 4_  to  _Heading 5_.
+        """
+        self._run(_('Replace scene dividers with blank lines'), blankLines=True)
+
+    def indent_paragraphs(self):
+        """Indent paragraphs that start with '> '.
+
+        Change the paragraph style of all paragraphs that start with '> ' to _Quotations_,
+        and delete the markup.
+        """
+        self._run(_('Indent paragraphs'), quotations=True)
+
+    def replace_bullets(self):
+        """Replace list strokes with bullets.
+
+        Apply a list style to all paragraphs that start with '- ',
+        and delete the list strokes.
+        """
+        self._run(_('Replace list strokes with bullets'), bullets=True)
+
+    def post_process(self):
+        """Replace scene dividers, indent quotations, and replace list strokes in one pass."""
+        self._run(_('Post-process manuscript'), blankLines=True, quotations=True, bullets=True)
+
+    def _run(self, title, blankLines=False, quotations=False, bullets=False):
+        """Reformat the document as one undo step, with the controllers locked.
+
+        Positional arguments:
+            title -- str: title of the undo step.
+
+        Optional arguments:
+            blankLines -- bool: if True, replace the scene dividers with blank lines.
+            quotations -- bool: if True, indent the paragraphs that start with '> '.
+            bullets -- bool: if True, replace the list strokes with bullets.
+        """
+        undoManager = self.document.getUndoManager()
+        self.document.lockControllers()
+        undoManager.enterUndoContext(title)
+        try:
+            if blankLines:
+                self._replace_style(self.DIVIDER_STYLE, self.BLANK_LINE_STYLE)
+            self._format_paragraphs(blankLines, quotations, bullets)
+        finally:
+            undoManager.leaveUndoContext()
+            self.document.unlockControllers()
+
+    def _replace_style(self, oldStyle, newStyle):
+        """Assign another paragraph style to all paragraphs of a style.
+
+        Positional arguments:
+            oldStyle -- str: name of the paragraph style to be replaced.
+            newStyle -- str: name of the replacing paragraph style.
+        """
+        paragraphStyles = self.document.getStyleFamilies().getByName('ParagraphStyles')
+        replaceDescriptor = self.document.createReplaceDescriptor()
+        replaceDescriptor.SearchStyles = True
+        replaceDescriptor.setSearchString(paragraphStyles.getByName(oldStyle).DisplayName)
+        replaceDescriptor.setReplaceString(paragraphStyles.getByName(newStyle).DisplayName)
+        self.document.replaceAll(replaceDescriptor)
+
+    def _format_paragraphs(self, blankLines, quotations, bullets):
+        """Find the marked-up paragraphs with a single search, and reformat them.
+
+        Positional arguments:
+            blankLines -- bool: if True, empty the divider paragraphs of the blank line style.
+            quotations -- bool: if True, apply the quotation style to paragraphs starting with '> '.
+            bullets -- bool: if True, apply the list style to paragraphs starting with '- '.
+        """
+        patterns = []
+        if blankLines:
+            patterns.append(f'{re.escape(self.DIVIDER)}$')
+        if quotations:
+            patterns.append(re.escape(self.QUOTATION_MARKER))
+        if bullets:
+            patterns.append(re.escape(self.LIST_MARKER))
+        if not patterns:
+            return
+
+        searchDescriptor = self.document.createSearchDescriptor()
+        searchDescriptor.SearchRegularExpression = True
+        searchDescriptor.setSearchString(f'^(?:{"|".join(patterns)})')
+        foundRanges = self.document.findAll(searchDescriptor)
+        for i in range(foundRanges.getCount()):
+            foundRange = foundRanges.getByIndex(i)
+            text = foundRange.getString()
+            if text == self.DIVIDER:
+                if foundRange.ParaStyleName != self.BLANK_LINE_STYLE:
+                    continue
+
+            elif text == self.QUOTATION_MARKER:
+                foundRange.ParaStyleName = self.QUOTATION_STYLE
+            elif text == self.LIST_MARKER:
+                foundRange.NumberingStyleName = self.LIST_STYLE
+            else:
+                continue
+
+            foundRange.setString('')
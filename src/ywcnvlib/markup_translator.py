@@ -0,0 +1,115 @@
+"""Provide a class for single-pass yWriter-to-ODF markup translation.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-cnv
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import re
+
+CLEANUP_PATTERN = r'\[\/*[h|c|r|s|u]\d*\]'
+# yWriter markup without ODF counterpart, to be discarded.
+
+SAFE_LANGUAGE = re.compile(r'[\w\-]*')
+# Language codes that cannot interfere with other markup.
+
+
+class MarkupTranslator:
+    """yWriter markup translation table, compiled for one language set.
+
+    Public methods:
+        translate(text) -- Return text with yWriter markup converted to ODF XML.
+
+    The translation gives the same result as the OdtWFormatted replacement sequence:
+    - Balance the [tag] [/tag] pairs line by line.
+    - Apply the replacements in the given order.
+    - Discard yWriter markup without ODF counterpart.
+
+    Instead of one pass per replacement, all replacements are done
+    in a single pass with a precompiled regular expression.
+    """
+
+    def __init__(self, tags, replacements):
+        """Compile the replacement table.
+
+        Positional arguments:
+            tags -- list of tag names to be balanced line by line, e.g. 'i' for [i]...[/i].
+            replacements -- list of (yWriter markup, ODF XML) tuples, in order of application.
+
+        Replacements preceding the carriage return replacement
+        get their carriage returns converted, as if they had been applied one by one.
+        """
+        self._tags = [(tag, f'[{tag}]', f'[/{tag}]') for tag in tags]
+        self._table = {}
+        convertCr = ('\r', '\n') in replacements
+        for yw, od in replacements:
+            if (yw, od) == ('\r', '\n'):
+                convertCr = False
+            elif convertCr:
+                od = od.replace('\r', '\n')
+            self._table.setdefault(yw, od)
+            # The first replacement wins, as it leaves nothing for the following ones.
+        patterns = []
+        for yw in sorted(self._table, key=len, reverse=True):
+            if yw == '*/' and '/*' in self._table:
+                patterns.append(r'\*/(?!\*)')
+                # In "*/*", the comment opening is replaced first.
+            else:
+                patterns.append(re.escape(yw))
+        patterns.append(CLEANUP_PATTERN)
+        patterns = '|'.join(patterns)
+        self._regex = re.compile(f'({patterns})')
+        # The markup is captured, so splitting yields text and markup alternately.
+
+    def translate(self, text):
+        """Return text with yWriter markup converted to ODF XML.
+
+        Positional arguments:
+            text -- str: scene content or description with yWriter markup.
+        """
+        newlines = []
+        isOpen = set()
+        for line in text.split('\n'):
+            if isOpen or '[' in line:
+                for tag, opening, closing in self._tags:
+                    if not (tag in isOpen or opening in line or closing in line):
+                        continue
+
+                    if tag in isOpen:
+                        if line.startswith('&gt; '):
+                            line = f"&gt; {opening}{line.lstrip('&gt; ')}"
+                        else:
+                            line = f'{opening}{line}'
+                        isOpen.discard(tag)
+                    while line.count(opening) > line.count(closing):
+                        line = f'{line}{closing}'
+                        isOpen.add(tag)
+                    while line.count(closing) > line.count(opening):
+                        line = f'{opening}{line}'
+                    line = line.replace(f'{opening}{closing}', '')
+            newlines.append(line)
+        text = '\n'.join(newlines).rstrip()
+        parts = self._regex.split(text)
+        get = self._table.get
+        parts[1::2] = [get(markup, '') for markup in parts[1::2]]
+        return ''.join(parts)
+
+    @staticmethod
+    def is_translatable(languages, authorName):
+        """Return True if the markup can be translated in a single pass.
+
+        Positional arguments:
+            languages -- list of the language codes used.
+            authorName -- str: name inserted into the comments.
+
+        Otherwise the replacements must be applied one by one,
+        because their results may contain markup again.
+        """
+        if len(set(languages)) != len(languages):
+            return False
+
+        for language in languages:
+            if not SAFE_LANGUAGE.fullmatch(language):
+                return False
+
+        authorName = str(authorName)
+        return not ('[' in authorName or '*/' in authorName)
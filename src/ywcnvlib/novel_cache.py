@@ -0,0 +1,311 @@
+"""Provide a two-tier cache class for parsed yWriter projects.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-cnv
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import os
+import copy
+import hashlib
+import io
+import json
+import pickle
+import threading
+import zlib
+from collections import OrderedDict
+from ywcnvlib.element_cnv import get_state
+from ywcnvlib.element_cnv import set_state
+
+CACHE_FORMAT = 6
+# Increment when the snapshot layout or the model classes change.
+
+
+class NovelCache:
+    """Two-tier cache for parsed yWriter projects.
+
+    Public methods:
+        get_signature(filePath) -- Return a tuple with the current file size and modification time.
+        restore(filePath, signature, novel) -- Fill novel from a cached snapshot.
+        store(filePath, signature, novel) -- Save a snapshot of novel.
+        clear() -- Discard the in-process snapshots.
+
+    Public instance variables:
+        cacheDir -- str: directory for the on-disk snapshots. If None, use only the in-process tier.
+        maxEntries -- int: maximum number of in-process snapshots.
+        maxBytes -- int: maximum total project file size of the in-process snapshots.
+        maxDiskEntries -- int: maximum number of on-disk snapshots.
+        maxDiskBytes -- int: maximum total size of the on-disk snapshots.
+
+    A snapshot is the state of a Novel instance after reading.
+    It is valid as long as path, size, modification time and content hash
+    of the project file are unchanged.
+    The content hash is computed only if size and modification time are unchanged,
+    so a changed file is detected without reading it.
+    Restoring creates a new copy, so the novel can be modified freely.
+    The in-process tier is a least recently used list of novel states.
+    The on-disk tier keeps compressed snapshots, one file per project.
+    A snapshot file starts with a JSON header line holding format, key, signature, and content hash,
+    followed by the compressed pickled state.
+    Model objects are stored by class name, so the snapshots do not depend
+    on the module the classes are defined in. No other classes or functions
+    are loaded, so a snapshot file cannot run code when read.
+    Any error with a snapshot is treated as a cache miss.
+    The in-process tier can be used by several threads at once.
+    """
+    _SUFFIX = '.ywcache'
+
+    def __init__(self, modelClasses, cacheDir=None, maxEntries=4, maxBytes=0x4000000,
+                 maxDiskEntries=16, maxDiskBytes=0x10000000):
+        """Initialize instance variables.
+
+        Positional arguments:
+            modelClasses -- list of the classes that occur in the novel's state, e.g. Chapter.
+
+        Optional arguments:
+            cacheDir -- str: directory for the on-disk snapshots. If None, use only the in-process tier.
+            maxEntries -- int: maximum number of in-process snapshots.
+            maxBytes -- int: maximum total project file size of the in-process snapshots.
+            maxDiskEntries -- int: maximum number of on-disk snapshots.
+            maxDiskBytes -- int: maximum total size of the on-disk snapshots.
+        """
+        self.cacheDir = cacheDir
+        self.maxEntries = maxEntries
+        self.maxBytes = maxBytes
+        self.maxDiskEntries = maxDiskEntries
+        self.maxDiskBytes = maxDiskBytes
+        self._modelClasses = {modelClass.__name__: modelClass for modelClass in modelClasses}
+        self._snapshots = OrderedDict()
+        # key: normalized file path; value: (signature, content hash, novel state)
+        self._lock = threading.Lock()
+        # Guards the in-process tier. The snapshot states are never modified, so they are copied without lock.
+
+    def clear(self):
+        """Discard the in-process snapshots."""
+        with self._lock:
+            self._snapshots.clear()
+
+    def get_signature(self, filePath):
+        """Return a tuple with the current file size and modification time, or None if the file does not exist.
+
+        Positional arguments:
+            filePath -- str: path to the project file.
+        """
+        try:
+            status = os.stat(filePath)
+        except OSError:
+            return None
+
+        return (status.st_size, status.st_mtime_ns)
+
+    def restore(self, filePath, signature, novel):
+        """Fill novel from a cached snapshot. Return True on success, otherwise False.
+
+        Positional arguments:
+            filePath -- str: path to the project file.
+            signature -- tuple returned by get_signature().
+            novel -- Novel instance to be filled.
+        """
+        if signature is None:
+            return False
+
+        key = self._get_key(filePath)
+        with self._lock:
+            snapshot = self._snapshots.get(key, None)
+            if snapshot is not None and snapshot[0] != signature:
+                del self._snapshots[key]
+                snapshot = None
+        contentHash = None
+        state = None
+        if snapshot is not None:
+            contentHash = self._get_content_hash(filePath)
+            if contentHash is not None and contentHash == snapshot[1]:
+                state = snapshot[2]
+                with self._lock:
+                    if key in self._snapshots:
+                        self._snapshots.move_to_end(key)
+        if state is None:
+            snapshot = self._load(filePath, key, signature, contentHash)
+            if snapshot is None:
+                return False
+
+            contentHash, state = snapshot
+            self._remember(key, signature, contentHash, state)
+        novel.__dict__.update(copy.deepcopy(state))
+        return True
+
+    def store(self, filePath, signature, novel):
+        """Save a snapshot of novel in both tiers.
+
+        Positional arguments:
+            filePath -- str: path to the project file.
+            signature -- tuple returned by get_signature().
+            novel -- Novel instance that has just been read from the file.
+
+        Do not save the snapshot, if the file has changed while being read.
+        """
+        if signature is None:
+            return
+
+        contentHash = self._get_content_hash(filePath)
+        if contentHash is None or self.get_signature(filePath) != signature:
+            return
+
+        key = self._get_key(filePath)
+        state = copy.deepcopy(novel.__dict__)
+        self._remember(key, signature, contentHash, state)
+        self._save(key, signature, contentHash, state)
+
+    def _get_content_hash(self, filePath):
+        """Return the hexadecimal SHA-1 digest of the file content, or None if the file cannot be read."""
+        try:
+            contentHash = hashlib.sha1()
+            with open(filePath, 'rb') as f:
+                for chunk in iter(lambda: f.read(0x100000), b''):
+                    contentHash.update(chunk)
+        except OSError:
+            return None
+
+        return contentHash.hexdigest()
+
+    def _get_key(self, filePath):
+        """Return the normalized absolute path of the project file."""
+        return os.path.normcase(os.path.realpath(filePath))
+
+    def _get_header(self, key, signature):
+        """Return the header of the on-disk snapshot without the content hash, as a JSON compatible dictionary."""
+        return {'format': CACHE_FORMAT, 'key': key, 'signature': list(signature)}
+
+    def _get_snapshot_path(self, key):
+        """Return the path of the on-disk snapshot for the project file."""
+        return f'{self.cacheDir}/{hashlib.sha1(key.encode("utf-8")).hexdigest()}{self._SUFFIX}'
+
+    def _remember(self, key, signature, contentHash, state):
+        """Put a snapshot into the in-process tier, evicting the least recently used ones."""
+        with self._lock:
+            self._snapshots[key] = (signature, contentHash, state)
+            self._snapshots.move_to_end(key)
+            totalBytes = sum(entry[0][0] for entry in self._snapshots.values())
+            while self._snapshots and (len(self._snapshots) > self.maxEntries or totalBytes > self.maxBytes):
+                __, (evictedSignature, __, __) = self._snapshots.popitem(last=False)
+                totalBytes -= evictedSignature[0]
+
+    def _load(self, filePath, key, signature, contentHash):
+        """Return a tuple (content hash, novel state) from the on-disk tier, or None.
+
+        Positional arguments:
+            filePath -- str: path to the project file.
+            key -- str: normalized path to the project file.
+            signature -- tuple returned by get_signature().
+            contentHash -- str: content hash of the project file, or None if not computed yet.
+        """
+        if self.cacheDir is None:
+            return None
+
+        snapshotPath = self._get_snapshot_path(key)
+        try:
+            with open(snapshotPath, 'rb') as f:
+                header = json.loads(f.readline())
+                cachedHash = header.pop('hash')
+                if header != self._get_header(key, signature):
+                    return None
+
+                if contentHash is None:
+                    contentHash = self._get_content_hash(filePath)
+                if contentHash != cachedHash:
+                    return None
+
+                compressed = f.read()
+            state = SnapshotUnpickler(io.BytesIO(zlib.decompress(compressed)), self._modelClasses).load()
+            os.utime(snapshotPath)
+        except Exception:
+            return None
+
+        return contentHash, state
+
+    def _save(self, key, signature, contentHash, state):
+        """Write a compressed snapshot to the on-disk tier, evicting the least recently used ones."""
+        if self.cacheDir is None:
+            return
+
+        snapshotPath = self._get_snapshot_path(key)
+        tempPath = f'{snapshotPath}.{os.getpid()}-{threading.get_ident()}.tmp'
+        # Each writer has its own temporary file, so concurrent writers do not interfere.
+        try:
+            data = io.BytesIO()
+            SnapshotPickler(data, self._modelClasses).dump(state)
+            os.makedirs(self.cacheDir, exist_ok=True)
+            with open(tempPath, 'wb') as f:
+                header = self._get_header(key, signature)
+                header['hash'] = contentHash
+                f.write(json.dumps(header).encode('utf-8'))
+                f.write(b'\n')
+                f.write(zlib.compress(data.getvalue(), 1))
+            os.replace(tempPath, snapshotPath)
+            snapshots = []
+            for entry in os.scandir(self.cacheDir):
+                if entry.name.endswith(self._SUFFIX):
+                    status = entry.stat()
+                    snapshots.append((status.st_mtime, status.st_size, entry.path))
+            snapshots.sort()
+            totalBytes = sum(snapshot[1] for snapshot in snapshots)
+            while snapshots and (len(snapshots) > self.maxDiskEntries or totalBytes > self.maxDiskBytes):
+                __, size, path = snapshots.pop(0)
+                os.remove(path)
+                totalBytes -= size
+        except Exception:
+            pass
+
+
+class SnapshotPickler(pickle.Pickler):
+    """Pickler that stores model objects by class name and state."""
+
+    def __init__(self, file, modelClasses):
+        """Initialize the pickler.
+
+        Positional arguments:
+            file -- binary file to write to.
+            modelClasses -- dictionary of the model classes. Key: class name.
+        """
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self._classNames = {modelClass: className for className, modelClass in modelClasses.items()}
+
+    def persistent_id(self, obj):
+        """Return the class name and state of model objects, otherwise None."""
+        try:
+            return (self._classNames[obj.__class__], get_state(obj))
+
+        except KeyError:
+            return None
+
+
+class SnapshotUnpickler(pickle.Unpickler):
+    """Unpickler that recreates model objects from class name and state.
+
+    Global classes and functions are refused, so only model objects
+    and built-in containers and values can be loaded.
+    """
+
+    def __init__(self, file, modelClasses):
+        """Initialize the unpickler.
+
+        Positional arguments:
+            file -- binary file to read from.
+            modelClasses -- dictionary of the model classes. Key: class name.
+        """
+        super().__init__(file)
+        self._modelClasses = modelClasses
+
+    def persistent_load(self, pid):
+        """Return a new model object with the stored state."""
+        className, state = pid
+        modelClass = self._modelClasses[className]
+        obj = modelClass.__new__(modelClass)
+        set_state(obj, state)
+        return obj
+
+    def find_class(self, module, name):
+        """Refuse to load any global.
+
+        Overrides the superclass method.
+        """
+        raise pickle.UnpicklingError(f'Global not allowed: {module}.{name}')
@@ -0,0 +1,133 @@
+"""Provide a novel class with batch word counting, a cached language index, ID allocation, a shared index, and statistics.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-cnv
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+from concurrent.futures import ProcessPoolExecutor
+from pywriter.model.novel import Novel
+from ywcnvlib.scene_cnv import count_words
+from ywcnvlib.scene_cnv import get_languages
+from ywcnvlib.novel_index import NovelIndex
+from ywcnvlib.novel_statistics import NovelStatistics
+
+
+class NovelCnv(Novel):
+    """Novel representation with batch word counting, a cached language index, ID allocation, a shared index, and statistics.
+    
+    Public methods:
+        count_words(maxWorkers) -- Count words and letters of all scenes that are not up to date.
+        get_languages() -- Determine the languages used in the document.
+        get_new_id(collection) -- Return an unused ID for a new element.
+        get_index() -- Return the up-to-date cross reference and lookup index.
+        get_statistics(maxWorkers) -- Return the up-to-date project statistics.
+    """
+
+    def __init__(self):
+        """Initialize instance variables.
+
+        Extends the superclass constructor.
+        """
+        super().__init__()
+        self._nextIds = {}
+        # Lowest ID that may be free, per element collection.
+        self._index = None
+        # NovelIndex instance, built on first request.
+        self._statistics = None
+        # NovelStatistics instance, built on first request.
+
+    def get_new_id(self, collection):
+        """Return an unused ID for a new element.
+
+        Positional arguments:
+            collection -- str: name of the element dictionary, e.g. 'scenes' or 'chapters'.
+
+        The search continues where the last one stopped, so allocating many IDs
+        takes linear time in total. The ID is the same as returned by create_id(),
+        as long as no elements are removed.
+        """
+        elements = getattr(self, collection)
+        i = self._nextIds.get(collection, 1)
+        while str(i) in elements:
+            i += 1
+        self._nextIds[collection] = i
+        return str(i)
+
+    def get_index(self):
+        """Return the up-to-date cross reference and lookup index.
+
+        The index is built on the first call, and updated incrementally on subsequent calls.
+        It is kept with the novel's data, so it can be shared by all exporters.
+        """
+        if self._index is None:
+            self._index = NovelIndex()
+        self._index.generate_xref(self)
+        return self._index
+
+    def get_statistics(self, maxWorkers=None):
+        """Return the up-to-date project statistics.
+
+        Optional arguments:
+            maxWorkers -- int: number of worker processes for counting words. If not set, count in this process.
+
+        Count the words of the scenes that are not up to date.
+        The statistics are built on the first call, and updated incrementally on subsequent calls.
+        """
+        self.count_words(maxWorkers)
+        if self._statistics is None:
+            self._statistics = NovelStatistics()
+        self._statistics.update(self)
+        return self._statistics
+
+    def get_languages(self):
+        """Determine the languages used in the document.
+        
+        Populate the self.languages list with all language codes found in the scene contents,
+        in order of appearance.
+        Scan each scene content at most once, using the language list cached by SceneCnv.
+        Overrides the superclass method.
+        """
+        self.languages = []
+        knownLanguages = set()
+        for scId in self.scenes:
+            scene = self.scenes[scId]
+            try:
+                sceneLanguages = scene.languages
+            except AttributeError:
+                sceneLanguages = get_languages(scene.sceneContent)
+            for language in sceneLanguages:
+                if not language in knownLanguages:
+                    knownLanguages.add(language)
+                    self.languages.append(language)
+
+    def count_words(self, maxWorkers=None):
+        """Count words and letters of all scenes that are not up to date in one batch.
+
+        Optional arguments:
+            maxWorkers -- int: number of worker processes. If not set, count in this process.
+
+        Only SceneCnv instances can be outdated. 
+        Do not use worker processes within the office application, 
+        because they would start new instances of the office executable.
+        Scene contents read on demand are not kept in memory.
+        """
+        scIds = [scId for scId in self.scenes if not getattr(self.scenes[scId], 'isCounted', True)]
+        texts = map(self._get_scene_content, scIds)
+        if maxWorkers and len(scIds) > 1:
+            chunkSize = max(1, len(scIds) // (maxWorkers * 4))
+            with ProcessPoolExecutor(max_workers=maxWorkers) as executor:
+                counts = list(executor.map(count_words, texts, chunksize=chunkSize))
+        else:
+            counts = map(count_words, texts)
+        for scId, (wordCount, letterCount) in zip(scIds, counts):
+            self.scenes[scId].wordCount = wordCount
+            self.scenes[scId].letterCount = letterCount
+
+    def _get_scene_content(self, scId):
+        """Return a scene's content, without keeping a content read on demand."""
+        scene = self.scenes[scId]
+        get_content = getattr(scene, '_get_content', None)
+        if get_content is not None:
+            return get_content()
+
+        return scene.sceneContent
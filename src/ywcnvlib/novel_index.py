@@ -0,0 +1,285 @@
+"""Provide a class for cross references and lookups shared by all exporters.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-cnv
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+from pywriter.model.cross_references import CrossReferences
+
+
+class NovelIndex(CrossReferences):
+    """Inverted indexes of a novel, built once and updated incrementally.
+
+    Public methods:
+        generate_xref(novel) -- Build the index, or update it if it is already built.
+        get_character_titles(novel, scId) -- Return a list of the titles of the scene's characters.
+        get_location_titles(novel, scId) -- Return a list of the titles of the scene's locations.
+        get_item_titles(novel, scId) -- Return a list of the titles of the scene's items.
+
+    Public instance variables (in addition to the CrossReferences ones):
+        sceneNumbers -- dict: position of each scene within the novel, starting at 1. Key: scene ID.
+        chapterNumbers -- dict: position of each chapter within the novel, starting at 1. Key: chapter ID.
+        viewpoints -- dict: ID of the viewpoint character, or None. Key: scene ID.
+        scnPerViewpoint -- dict: list of scene IDs. Key: ID of the viewpoint character.
+
+    The index reflects the state of the novel at the last call of generate_xref().
+    If only the relations or tags of scenes and world elements have changed since,
+    only the affected entries are updated.
+    If chapters, scenes, or world elements have been added, removed, or rearranged,
+    the index is rebuilt.
+    The title lookups are computed on first use, and kept until the titles change.
+    The index holds no reference to the novel, so it can be cached with the novel's data.
+    """
+
+    def __init__(self):
+        """Initialize instance variables.
+
+        Extends the superclass constructor.
+        """
+        super().__init__()
+        self.sceneNumbers = {}
+        self.chapterNumbers = {}
+        self.viewpoints = {}
+        self.scnPerViewpoint = {}
+        self._structure = None
+        self._sceneKeys = {}
+        self._elementKeys = {}
+        self._titles = {}
+        # Title lists per scene. Key: collection name; value: dictionary with the scene IDs as keys.
+
+    def generate_xref(self, novel):
+        """Build the index, or update it if it is already built.
+
+        Positional arguments:
+            novel -- Novel instance to be indexed.
+
+        Overrides the superclass method.
+        """
+        structure = self._get_structure(novel)
+        if structure != self._structure:
+            self._build(novel, structure)
+            return
+
+        for collection, perTag in (
+                ('characters', self.chrPerTag),
+                ('locations', self.locPerTag),
+                ('items', self.itmPerTag),
+                ):
+            elementKeys = self._get_element_keys(novel, collection)
+            if elementKeys != self._elementKeys[collection]:
+                self._elementKeys[collection] = elementKeys
+                self._index_tags(novel, collection, perTag)
+                self._titles[collection] = {}
+        tagsChanged = False
+        for scId in self.srtScenes:
+            sceneKey = self._get_scene_key(novel.scenes[scId])
+            oldKey = self._sceneKeys[scId]
+            if sceneKey == oldKey:
+                continue
+
+            self._sceneKeys[scId] = sceneKey
+            oldCharacters, oldLocations, oldItems, oldTags = oldKey
+            characters, locations, items, tags = sceneKey
+            self._update_relation(scId, oldCharacters, characters, self.scnPerChr)
+            self._update_relation(scId, oldLocations, locations, self.scnPerLoc)
+            self._update_relation(scId, oldItems, items, self.scnPerItm)
+            viewpoint = self._get_viewpoint(characters)
+            if viewpoint != self.viewpoints[scId]:
+                self._update_relation(scId, (self.viewpoints[scId],), (viewpoint,), self.scnPerViewpoint)
+                self.viewpoints[scId] = viewpoint
+            if tags != oldTags:
+                tagsChanged = True
+            for collection, oldIds, ids in (
+                    ('characters', oldCharacters, characters),
+                    ('locations', oldLocations, locations),
+                    ('items', oldItems, items),
+                    ):
+                if ids != oldIds:
+                    self._titles[collection].pop(scId, None)
+        if tagsChanged:
+            self._index_scene_tags(novel)
+
+    def get_character_titles(self, novel, scId):
+        """Return a list of the titles of the scene's characters.
+
+        Only the titles of indexed scenes are kept for reuse.
+
+        Positional arguments:
+            novel -- Novel instance the index was generated for.
+            scId -- str: scene ID.
+
+        Return an empty list, if the scene has no characters, or refers to unknown ones.
+        """
+        try:
+            return self._titles['characters'][scId]
+
+        except KeyError:
+            pass
+
+        try:
+            titles = [novel.characters[crId].title for crId in novel.scenes[scId].characters]
+        except:
+            titles = []
+        if scId in self._sceneKeys:
+            self._titles['characters'][scId] = titles
+        return titles
+
+    def get_location_titles(self, novel, scId):
+        """Return a list of the titles of the scene's locations.
+
+        Positional arguments:
+            novel -- Novel instance the index was generated for.
+            scId -- str: scene ID of a scene with locations.
+        """
+        try:
+            return self._titles['locations'][scId]
+
+        except KeyError:
+            pass
+
+        titles = [novel.locations[lcId].title for lcId in novel.scenes[scId].locations]
+        if scId in self._sceneKeys:
+            self._titles['locations'][scId] = titles
+        return titles
+
+    def get_item_titles(self, novel, scId):
+        """Return a list of the titles of the scene's items.
+
+        Positional arguments:
+            novel -- Novel instance the index was generated for.
+            scId -- str: scene ID of a scene with items.
+        """
+        try:
+            return self._titles['items'][scId]
+
+        except KeyError:
+            pass
+
+        titles = [novel.items[itId].title for itId in novel.scenes[scId].items]
+        if scId in self._sceneKeys:
+            self._titles['items'][scId] = titles
+        return titles
+
+    def _build(self, novel, structure):
+        """Build the whole index from scratch.
+
+        Positional arguments:
+            novel -- Novel instance to be indexed.
+            structure -- tuple returned by _get_structure().
+        """
+        self._structure = structure
+        self.scnPerChr = {crId: [] for crId in novel.srtCharacters}
+        self.scnPerLoc = {lcId: [] for lcId in novel.srtLocations}
+        self.scnPerItm = {itId: [] for itId in novel.srtItems}
+        self.scnPerViewpoint = {crId: [] for crId in novel.srtCharacters}
+        self.chpPerScn = {}
+        self.srtScenes = []
+        self.sceneNumbers = {}
+        self.chapterNumbers = {}
+        self.viewpoints = {}
+        self._sceneKeys = {}
+        self._elementKeys = {}
+        self._titles = {}
+        for collection, perTag in (
+                ('characters', self.chrPerTag),
+                ('locations', self.locPerTag),
+                ('items', self.itmPerTag),
+                ):
+            self._elementKeys[collection] = self._get_element_keys(novel, collection)
+            self._index_tags(novel, collection, perTag)
+            self._titles[collection] = {}
+        for chapterNumber, chId in enumerate(novel.srtChapters, 1):
+            self.chapterNumbers.setdefault(chId, chapterNumber)
+            for scId in novel.chapters[chId].srtScenes:
+                self.srtScenes.append(scId)
+                self.sceneNumbers.setdefault(scId, len(self.srtScenes))
+                self.chpPerScn[scId] = chId
+                sceneKey = self._get_scene_key(novel.scenes[scId])
+                self._sceneKeys[scId] = sceneKey
+                characters, locations, items, __ = sceneKey
+                for crId in characters:
+                    if crId in self.scnPerChr:
+                        self.scnPerChr[crId].append(scId)
+                for lcId in locations:
+                    if lcId in self.scnPerLoc:
+                        self.scnPerLoc[lcId].append(scId)
+                for itId in items:
+                    if itId in self.scnPerItm:
+                        self.scnPerItm[itId].append(scId)
+                viewpoint = self._get_viewpoint(characters)
+                self.viewpoints[scId] = viewpoint
+                if viewpoint in self.scnPerViewpoint:
+                    self.scnPerViewpoint[viewpoint].append(scId)
+        self._index_scene_tags(novel)
+
+    def _get_structure(self, novel):
+        """Return a tuple with the order of chapters, scenes, and world elements."""
+        return (
+            tuple(novel.srtChapters),
+            tuple(tuple(novel.chapters[chId].srtScenes) for chId in novel.srtChapters),
+            tuple(novel.srtCharacters),
+            tuple(novel.srtLocations),
+            tuple(novel.srtItems),
+            )
+
+    def _get_element_keys(self, novel, collection):
+        """Return a dictionary with the indexed properties of the world elements. Key: element ID."""
+        elements = getattr(novel, collection)
+        return {elemId: (elements[elemId].title, tuple(elements[elemId].tags or ())) for elemId in elements}
+
+    def _get_scene_key(self, scene):
+        """Return a tuple with the indexed properties of a scene."""
+        return (
+            tuple(scene.characters or ()),
+            tuple(scene.locations or ()),
+            tuple(scene.items or ()),
+            tuple(scene.tags or ()),
+            )
+
+    def _get_viewpoint(self, characters):
+        """Return the ID of the viewpoint character, or None."""
+        if characters:
+            return characters[0]
+
+        return None
+
+    def _index_tags(self, novel, collection, perTag):
+        """Rebuild the element-per-tag index of a world element collection.
+
+        Positional arguments:
+            novel -- Novel instance.
+            collection -- str: name of the element dictionary, e.g. 'characters'.
+            perTag -- dict to be filled with lists of element IDs. Key: tag.
+        """
+        perTag.clear()
+        elements = getattr(novel, collection)
+        srtIds = getattr(novel, f'srt{collection[0].upper()}{collection[1:]}')
+        for elemId in srtIds:
+            if elements[elemId].tags:
+                for tag in elements[elemId].tags:
+                    perTag.setdefault(tag, []).append(elemId)
+
+    def _index_scene_tags(self, novel):
+        """Rebuild the scene-per-tag index."""
+        self.scnPerTag = {}
+        for scId in self.srtScenes:
+            for tag in self._sceneKeys[scId][3]:
+                self.scnPerTag.setdefault(tag, []).append(scId)
+
+    def _update_relation(self, scId, oldIds, ids, scnPerElement):
+        """Move a scene between the scene lists of the related elements.
+
+        Positional arguments:
+            scId -- str: scene ID.
+            oldIds -- tuple: IDs of the related elements as indexed.
+            ids -- tuple: IDs of the currently related elements.
+            scnPerElement -- dict: list of scene IDs in novel order. Key: element ID.
+        """
+        for elemId in set(oldIds).union(ids):
+            if not elemId in scnPerElement:
+                continue
+
+            sceneIds = [sceneId for sceneId in scnPerElement[elemId] if sceneId != scId]
+            sceneIds.extend([scId] * ids.count(elemId))
+            sceneIds.sort(key=self.sceneNumbers.__getitem__)
+            scnPerElement[elemId] = sceneIds
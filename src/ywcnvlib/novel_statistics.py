@@ -0,0 +1,301 @@
+"""Provide a class for project statistics with array-backed columns.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-cnv
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+from array import array
+
+CHAPTERS = 'chapters'
+PARTS = 'parts'
+STATUS = 'status'
+VIEWPOINTS = 'viewpoints'
+TAGS = 'tags'
+GROUPINGS = (CHAPTERS, PARTS, STATUS, VIEWPOINTS, TAGS)
+# Names of the groupings, in report order.
+
+
+class NovelStatistics:
+    """Word and letter counts of a novel's scenes, in columns, with aggregates per group.
+
+    Public methods:
+        update(novel) -- Build the columns, or update them if they are already built.
+        get_totals() -- Return a tuple: (number of scenes, words, letters).
+        get_aggregates(grouping) -- Return a dictionary with the totals per group.
+        get_percentiles(percents) -- Return a list with the scene word counts at the given percentiles.
+        get_progress(novel) -- Return a tuple with the progress towards the novel's word target.
+
+    Public instance variables:
+        srtScenes -- list: IDs of the counted scenes in novel order.
+        wordCounts -- array: word count per scene, in the order of srtScenes.
+        letterCounts -- array: letter count per scene, in the order of srtScenes.
+        groupKeys -- dict: list of the group keys. Key: grouping name.
+
+    The counted scenes are the normal scenes in normal chapters, i.e. the scenes yWriter counts.
+    Each grouping but the tags has a column of group codes, i.e. positions in the list of group keys.
+    A scene without a part or a viewpoint has the code -1.
+    The tags are stored as an array of scene positions per tag.
+
+    The columns reflect the state of the novel at the last call of update().
+    If only word or letter counts have changed since, the cached aggregates
+    are corrected by the differences.
+    If a scene's status, viewpoint, or tags have changed, the affected aggregates are recomputed on demand.
+    If chapters or scenes have been added, removed, rearranged, or retyped,
+    the columns are rebuilt.
+    The statistics hold no reference to the novel, so they can be cached with the novel's data.
+    """
+
+    def __init__(self):
+        """Initialize instance variables."""
+        self.srtScenes = []
+        self.wordCounts = array('l')
+        self.letterCounts = array('l')
+        self.groupKeys = {grouping: [] for grouping in GROUPINGS}
+        self._groupCodes = {grouping: {} for grouping in GROUPINGS}
+        # Positions in the lists of group keys. Key: grouping name; value: dictionary with the group keys as keys.
+        self._codes = {grouping: array('l') for grouping in (CHAPTERS, PARTS, STATUS, VIEWPOINTS)}
+        # Group code per scene, in the order of srtScenes. Key: grouping name.
+        self._tagPositions = {}
+        # Positions of the tagged scenes. Key: tag; value: array.
+        self._structure = None
+        self._sceneKeys = []
+        # Status, viewpoint, and tags per scene, in the order of srtScenes.
+        self._aggregates = {}
+        # Cached results of get_aggregates(). Key: grouping name.
+        self._sortedWordCounts = None
+
+    def update(self, novel):
+        """Build the columns, or update them if they are already built.
+
+        Positional arguments:
+            novel -- Novel instance with up-to-date word and letter counts.
+        """
+        structure = self._get_structure(novel)
+        if structure != self._structure:
+            self._build(novel, structure)
+            return
+
+        for position, scId in enumerate(self.srtScenes):
+            scene = novel.scenes[scId]
+            wordDelta = (scene.wordCount or 0) - self.wordCounts[position]
+            letterDelta = (scene.letterCount or 0) - self.letterCounts[position]
+            if wordDelta or letterDelta:
+                self.wordCounts[position] += wordDelta
+                self.letterCounts[position] += letterDelta
+                self._sortedWordCounts = None
+                self._correct_aggregates(position, wordDelta, letterDelta)
+            sceneKey = self._get_scene_key(scene)
+            oldKey = self._sceneKeys[position]
+            if sceneKey == oldKey:
+                continue
+
+            self._sceneKeys[position] = sceneKey
+            status, viewpoint, tags = sceneKey
+            if status != oldKey[0]:
+                self._codes[STATUS][position] = self._get_code(STATUS, status)
+                self._aggregates.pop(STATUS, None)
+            if viewpoint != oldKey[1]:
+                self._codes[VIEWPOINTS][position] = self._get_viewpoint_code(novel, viewpoint)
+                self._aggregates.pop(VIEWPOINTS, None)
+            if tags != oldKey[2]:
+                self._index_tags()
+                self._aggregates.pop(TAGS, None)
+
+    def get_totals(self):
+        """Return a tuple: (number of scenes, words, letters)."""
+        return len(self.srtScenes), sum(self.wordCounts), sum(self.letterCounts)
+
+    def get_aggregates(self, grouping):
+        """Return a dictionary with the totals per group.
+
+        Positional arguments:
+            grouping -- str: one of the GROUPINGS names.
+
+        The dictionary values are lists: [number of scenes, words, letters].
+        The keys are chapter IDs, part IDs, status codes, viewpoint character IDs, or tags,
+        in the order of their first occurrence in the novel.
+        Scenes without a part or a viewpoint are not included.
+        """
+        try:
+            return self._aggregates[grouping]
+
+        except KeyError:
+            pass
+
+        groupKeys = self.groupKeys[grouping]
+        sceneCounts = array('l', bytes(len(groupKeys) * array('l').itemsize))
+        wordCounts = array('l', sceneCounts)
+        letterCounts = array('l', sceneCounts)
+        if grouping == TAGS:
+            for code, tag in enumerate(groupKeys):
+                positions = self._tagPositions[tag]
+                sceneCounts[code] = len(positions)
+                wordCounts[code] = sum([self.wordCounts[position] for position in positions])
+                letterCounts[code] = sum([self.letterCounts[position] for position in positions])
+        else:
+            for code, words, letters in zip(self._codes[grouping], self.wordCounts, self.letterCounts):
+                if code >= 0:
+                    sceneCounts[code] += 1
+                    wordCounts[code] += words
+                    letterCounts[code] += letters
+        aggregates = {}
+        for code, key in enumerate(groupKeys):
+            if sceneCounts[code]:
+                aggregates[key] = [sceneCounts[code], wordCounts[code], letterCounts[code]]
+        self._aggregates[grouping] = aggregates
+        return aggregates
+
+    def get_percentiles(self, percents):
+        """Return a list with the scene word counts at the given percentiles.
+
+        Positional arguments:
+            percents -- iterable of numbers between 0 and 100.
+
+        Use the nearest-rank method. Return an empty list, if there are no scenes.
+        """
+        if not self.wordCounts:
+            return []
+
+        if self._sortedWordCounts is None:
+            self._sortedWordCounts = array('l', sorted(self.wordCounts))
+        sceneCount = len(self._sortedWordCounts)
+        percentiles = []
+        for percent in percents:
+            rank = max(1, -(-percent * sceneCount // 100))
+            percentiles.append(self._sortedWordCounts[min(int(rank), sceneCount) - 1])
+        return percentiles
+
+    def get_progress(self, novel):
+        """Return a tuple with the progress towards the novel's word target.
+
+        Positional arguments:
+            novel -- Novel instance the statistics were updated for.
+
+        Return a tuple:
+            wordsTotal -- int: word count of the counted scenes.
+            wordsWritten -- int: words added since the word count start.
+            wordTarget -- int: word target of the project, or 0 if not set.
+            percent -- float: word count as a percentage of the target, or None if no target is set.
+        """
+        wordsTotal = sum(self.wordCounts)
+        wordsWritten = wordsTotal - (novel.wordCountStart or 0)
+        wordTarget = novel.wordTarget or 0
+        if wordTarget > 0:
+            percent = 100 * wordsTotal / wordTarget
+        else:
+            percent = None
+        return wordsTotal, wordsWritten, wordTarget, percent
+
+    def _build(self, novel, structure):
+        """Build all columns from scratch.
+
+        Positional arguments:
+            novel -- Novel instance.
+            structure -- tuple returned by _get_structure().
+        """
+        self._structure = structure
+        self.srtScenes = []
+        self.groupKeys = {grouping: [] for grouping in GROUPINGS}
+        self._groupCodes = {grouping: {} for grouping in GROUPINGS}
+        self._sceneKeys = []
+        self._aggregates = {}
+        self._sortedWordCounts = None
+        wordCounts = []
+        letterCounts = []
+        codes = {grouping: [] for grouping in self._codes}
+        partCode = -1
+        for chId in novel.srtChapters:
+            chapter = novel.chapters[chId]
+            if chapter.chType:
+                continue
+
+            if chapter.chLevel == 1:
+                partCode = self._get_code(PARTS, chId)
+            chapterCode = None
+            for scId in chapter.srtScenes:
+                scene = novel.scenes[scId]
+                if scene.scType:
+                    continue
+
+                if chapterCode is None:
+                    chapterCode = self._get_code(CHAPTERS, chId)
+                sceneKey = self._get_scene_key(scene)
+                status, viewpoint, __ = sceneKey
+                self.srtScenes.append(scId)
+                self._sceneKeys.append(sceneKey)
+                wordCounts.append(scene.wordCount or 0)
+                letterCounts.append(scene.letterCount or 0)
+                codes[CHAPTERS].append(chapterCode)
+                codes[PARTS].append(partCode)
+                codes[STATUS].append(self._get_code(STATUS, status))
+                codes[VIEWPOINTS].append(self._get_viewpoint_code(novel, viewpoint))
+        self.wordCounts = array('l', wordCounts)
+        self.letterCounts = array('l', letterCounts)
+        for grouping in codes:
+            self._codes[grouping] = array('l', codes[grouping])
+        self._index_tags()
+
+    def _correct_aggregates(self, position, wordDelta, letterDelta):
+        """Add the count differences of a scene to the cached aggregates.
+
+        Positional arguments:
+            position -- int: position of the scene in srtScenes.
+            wordDelta -- int: word count difference.
+            letterDelta -- int: letter count difference.
+        """
+        for grouping, aggregates in self._aggregates.items():
+            if grouping == TAGS:
+                keys = self._sceneKeys[position][2]
+            else:
+                code = self._codes[grouping][position]
+                if code < 0:
+                    continue
+
+                keys = (self.groupKeys[grouping][code],)
+            for key in keys:
+                aggregates[key][1] += wordDelta
+                aggregates[key][2] += letterDelta
+
+    def _get_code(self, grouping, key):
+        """Return the code of a group key, adding the key, if it is new."""
+        groupCodes = self._groupCodes[grouping]
+        try:
+            return groupCodes[key]
+
+        except KeyError:
+            groupCodes[key] = len(self.groupKeys[grouping])
+            self.groupKeys[grouping].append(key)
+            return groupCodes[key]
+
+    def _get_scene_key(self, scene):
+        """Return a tuple with the grouped properties of a scene: (status, viewpoint, tags)."""
+        if scene.characters:
+            viewpoint = scene.characters[0]
+        else:
+            viewpoint = None
+        return scene.status or 0, viewpoint, tuple(dict.fromkeys(scene.tags or ()))
+
+    def _get_structure(self, novel):
+        """Return a tuple with the order and types of chapters and scenes."""
+        return tuple(
+            (chId, novel.chapters[chId].chType, novel.chapters[chId].chLevel,
+             tuple((scId, novel.scenes[scId].scType) for scId in novel.chapters[chId].srtScenes))
+            for chId in novel.srtChapters
+            )
+
+    def _get_viewpoint_code(self, novel, viewpoint):
+        """Return the code of a viewpoint character, or -1 if there is no known one."""
+        if viewpoint is None or not viewpoint in novel.characters:
+            return -1
+
+        return self._get_code(VIEWPOINTS, viewpoint)
+
+    def _index_tags(self):
+        """Rebuild the scene positions per tag."""
+        positions = {}
+        for position, sceneKey in enumerate(self._sceneKeys):
+            for tag in sceneKey[2]:
+                positions.setdefault(tag, []).append(position)
+        self.groupKeys[TAGS] = list(positions)
+        self._groupCodes[TAGS] = {tag: code for code, tag in enumerate(positions)}
+        self._tagPositions = {tag: array('l', positions[tag]) for tag in positions}
@@ -0,0 +1,460 @@
+"""Provide the ODF export classes used by the converter.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-cnv
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import re
+from pywriter.odt_w.odt_w_export import OdtWExport
+from pywriter.odt_w.odt_w_proof import OdtWProof
+from pywriter.odt_w.odt_w_manuscript import OdtWManuscript
+from pywriter.odt_w.odt_w_brief_synopsis import OdtWBriefSynopsis
+from pywriter.odt_w.odt_w_scenedesc import OdtWSceneDesc
+from pywriter.odt_w.odt_w_chapterdesc import OdtWChapterDesc
+from pywriter.odt_w.odt_w_partdesc import OdtWPartDesc
+from pywriter.odt_w.odt_w_characters import OdtWCharacters
+from pywriter.odt_w.odt_w_items import OdtWItems
+from pywriter.odt_w.odt_w_locations import OdtWLocations
+from pywriter.pywriter_globals import *
+from pywriter.model.scene import Scene
+from pywriter.ods_w.ods_writer import OdsWriter
+from pywriter.ods_w.ods_w_charlist import OdsWCharList
+from pywriter.ods_w.ods_w_loclist import OdsWLocList
+from pywriter.ods_w.ods_w_itemlist import OdsWItemList
+from pywriter.ods_w.ods_w_scenelist import OdsWSceneList
+from pywriter.odt_w.odt_w_xref import OdtWXref
+from pywriter.odt_w.odt_w_notes import OdtWNotes
+from pywriter.odt_w.odt_w_todo import OdtWTodo
+from ywcnvlib.file_export_cnv import FileExportCnv
+from ywcnvlib.novel_index import NovelIndex
+from ywcnvlib.novel_statistics import NovelStatistics
+from ywcnvlib.novel_statistics import CHAPTERS
+from ywcnvlib.novel_statistics import PARTS
+from ywcnvlib.novel_statistics import STATUS
+from ywcnvlib.novel_statistics import VIEWPOINTS
+from ywcnvlib.novel_statistics import TAGS
+from ywcnvlib.odf_file_cnv import OdfFileCnv
+from ywcnvlib.odt_w_formatted_cnv import OdtWFormattedCnv
+from ywcnvlib.odt_w_formatted_cnv import ODT_ESCAPES
+
+
+class OdtWExportCnv(OdtWExport, OdtWFormattedCnv, OdfFileCnv, FileExportCnv):
+    """ODT export representation with compiled render plans and single-pass markup translation.
+
+    Comments are converted into annotations, footnotes, and endnotes fragment by fragment.
+    """
+    _NOTE = re.compile(r'\/\* *@([ef]n\**) (.*?)\*\/')
+    # Comment marked as footnote or endnote.
+
+    _COMMENT = re.compile(r'\/\*(.*?)\*\/')
+    # Simple comment.
+
+    def _convert_comments(self, text):
+        """Return text with the comments converted into notes and annotations.
+
+        Positional arguments:
+            text -- str: rendered template, containing whole paragraphs.
+        """
+        text = text.replace('\r', '@r@').replace('\n', '@n@')
+        simpleComment = (f'<office:annotation><dc:creator>{self.novel.authorName}'
+                         '</dc:creator><text:p>\\1</text:p></office:annotation>'
+                         )
+        text = self._NOTE.sub(self._replace_note, text)
+        text = self._COMMENT.sub(simpleComment, text)
+        return text.replace('@r@', '\r').replace('@n@', '\n')
+
+    def _get_fragments(self):
+        """Generate the text fragments in file order, with the comments converted.
+
+        Extends the superclass method.
+        """
+        self._noteCounter = 0
+        self._noteNumber = 0
+        for fragment in super()._get_fragments():
+            if '/*' in fragment:
+                fragment = self._convert_comments(fragment)
+            yield fragment
+
+    def _get_text(self):
+        """Return the file's text as a string.
+
+        Overrides the superclass method.
+        """
+        return ''.join(self._get_fragments())
+
+    def _replace_note(self, match):
+        """Return a footnote or endnote for a matching comment, numbering it."""
+        noteType = match.group(1)
+        self._noteCounter += 1
+        self._noteNumber += 1
+        noteLabel = f'{self._noteNumber}'
+        if noteType.startswith('fn'):
+            noteClass = 'footnote'
+            noteStyle = 'Footnote'
+            if noteType.endswith('*'):
+                self._noteNumber -= 1
+                noteLabel = '*'
+        else:
+            noteClass = 'endnote'
+            noteStyle = 'Endnote'
+        text = match.group(2).replace('text:style-name="First_20_line_20_indent"',
+                                      f'text:style-name="{noteStyle}"')
+        return (f'<text:note text:id="ftn{self._noteCounter}" '
+                f'text:note-class="{noteClass}"><text:note-citation '
+                f'text:label="{noteLabel}">*</text:note-citation><text:note-body>'
+                f'<text:p text:style-name="{noteStyle}">{text}</text:p></text:note-body></text:note>')
+
+
+class OdtWProofCnv(OdtWProof, OdtWFormattedCnv, OdfFileCnv, FileExportCnv):
+    """ODT proof reading file representation with compiled render plans and single-pass markup translation."""
+
+    def _get_text(self):
+        """Return the file's text as a string.
+
+        Overrides the superclass method.
+        """
+        return ''.join(self._get_fragments())
+
+    def _convert_from_yw(self, text, quick=False):
+        """Return text, converted from yw7 markup to target format.
+
+        Positional arguments:
+            text -- string to convert.
+
+        Optional arguments:
+            quick -- bool: ignored, because the proof reading format always keeps the markup.
+
+        Overrides the superclass method.
+        """
+        if text:
+            translator = self._get_translator()
+            if translator is not None:
+                return translator.translate(text)
+
+        return super()._convert_from_yw(text, quick)
+
+    def _get_translation_table(self):
+        """Return a tuple: list of tags to be balanced, list of replacements in order of application.
+
+        Emphasis is marked with automatic styles following the language styles.
+
+        Overrides the superclass method.
+        """
+        tags = ['i', 'b']
+        odtReplacements = list(ODT_ESCAPES)
+        odtReplacements.extend([
+            ('\n\n', '</text:p>\r<text:p text:style-name="First_20_line_20_indent" />\r<text:p text:style-name="Text_20_body">'),
+            ('\n', '</text:p>\r<text:p text:style-name="First_20_line_20_indent">'),
+            ('\r', '\n'),
+            ('[/i]', '</text:span>'),
+            ('[/b]', '</text:span>'),
+            ('/*', f'<office:annotation><dc:creator>{self.novel.authorName}</dc:creator><text:p>'),
+            ('*/', '</text:p></office:annotation>'),
+        ])
+        i = 0
+        for i, language in enumerate(self.novel.languages, 1):
+            tags.append(f'lang={language}')
+            odtReplacements.append((f'[lang={language}]', f'<text:span text:style-name="T{i}">'))
+            odtReplacements.append((f'[/lang={language}]', '</text:span>'))
+        odtReplacements.extend([
+            ('[i]', f'<text:span text:style-name="T{i+1}">'),
+            ('[b]', f'<text:span text:style-name="T{i+2}">'),
+        ])
+        return tags, odtReplacements
+
+    def _style_quotations(self, text):
+        """Return text unchanged, because the proof reading format keeps the '> ' markup.
+
+        Overrides the superclass method.
+        """
+        return text
+
+
+class OdtWManuscriptCnv(OdtWManuscript, OdtWFormattedCnv, OdfFileCnv, FileExportCnv):
+    """ODT manuscript file representation with compiled render plans and single-pass markup translation."""
+
+
+class OdtWBriefSynopsisCnv(OdtWBriefSynopsis, OdfFileCnv, FileExportCnv):
+    """ODT brief synopsis file representation with compiled render plans."""
+
+
+class OdtWSceneDescCnv(OdtWSceneDesc, OdfFileCnv, FileExportCnv):
+    """ODT scene summaries file representation with compiled render plans."""
+
+
+class OdtWChapterDescCnv(OdtWChapterDesc, OdfFileCnv, FileExportCnv):
+    """ODT chapter summaries file representation with compiled render plans."""
+
+
+class OdtWPartDescCnv(OdtWPartDesc, OdfFileCnv, FileExportCnv):
+    """ODT part summaries file representation with compiled render plans."""
+
+
+class OdtWCharactersCnv(OdtWCharacters, OdfFileCnv, FileExportCnv):
+    """ODT character descriptions file representation with compiled render plans."""
+
+
+class OdtWItemsCnv(OdtWItems, OdfFileCnv, FileExportCnv):
+    """ODT item descriptions file representation with compiled render plans."""
+
+
+class OdtWLocationsCnv(OdtWLocations, OdfFileCnv, FileExportCnv):
+    """ODT location descriptions file representation with compiled render plans."""
+
+
+class OdsWCharListCnv(OdsWCharList, OdfFileCnv, FileExportCnv):
+    """ODS character list representation with compiled render plans."""
+
+
+class OdsWLocListCnv(OdsWLocList, OdfFileCnv, FileExportCnv):
+    """ODS location list representation with compiled render plans."""
+
+
+class OdsWItemListCnv(OdsWItemList, OdfFileCnv, FileExportCnv):
+    """ODS item list representation with compiled render plans."""
+
+
+class OdsWSceneListCnv(OdsWSceneList, OdfFileCnv, FileExportCnv):
+    """ODS scene list representation with compiled render plans."""
+
+
+class OdsWStatisticsCnv(OdsWriter, OdfFileCnv, FileExportCnv):
+    """ODS project statistics representation with one sheet per grouping.
+
+    The first sheet shows the project totals, the scene word count percentiles,
+    and the progress towards the word target.
+    The other sheets show the totals per chapter, part, status, viewpoint character, and tag.
+    Only the normal scenes in normal chapters are counted.
+    """
+    DESCRIPTION = _('Project statistics')
+    SUFFIX = '_statistics'
+
+    PERCENTILES = (10, 25, 50, 75, 90)
+    # Percentiles of the scene word counts shown in the overview.
+
+    _SHEETS = (
+        (CHAPTERS, _('Chapters'), _('Chapter')),
+        (PARTS, _('Parts'), _('Part')),
+        (STATUS, _('Status'), _('Status')),
+        (VIEWPOINTS, _('Viewpoints'), _('Viewpoint')),
+        (TAGS, _('Tags'), _('Tag')),
+        )
+    # Grouping, sheet name, and column heading of the group sheets.
+
+    _fileHeader = f'''{OdsWriter._CONTENT_XML_HEADER}{DESCRIPTION}" table:style-name="ta1" table:print="false">
+    <table:table-column table:style-name="co4" table:default-cell-style-name="Default"/>
+    <table:table-column table:style-name="co3" table:default-cell-style-name="Default"/>
+    <table:table-column table:style-name="co1" table:number-columns-repeated="1022" table:default-cell-style-name="Default"/>
+
+'''
+
+    _valueTemplate = '''   <table:table-row table:style-name="ro1">
+     <table:table-cell table:style-name="Heading" office:value-type="string">
+      <text:p>$Title</text:p>
+     </table:table-cell>
+     <table:table-cell office:value-type="float" office:value="$Value">
+      <text:p>$Value</text:p>
+     </table:table-cell>
+     <table:table-cell table:number-columns-repeated="1022"/>
+    </table:table-row>
+
+'''
+
+    _sheetTemplate = f'''   </table:table>
+   <table:table table:name="$Title" table:style-name="ta1" table:print="false">
+    <table:table-column table:style-name="co4" table:default-cell-style-name="Default"/>
+    <table:table-column table:style-name="co2" table:number-columns-repeated="5" table:default-cell-style-name="Default"/>
+    <table:table-column table:style-name="co1" table:number-columns-repeated="1018" table:default-cell-style-name="Default"/>
+     <table:table-row table:style-name="ro1">
+     <table:table-cell table:style-name="Heading" office:value-type="string">
+      <text:p>$Heading</text:p>
+     </table:table-cell>
+     <table:table-cell table:style-name="Heading" office:value-type="string">
+      <text:p>{_("Scenes")}</text:p>
+     </table:table-cell>
+     <table:table-cell table:style-name="Heading" office:value-type="string">
+      <text:p>{_("Words")}</text:p>
+     </table:table-cell>
+     <table:table-cell table:style-name="Heading" office:value-type="string">
+      <text:p>{_("Letters")}</text:p>
+     </table:table-cell>
+     <table:table-cell table:style-name="Heading" office:value-type="string">
+      <text:p>{_("Words per scene")}</text:p>
+     </table:table-cell>
+     <table:table-cell table:style-name="Heading" office:value-type="string">
+      <text:p>{_("Share of words (%)")}</text:p>
+     </table:table-cell>
+     <table:table-cell table:style-name="Heading" table:number-columns-repeated="1018"/>
+    </table:table-row>
+
+'''
+
+    _groupTemplate = '''   <table:table-row table:style-name="ro1">
+     <table:table-cell office:value-type="string">
+      <text:p>$Title</text:p>
+     </table:table-cell>
+     <table:table-cell office:value-type="float" office:value="$SceneCount">
+      <text:p>$SceneCount</text:p>
+     </table:table-cell>
+     <table:table-cell office:value-type="float" office:value="$WordCount">
+      <text:p>$WordCount</text:p>
+     </table:table-cell>
+     <table:table-cell office:value-type="float" office:value="$LetterCount">
+      <text:p>$LetterCount</text:p>
+     </table:table-cell>
+     <table:table-cell office:value-type="float" office:value="$WordsPerScene">
+      <text:p>$WordsPerScene</text:p>
+     </table:table-cell>
+     <table:table-cell office:value-type="float" office:value="$Share">
+      <text:p>$Share</text:p>
+     </table:table-cell>
+     <table:table-cell table:number-columns-repeated="1018"/>
+    </table:table-row>
+
+'''
+
+    _fileFooter = OdsWriter._CONTENT_XML_FOOTER
+
+    def _get_text(self):
+        """Return the statistics as content.xml text.
+
+        Use the novel's statistics, if it keeps them, so they are updated incrementally.
+        Overrides the superclass method.
+        """
+        get_statistics = getattr(self.novel, 'get_statistics', None)
+        if get_statistics is not None:
+            statistics = get_statistics()
+        else:
+            statistics = NovelStatistics()
+            statistics.update(self.novel)
+        sceneCount, wordsTotal, lettersTotal = statistics.get_totals()
+        __, wordsWritten, wordTarget, percent = statistics.get_progress(self.novel)
+        values = [
+            (_('Scenes'), sceneCount),
+            (_('Words'), wordsTotal),
+            (_('Letters'), lettersTotal),
+            (_('Words per scene'), self._get_quotient(wordsTotal, sceneCount)),
+            ]
+        for percentile, wordCount in zip(self.PERCENTILES, statistics.get_percentiles(self.PERCENTILES)):
+            values.append((_('Words per scene, {}th percentile').format(percentile), wordCount))
+        if percent is not None:
+            values.append((_('Word target'), wordTarget))
+            values.append((_('Words since start'), wordsWritten))
+            values.append((_('Word target reached (%)'), round(percent, 1)))
+        lines = self._get_fileHeader()
+        for title, value in values:
+            lines.append(self._render(self._valueTemplate, self._get_valueMapping, title, value))
+        for grouping, sheetTitle, heading in self._SHEETS:
+            lines.append(self._render(self._sheetTemplate, self._get_sheetMapping, sheetTitle, heading))
+            aggregates = statistics.get_aggregates(grouping)
+            groupKeys = list(aggregates)
+            if grouping == STATUS:
+                groupKeys.sort()
+            for key in groupKeys:
+                lines.append(self._render(self._groupTemplate, self._get_groupMapping,
+                                          self._get_group_title(grouping, key), aggregates[key], wordsTotal))
+        lines.append(self._fileFooter)
+        return ''.join(lines)
+
+    def _get_group_title(self, grouping, key):
+        """Return the displayed title of a group.
+
+        Positional arguments:
+            grouping -- str: grouping name.
+            key -- group key as used by NovelStatistics.
+        """
+        if grouping in (CHAPTERS, PARTS):
+            title = self.novel.chapters[key].title
+        elif grouping == VIEWPOINTS:
+            title = self.novel.characters[key].title
+        elif grouping == STATUS:
+            try:
+                title = Scene.STATUS[key]
+            except IndexError:
+                title = None
+        else:
+            title = key
+        return self._convert_from_yw(title or '', True)
+
+    def _get_groupMapping(self, title, aggregate, wordsTotal):
+        """Return a mapping dictionary for a group row.
+
+        Positional arguments:
+            title -- str: displayed group title.
+            aggregate -- list: [number of scenes, words, letters].
+            wordsTotal -- int: word count of all counted scenes.
+        """
+        sceneCount, wordCount, letterCount = aggregate
+        return dict(
+            Title=title,
+            SceneCount=sceneCount,
+            WordCount=wordCount,
+            LetterCount=letterCount,
+            WordsPerScene=self._get_quotient(wordCount, sceneCount),
+            Share=round(100 * self._get_quotient(wordCount, wordsTotal, 3), 1),
+        )
+
+    def _get_quotient(self, dividend, divisor, digits=0):
+        """Return the rounded quotient, or 0 if the divisor is 0."""
+        if not divisor:
+            return 0
+
+        return round(dividend / divisor, digits or None)
+
+    def _get_sheetMapping(self, title, heading):
+        """Return a mapping dictionary for a sheet header.
+
+        Positional arguments:
+            title -- str: sheet name.
+            heading -- str: heading of the group column.
+        """
+        return dict(Title=self._convert_from_yw(title, True), Heading=self._convert_from_yw(heading, True))
+
+    def _get_valueMapping(self, title, value):
+        """Return a mapping dictionary for an overview row.
+
+        Positional arguments:
+            title -- str: value description.
+            value -- number to be displayed.
+        """
+        return dict(Title=self._convert_from_yw(title, True), Value=value)
+
+
+class OdtWXrefCnv(OdtWXref, OdfFileCnv, FileExportCnv):
+    """ODT cross reference file representation with compiled render plans and the novel's shared index."""
+
+    def _get_text(self):
+        """Return the cross references as content.xml text.
+
+        Use the novel's shared index instead of a cross reference instance of its own.
+        Extends the superclass method.
+        """
+        index = self._get_novel_index()
+        if index is not None:
+            self._xr = index
+        return super()._get_text()
+
+    def _get_sceneMapping(self, scId):
+        """Return a mapping dictionary for a scene section.
+
+        Positional arguments:
+            scId -- str: scene ID.
+
+        Look up scene and chapter numbers in the index.
+        Overrides the superclass method.
+        """
+        if not isinstance(self._xr, NovelIndex):
+            return super()._get_sceneMapping(scId)
+
+        sceneMapping = super(OdtWXref, self)._get_sceneMapping(scId, self._xr.sceneNumbers[scId], 0, 0)
+        sceneMapping['Chapter'] = str(self._xr.chapterNumbers[self._xr.chpPerScn[scId]])
+        return sceneMapping
+
+
+class OdtWNotesCnv(OdtWNotes, OdtWFormattedCnv, OdfFileCnv, FileExportCnv):
+    """ODT notes file representation with compiled render plans and single-pass markup translation."""
+
+
+class OdtWTodoCnv(OdtWTodo, OdtWFormattedCnv, OdfFileCnv, FileExportCnv):
+    """ODT to do list representation with compiled render plans and single-pass markup translation."""
+
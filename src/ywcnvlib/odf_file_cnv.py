@@ -0,0 +1,182 @@
+"""Provide a mixin class for ODF packaging without temporary files.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-cnv
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import os
+import zipfile
+from datetime import datetime
+from string import Template
+from pywriter.pywriter_globals import *
+from pywriter.odf.odf_file import OdfFile
+from ywcnvlib.phase_timer import PHASE_TIMER
+from ywcnvlib.phase_timer import TEMPLATE_RENDERING
+from ywcnvlib.phase_timer import ODF_PACKAGING
+from ywcnvlib.phase_timer import ZIP_WRITE
+
+CONTENT_CHUNK_SIZE = 0x100000
+# Minimum number of characters encoded and compressed at a time when writing content.xml.
+
+
+class OdfFileCnv(OdfFile):
+    """Mixin class for ODF packaging without temporary files.
+
+    Public methods:
+        write() -- Write the ODF package.
+
+    Public class constants:
+        COMPRESSION_LEVEL -- int: zlib compression level; None means the zlib default.
+
+    Public instance variables:
+        compressionLevel -- int: zlib compression level for this file; None means the zlib default.
+
+    Each package member is written directly into the zip file.
+    The "mimetype" member comes first and is stored uncompressed, as required by the ODF standard.
+    The static members are rendered only once per locale.
+    The content is rendered while being written, chunk by chunk,
+    so the memory needed does not grow with the size of the manuscript.
+
+    Use it as a base class between an OdfFile subclass and FileExportCnv:
+    class OdtWSceneDescCnv(OdtWSceneDesc, OdfFileCnv, FileExportCnv)
+    """
+    COMPRESSION_LEVEL = None
+
+    _staticMembers = {}
+    # Encoded static package members, shared by all writers. Key: (class, language code, country code).
+
+    def __init__(self, filePath, **kwargs):
+        """Initialize instance variables without creating a temporary directory.
+
+        Positional arguments:
+            filePath -- str: path to the file represented by the File instance.
+
+        Optional arguments:
+            compression_level -- int: zlib compression level (0..9); requires Python 3.7+.
+
+        Extends the superclass constructor, skipping the OdfFile constructor.
+        """
+        super(OdfFile, self).__init__(filePath, **kwargs)
+        self._tempDir = None
+        self._originalPath = self._filePath
+        self.compressionLevel = kwargs.get('compression_level', self.COMPRESSION_LEVEL)
+
+    def write(self):
+        """Write the ODF package.
+
+        Return a success message.
+        Raise the "Error" exception in case of error.
+        Overrides the superclass method.
+        """
+        with PHASE_TIMER.phase(ODF_PACKAGING):
+            members = self._get_static_members()
+            members.append(('meta.xml', self._get_meta_xml().encode('utf-8')))
+        backedUp = False
+        if os.path.isfile(self.filePath):
+            try:
+                os.replace(self.filePath, f'{self.filePath}.bak')
+            except:
+                raise Error(f'{_("Cannot overwrite file")}: "{norm_path(self.filePath)}".')
+            else:
+                backedUp = True
+        options = {}
+        if self.compressionLevel is not None:
+            options['compresslevel'] = self.compressionLevel
+        try:
+            with PHASE_TIMER.phase(ZIP_WRITE):
+                with zipfile.ZipFile(self.filePath, 'w', compression=zipfile.ZIP_DEFLATED, **options) as odfTarget:
+                    odfTarget.writestr('mimetype', self._MIMETYPE, compress_type=zipfile.ZIP_STORED)
+                    for memberName, data in members:
+                        odfTarget.writestr(memberName, data)
+                    with odfTarget.open('content.xml', 'w') as f:
+                        for chunk in self._get_content_chunks():
+                            f.write(chunk.encode('utf-8'))
+        except Error:
+            self._discard(backedUp)
+            raise
+
+        except:
+            self._discard(backedUp)
+            raise Error(f'{_("Cannot create file")}: "{norm_path(self.filePath)}".')
+
+        return f'{_("File written")}: "{norm_path(self.filePath)}".'
+
+    def _discard(self, backedUp):
+        """Remove the incomplete package, and restore the backup, if any.
+
+        Positional arguments:
+            backedUp -- bool: True if the previous file was renamed to ".bak".
+        """
+        try:
+            if backedUp:
+                os.replace(f'{self.filePath}.bak', self.filePath)
+            elif os.path.isfile(self.filePath):
+                os.remove(self.filePath)
+        except OSError:
+            pass
+
+    def _get_content_chunks(self):
+        """Generate the content.xml text in chunks of at least CONTENT_CHUNK_SIZE characters, but the last one.
+
+        The fragments are rendered on demand, and measured as a phase of their own.
+        """
+        fragments = self._get_fragments()
+        exhausted = False
+        while not exhausted:
+            chunk = []
+            size = 0
+            with PHASE_TIMER.phase(TEMPLATE_RENDERING):
+                for fragment in fragments:
+                    chunk.append(fragment)
+                    size += len(fragment)
+                    if size >= CONTENT_CHUNK_SIZE:
+                        break
+                else:
+                    exhausted = True
+                text = ''.join(chunk)
+            if text:
+                yield text
+
+    def _get_meta_xml(self):
+        """Return the meta.xml text with the novel's metadata."""
+        metaMapping = dict(
+            Author=self.novel.authorName,
+            Title=self.novel.title,
+            Summary=f'<![CDATA[{self.novel.desc}]]>',
+            Datetime=datetime.today().replace(microsecond=0).isoformat(),
+        )
+        return Template(self._META_XML).safe_substitute(metaMapping)
+
+    def _get_static_members(self):
+        """Return a list of (member name, encoded content) tuples for the static package members.
+
+        The styles depend on the novel's locale.
+        """
+        self.novel.check_locale()
+        key = (self.__class__, self.novel.languageCode, self.novel.countryCode)
+        try:
+            return list(self._staticMembers[key])
+
+        except KeyError:
+            pass
+
+        localeMapping = dict(
+            Language=self.novel.languageCode,
+            Country=self.novel.countryCode,
+            )
+        members = [
+            ('settings.xml', self._SETTINGS_XML),
+            ('META-INF/manifest.xml', self._MANIFEST_XML),
+            ('styles.xml', Template(self._STYLES_XML).safe_substitute(localeMapping)),
+            ]
+        if 'manifest.rdf' in self._ODF_COMPONENTS:
+            members.append(('manifest.rdf', self._MANIFEST_RDF))
+        members = [(memberName, text.encode('utf-8')) for memberName, text in members]
+        self._staticMembers[key] = members
+        return list(members)
+
+    def _tear_down(self):
+        """Do nothing, because there are no temporary files.
+
+        Overrides the superclass method.
+        """
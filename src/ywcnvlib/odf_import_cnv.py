@@ -0,0 +1,79 @@
+"""Provide the ODF import classes used by the converter.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-cnv
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+from pywriter.odt_r.odt_r_proof import OdtRProof
+from pywriter.odt_r.odt_r_manuscript import OdtRManuscript
+from pywriter.odt_r.odt_r_scenedesc import OdtRSceneDesc
+from pywriter.odt_r.odt_r_chapterdesc import OdtRChapterDesc
+from pywriter.odt_r.odt_r_partdesc import OdtRPartDesc
+from pywriter.odt_r.odt_r_characters import OdtRCharacters
+from pywriter.odt_r.odt_r_items import OdtRItems
+from pywriter.odt_r.odt_r_locations import OdtRLocations
+from pywriter.odt_r.odt_r_notes import OdtRNotes
+from pywriter.odt_r.odt_r_todo import OdtRTodo
+from pywriter.ods_r.ods_r_scenelist import OdsRSceneList
+from pywriter.ods_r.ods_r_charlist import OdsRCharList
+from pywriter.ods_r.ods_r_loclist import OdsRLocList
+from pywriter.ods_r.ods_r_itemlist import OdsRItemList
+from ywcnvlib.odt_reader_cnv import OdtReaderCnv
+from ywcnvlib.odt_r_formatted_cnv import OdtRFormattedCnv
+from ywcnvlib.ods_reader_cnv import OdsReaderCnv
+
+
+class OdtRProofCnv(OdtRProof, OdtRFormattedCnv, OdtReaderCnv):
+    """ODT proof reading file representation with a streaming parser and linear-time scene splitting."""
+
+
+class OdtRManuscriptCnv(OdtRManuscript, OdtRFormattedCnv, OdtReaderCnv):
+    """ODT manuscript file representation with a streaming parser and linear-time scene splitting."""
+
+
+class OdtRSceneDescCnv(OdtRSceneDesc, OdtReaderCnv):
+    """ODT scene summaries file representation with a streaming parser."""
+
+
+class OdtRChapterDescCnv(OdtRChapterDesc, OdtReaderCnv):
+    """ODT chapter summaries file representation with a streaming parser."""
+
+
+class OdtRPartDescCnv(OdtRPartDesc, OdtReaderCnv):
+    """ODT part summaries file representation with a streaming parser."""
+
+
+class OdtRCharactersCnv(OdtRCharacters, OdtReaderCnv):
+    """ODT character descriptions file representation with a streaming parser."""
+
+
+class OdtRItemsCnv(OdtRItems, OdtReaderCnv):
+    """ODT item descriptions file representation with a streaming parser."""
+
+
+class OdtRLocationsCnv(OdtRLocations, OdtReaderCnv):
+    """ODT location descriptions file representation with a streaming parser."""
+
+
+class OdtRNotesCnv(OdtRNotes, OdtRFormattedCnv, OdtReaderCnv):
+    """ODT "Notes" chapters file representation with a streaming parser and linear-time scene splitting."""
+
+
+class OdtRTodoCnv(OdtRTodo, OdtRFormattedCnv, OdtReaderCnv):
+    """ODT "Todo" chapters file representation with a streaming parser and linear-time scene splitting."""
+
+
+class OdsRSceneListCnv(OdsRSceneList, OdsReaderCnv):
+    """ODS scene list representation with a row generator."""
+
+
+class OdsRCharListCnv(OdsRCharList, OdsReaderCnv):
+    """ODS character list representation with a row generator."""
+
+
+class OdsRLocListCnv(OdsRLocList, OdsReaderCnv):
+    """ODS location list representation with a row generator."""
+
+
+class OdsRItemListCnv(OdsRItemList, OdsReaderCnv):
+    """ODS item list representation with a row generator."""
@@ -0,0 +1,115 @@
+"""Provide an ODS parser class that generates the table rows while reading.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-cnv
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import zipfile
+import xml.etree.ElementTree as ET
+from pywriter.pywriter_globals import *
+from pywriter.ods_r.ods_parser import OdsParser
+
+OFFICE_NS = '{urn:oasis:names:tc:opendocument:xmlns:office:1.0}'
+TEXT_NS = '{urn:oasis:names:tc:opendocument:xmlns:text:1.0}'
+TABLE_NS = '{urn:oasis:names:tc:opendocument:xmlns:table:1.0}'
+
+
+class OdsParserCnv(OdsParser):
+    """ODS parser that generates the rows of the first table while reading.
+
+    Public methods:
+        get_rows(filePath, cellsPerRow) -- Generate the rows of the first table.
+
+    content.xml is parsed incrementally, directly from the zip member.
+    Each row is discarded as soon as its cells are read, so the memory use
+    does not depend on the size of the sheet.
+    Parsing stops at the end of the first table.
+    """
+    _TABLE_PATH = [
+        f'{OFFICE_NS}document-content',
+        f'{OFFICE_NS}body',
+        f'{OFFICE_NS}spreadsheet',
+        f'{TABLE_NS}table',
+        ]
+    # Tags of the first table's ancestors, and the table itself.
+
+    def get_rows(self, filePath, cellsPerRow):
+        """Generate the rows of the first table, each as a list of cell contents.
+
+        Positional arguments:
+            filePath -- str: ODS document path.
+            cellsPerRow -- int: number of cells per row. Further cells are ignored.
+
+        Rows beginning with an empty cell are skipped.
+        Repeated rows are read once; repeated cells up to cellsPerRow.
+        Raise the "Error" exception in case of error.
+        Overrides the superclass method.
+        """
+        try:
+            odfFile = zipfile.ZipFile(filePath, 'r')
+            contentFile = odfFile.open('content.xml')
+        except:
+            raise Error(f'{_("Cannot read file")}: "{norm_path(filePath)}".')
+
+        tablePath = self._TABLE_PATH
+        tableDepth = len(tablePath)
+        rowTag = f'{TABLE_NS}table-row'
+        path = []
+        table = None
+        with odfFile, contentFile:
+            for event, element in ET.iterparse(contentFile, events=('start', 'end')):
+                if event == 'start':
+                    path.append(element.tag)
+                    if table is None and path == tablePath:
+                        table = element
+                    continue
+
+                path.pop()
+                if table is None or len(path) != tableDepth:
+                    if element is table:
+                        return
+
+                    continue
+
+                if element.tag == rowTag:
+                    cells = self._get_cells(element, cellsPerRow)
+                    if cells:
+                        yield cells
+
+                del table[:]
+
+    def _get_cells(self, row, cellsPerRow):
+        """Return a list with the contents of the row's cells.
+
+        Positional arguments:
+            row -- xml element of a table row.
+            cellsPerRow -- int: number of cells per row. Further cells are ignored.
+
+        Return an empty list, if the first cell is empty.
+        """
+        cells = []
+        i = 0
+        for cell in row.iterfind(f'{TABLE_NS}table-cell'):
+            content = ''
+            paragraphs = [''.join(paragraph.itertext()) for paragraph in cell.iterfind(f'{TEXT_NS}p')]
+            if paragraphs:
+                content = '\n'.join(paragraphs)
+                cells.append(content)
+            elif i > 0:
+                cells.append(content)
+            else:
+                break
+
+            i += 1
+            if i >= cellsPerRow:
+                break
+
+            attribute = cell.get(f'{TABLE_NS}number-columns-repeated')
+            if attribute:
+                repeat = min(int(attribute) - 1, cellsPerRow - i)
+                if repeat > 0:
+                    cells.extend([content] * repeat)
+                    i += repeat
+                    if i >= cellsPerRow:
+                        break
+        return cells
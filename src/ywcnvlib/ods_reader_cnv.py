@@ -0,0 +1,57 @@
+"""Provide a mixin class for ODS import with a row generator.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-cnv
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+from pywriter.pywriter_globals import *
+from pywriter.ods_r.ods_reader import OdsReader
+from ywcnvlib.ods_parser_cnv import OdsParserCnv
+from ywcnvlib.phase_timer import PHASE_TIMER
+from ywcnvlib.phase_timer import XML_PARSE
+
+
+class OdsReaderCnv(OdsReader):
+    """Mixin class for ODS import with a row generator.
+
+    Public methods:
+        read() -- Parse the file and get the instance variables.
+
+    The rows are not collected in a list, but read from the file
+    while the OdsReader subclass processes them.
+
+    Use it as a base class after an OdsReader subclass:
+    class OdsRSceneListCnv(OdsRSceneList, OdsReaderCnv)
+    """
+
+    def read(self):
+        """Set up the row generator that checks the table structure.
+
+        The OdsReader subclasses iterate self._rows after calling this method.
+        Raise the "Error" exception in case of error.
+        Overrides the superclass method.
+        """
+        parser = OdsParserCnv()
+        self._rows = self._check_rows(parser.get_rows(self.filePath, len(self._rowTitles)))
+
+    def _check_rows(self, rows):
+        """Generate the rows, making sure that each row has the expected number of cells.
+
+        Positional arguments:
+            rows -- iterable of lists of cell contents.
+
+        Measure the reading of the rows as "XML parse" phase.
+        Raise the "Error" exception in case of error.
+        """
+        cellsPerRow = len(self._rowTitles)
+        rows = iter(rows)
+        while True:
+            with PHASE_TIMER.phase(XML_PARSE):
+                row = next(rows, None)
+            if row is None:
+                return
+
+            if len(row) != cellsPerRow:
+                raise Error(f'{_("Wrong table structure")}.')
+
+            yield row
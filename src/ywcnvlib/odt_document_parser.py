@@ -0,0 +1,215 @@
+"""Provide a parser class that reads an open Writer document through the document model.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-cnv
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+from ywcnvlib.odt_parser_cnv import OdtParserCnv
+
+PARAGRAPH_SERVICE = 'com.sun.star.text.Paragraph'
+# Service of the text elements that are paragraphs.
+
+TABLE_SERVICE = 'com.sun.star.text.TextTable'
+# Service of the text elements that are tables.
+
+DEFAULT_STYLE = 'Standard'
+# Programmatic name of the default paragraph style.
+
+BOLD = 150.0
+# com.sun.star.awt.FontWeight.BOLD
+
+
+class OdtDocumentParser(OdtParserCnv):
+    """Parser for a Writer document that is open in the office application.
+
+    Public methods:
+        feed_document(document) -- Feed a Writer document to the parser.
+
+    The document's sections, paragraphs, tables, and text portions are walked through UNO,
+    and translated into the element events of the superclass parser.
+    So the client receives the same calls as from parsing the saved file,
+    without saving, unzipping, and parsing XML.
+
+    Text formatting is passed, if it differs from the paragraph style,
+    i.e. for the same direct formatting and character styles that are
+    written as automatic styles to the file.
+    As with the file, line breaks and tabs are dropped, and of a comment,
+    only the first paragraph is passed.
+    The paragraphs of a table are passed cell by cell, row by row, as they are in the file.
+    Frames and footnotes are skipped.
+    """
+    _DROPPED_CHARACTERS = str.maketrans('', '', '\n\t')
+    # Line breaks and tabs are elements without character data in the file.
+
+    def __init__(self, client):
+        """Initialize the parser.
+
+        Positional arguments:
+            client -- OdtReader instance that handles the parsed data.
+
+        Extends the superclass constructor.
+        """
+        super().__init__(client)
+        self._paragraphStyles = None
+        self._styleFormats = {}
+        # Key: paragraph style name; value: tuple (italic, bold, locale).
+
+    def feed_document(self, document):
+        """Feed a Writer document to the parser.
+
+        Positional arguments:
+            document -- Writer document model, e.g. XSCRIPTCONTEXT.getDocument().
+
+        First pass the document's locale and metadata to the client,
+        then walk the text paragraph by paragraph.
+        """
+        self._paragraphStyles = document.getStyleFamilies().getByName('ParagraphStyles')
+        self._styleFormats = {}
+        self._read_locale()
+        self._read_properties(document.getDocumentProperties())
+        sections = []
+        self._feed_elements(document.getText(), sections)
+        self._change_sections(sections, [])
+
+    def _feed_elements(self, text, sections):
+        """Pass the paragraphs of a text, descending into its tables.
+
+        Positional arguments:
+            text -- text of the document, or of a table cell.
+            sections -- list of the names of the open sections, outermost first. It is updated.
+        """
+        elements = text.createEnumeration()
+        while elements.hasMoreElements():
+            element = elements.nextElement()
+            if element.supportsService(PARAGRAPH_SERVICE):
+                self._change_sections(sections, self._get_sections(element))
+                self._feed_paragraph(element)
+            elif element.supportsService(TABLE_SERVICE):
+                for cellName in element.getCellNames():
+                    self._feed_elements(element.getCellByName(cellName), sections)
+
+    def _read_locale(self):
+        """Pass the document's default locale to the client."""
+        locale = self._paragraphStyles.getByName(DEFAULT_STYLE).getPropertyDefault('CharLocale')
+        self._client.handle_starttag('body', [('language', locale.Language or None), ('country', locale.Country or 'none')])
+
+    def _read_properties(self, properties):
+        """Pass the document's title, author, and description to the client.
+
+        Positional arguments:
+            properties -- document properties of the document model.
+        """
+        if properties.Title:
+            self._client.handle_starttag('title', [()])
+            self._client.handle_data(properties.Title)
+            self._client.handle_endtag('title')
+        if properties.Author:
+            self._client.handle_starttag('meta', [('', 'author'), ('', properties.Author)])
+        if properties.Description:
+            self._client.handle_starttag('meta', [('', 'description'), ('', properties.Description)])
+
+    def _get_sections(self, paragraph):
+        """Return a list with the names of the sections containing a paragraph, outermost first."""
+        sections = []
+        section = paragraph.TextSection
+        while section is not None:
+            sections.insert(0, section.getName())
+            section = section.getParentSection()
+        return sections
+
+    def _change_sections(self, openSections, sections):
+        """End the open sections that do not continue, and start the new ones.
+
+        Positional arguments:
+            openSections -- list of the names of the open sections, outermost first. It is updated.
+            sections -- list of the names of the sections to be open, outermost first.
+        """
+        common = 0
+        for openSection, section in zip(openSections, sections):
+            if openSection != section:
+                break
+
+            common += 1
+        while len(openSections) > common:
+            openSections.pop()
+            self._end_section()
+        for section in sections[common:]:
+            openSections.append(section)
+            self._start_section({'text:name': section})
+
+    def _feed_paragraph(self, paragraph):
+        """Pass a paragraph or heading with its text portions and comments."""
+        styleName = paragraph.ParaStyleName
+        styleFormat = self._get_style_format(styleName)
+        outlineLevel = paragraph.OutlineLevel
+        if outlineLevel:
+            self._start_heading({'text:outline-level': str(outlineLevel)})
+        else:
+            if paragraph.NumberingIsNumber:
+                self._start_list_item(None)
+            self._start_paragraph({'text:style-name': styleName})
+        portions = paragraph.createEnumeration()
+        while portions.hasMoreElements():
+            portion = portions.nextElement()
+            portionType = portion.TextPortionType
+            if portionType in ('Text', 'TextField'):
+                self._feed_text(portion, styleFormat)
+            elif portionType == 'Annotation':
+                self._feed_annotation(portion.TextField)
+        if outlineLevel:
+            self._end_heading()
+        else:
+            self._end_paragraph()
+            self._end_list_item()
+
+    def _feed_text(self, portion, styleFormat):
+        """Pass a text portion with the formatting that differs from the paragraph style.
+
+        Positional arguments:
+            portion -- text portion of a paragraph.
+            styleFormat -- tuple returned by _get_style_format().
+        """
+        text = portion.getString().translate(self._DROPPED_CHARACTERS)
+        if not text:
+            return
+
+        italic, bold, locale = self._get_format(portion)
+        spans = []
+        if italic and not styleFormat[0]:
+            spans.append(('em', [()]))
+        if bold and not styleFormat[1]:
+            spans.append(('strong', [()]))
+        if locale != styleFormat[2]:
+            spans.append(('lang', [('lang', locale)]))
+        for tag, attrs in spans:
+            self._span.append(tag)
+            self._client.handle_starttag(tag, attrs)
+        self.characters(text)
+        for __ in spans:
+            self._end_span()
+
+    def _feed_annotation(self, annotation):
+        """Pass the first paragraph of a comment."""
+        self._start_annotation(None)
+        paragraphs = annotation.Content.splitlines()
+        if paragraphs:
+            self._comment = paragraphs[0]
+        self._end_annotation()
+
+    def _get_style_format(self, styleName):
+        """Return a tuple with the text formatting of a paragraph style: (italic, bold, locale)."""
+        try:
+            return self._styleFormats[styleName]
+
+        except KeyError:
+            self._styleFormats[styleName] = self._get_format(self._paragraphStyles.getByName(styleName))
+            return self._styleFormats[styleName]
+
+    def _get_format(self, textProperties):
+        """Return a tuple with the text formatting of a style or text portion: (italic, bold, locale)."""
+        locale = textProperties.CharLocale
+        if locale.Country:
+            localeCode = f'{locale.Language}-{locale.Country}'
+        else:
+            localeCode = locale.Language
+        return textProperties.CharPosture.value == 'ITALIC', textProperties.CharWeight >= BOLD, localeCode
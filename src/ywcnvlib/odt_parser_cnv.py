@@ -0,0 +1,304 @@
+"""Provide an ODT parser class that streams content.xml through expat.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-cnv
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import zipfile
+import xml.etree.ElementTree as ET
+from xml.parsers import expat
+from pywriter.pywriter_globals import *
+from pywriter.odt_r.odt_parser import OdtParser
+
+NAMESPACES = dict(
+    office='urn:oasis:names:tc:opendocument:xmlns:office:1.0',
+    style='urn:oasis:names:tc:opendocument:xmlns:style:1.0',
+    fo='urn:oasis:names:tc:opendocument:xmlns:xsl-fo-compatible:1.0',
+    dc='http://purl.org/dc/elements/1.1/',
+    meta='urn:oasis:names:tc:opendocument:xmlns:meta:1.0'
+    )
+
+
+class OdtParserCnv(OdtParser):
+    """ODT parser with incremental expat parsing and tag dispatch tables.
+
+    Public methods:
+        feed_file(filePath) -- Feed an ODT file to the parser.
+
+    content.xml is parsed chunk by chunk, directly from the zip member.
+    Each element start and end is dispatched to a handler method via a dictionary;
+    elements without handler are skipped without looking at their attributes.
+    The style name lists are sets.
+    The client receives the same calls as from the superclass parser.
+    """
+    _CHUNK_SIZE = 0x10000 - 20
+    # Bytes fed to expat at a time. As with the sax expat reader,
+    # the client's character data is split at the same positions.
+
+    def __init__(self, client):
+        """Initialize the parser and the dispatch tables.
+
+        Positional arguments:
+            client -- OdtReader instance that handles the parsed data.
+
+        Extends the superclass constructor.
+        """
+        super().__init__(client)
+        self._emTags = set(self._emTags)
+        self._strongTags = set(self._strongTags)
+        self._blockquoteTags = set(self._blockquoteTags)
+        self._startHandlers = {
+            'text:p': self._start_paragraph,
+            'text:span': self._start_span,
+            'text:section': self._start_section,
+            'office:annotation': self._start_annotation,
+            'text:h': self._start_heading,
+            'text:list-item': self._start_list_item,
+            'style:style': self._start_style,
+            'style:text-properties': self._start_text_properties,
+            'text:s': self._start_space,
+            }
+        self._endHandlers = {
+            'text:p': self._end_paragraph,
+            'text:span': self._end_span,
+            'text:section': self._end_section,
+            'office:annotation': self._end_annotation,
+            'text:h': self._end_heading,
+            'text:list-item': self._end_list_item,
+            'style:style': self._end_style,
+            }
+
+    def feed_file(self, filePath):
+        """Feed an ODT file to the parser.
+
+        Positional arguments:
+            filePath -- str: ODT document path.
+
+        First pass the document's locale and metadata to the client,
+        then parse content.xml incrementally.
+        Raise the "Error" exception in case of error.
+        Overrides the superclass method.
+        """
+        try:
+            odfFile = zipfile.ZipFile(filePath, 'r')
+        except:
+            raise Error(f'{_("Cannot read file")}: "{norm_path(filePath)}".')
+
+        with odfFile:
+            try:
+                styles = odfFile.read('styles.xml')
+                try:
+                    meta = odfFile.read('meta.xml')
+                except KeyError:
+                    meta = None
+                contentFile = odfFile.open('content.xml')
+            except:
+                raise Error(f'{_("Cannot read file")}: "{norm_path(filePath)}".')
+
+            self._read_styles(styles)
+            if meta:
+                self._read_meta(meta)
+            parser = expat.ParserCreate()
+            parser.StartElementHandler = self._start_element
+            parser.EndElementHandler = self._end_element
+            parser.CharacterDataHandler = self.characters
+            with contentFile:
+                while True:
+                    try:
+                        chunk = contentFile.read(self._CHUNK_SIZE)
+                    except:
+                        raise Error(f'{_("Cannot read file")}: "{norm_path(filePath)}".')
+
+                    try:
+                        parser.Parse(chunk, not chunk)
+                    except expat.ExpatError as ex:
+                        raise Error(f'{_("Can not process file")} - {str(ex)}')
+
+                    if not chunk:
+                        break
+
+    def _read_styles(self, styles):
+        """Pass the document's default locale to the client.
+
+        Positional arguments:
+            styles -- bytes: content of styles.xml.
+        """
+        root = ET.fromstring(styles)
+        styles = root.find('office:styles', NAMESPACES)
+        for defaultStyle in styles.findall('style:default-style', NAMESPACES):
+            if defaultStyle.get(f'{{{NAMESPACES["style"]}}}family') == 'paragraph':
+                textProperties = defaultStyle.find('style:text-properties', NAMESPACES)
+                lngCode = textProperties.get(f'{{{NAMESPACES["fo"]}}}language')
+                ctrCode = textProperties.get(f'{{{NAMESPACES["fo"]}}}country')
+                self._client.handle_starttag('body', [('language', lngCode), ('country', ctrCode)])
+                break
+
+    def _read_meta(self, meta):
+        """Pass the document's title, author, and description to the client.
+
+        Positional arguments:
+            meta -- bytes: content of meta.xml.
+        """
+        root = ET.fromstring(meta)
+        meta = root.find('office:meta', NAMESPACES)
+        title = meta.find('dc:title', NAMESPACES)
+        if title is not None:
+            if title.text:
+                self._client.handle_starttag('title', [()])
+                self._client.handle_data(title.text)
+                self._client.handle_endtag('title')
+        author = meta.find('meta:initial-creator', NAMESPACES)
+        if author is not None:
+            if author.text:
+                self._client.handle_starttag('meta', [('', 'author'), ('', author.text)])
+        desc = meta.find('dc:description', NAMESPACES)
+        if desc is not None:
+            if desc.text:
+                self._client.handle_starttag('meta', [('', 'description'), ('', desc.text)])
+
+    def _start_element(self, name, attrs):
+        """Dispatch an element start to its handler, if any."""
+        handler = self._startHandlers.get(name, None)
+        if handler is not None:
+            handler(attrs)
+
+    def _end_element(self, name):
+        """Dispatch an element end to its handler, if any."""
+        handler = self._endHandlers.get(name, None)
+        if handler is not None:
+            handler()
+
+    def _start_paragraph(self, attrs):
+        """Start a paragraph, heading, list item, or block quote, depending on the style."""
+        style = attrs.get('text:style-name', '')
+        param = [()]
+        if style in self._languageTags:
+            param = [('lang', self._languageTags[style])]
+        if self._commentParagraphCount is not None:
+            self._commentParagraphCount += 1
+        elif style in self._blockquoteTags:
+            self._client.handle_starttag('blockquote', param)
+            self._paragraph = True
+            self._blockquote = True
+        elif style.startswith('Heading'):
+            self._heading = f'h{style[-1]}'
+            self._client.handle_starttag(self._heading, [()])
+        elif style in self._headingTags:
+            self._heading = self._headingTags[style]
+            self._client.handle_starttag(self._heading, [()])
+        elif self._list:
+            self._client.handle_starttag('li', [()])
+            self._paragraph = True
+        else:
+            self._client.handle_starttag('p', param)
+            self._paragraph = True
+        if style in self._emTags:
+            self._span.append('em')
+            self._client.handle_starttag('em', [()])
+        if style in self._strongTags:
+            self._span.append('strong')
+            self._client.handle_starttag('strong', [()])
+
+    def _start_span(self, attrs):
+        """Start emphasis, strong emphasis, or a language span, depending on the style."""
+        style = attrs.get('text:style-name', '')
+        if style in self._emTags:
+            self._span.append('em')
+            self._client.handle_starttag('em', [()])
+        if style in self._strongTags:
+            self._span.append('strong')
+            self._client.handle_starttag('strong', [()])
+        if style in self._languageTags:
+            self._span.append('lang')
+            self._client.handle_starttag('lang', [('lang', self._languageTags[style])])
+
+    def _start_section(self, attrs):
+        """Start a section, passing its name as ID."""
+        self._client.handle_starttag('div', [('id', attrs['text:name'])])
+
+    def _start_annotation(self, attrs):
+        """Start collecting a comment."""
+        self._commentParagraphCount = 0
+        self._comment = ''
+
+    def _start_heading(self, attrs):
+        """Start a heading of the outline level given."""
+        try:
+            self._heading = f'h{attrs["text:outline-level"]}'
+        except:
+            self._heading = f'h{attrs.get("text:style-name", "")[-1]}'
+        self._client.handle_starttag(self._heading, [()])
+
+    def _start_list_item(self, attrs):
+        """Start a list item."""
+        self._list = True
+
+    def _start_style(self, attrs):
+        """Register paragraph styles derived from headings or quotations."""
+        self._style = attrs.get('style:name', None)
+        styleName = attrs.get('style:parent-style-name', '')
+        if styleName.startswith('Heading'):
+            self._headingTags[self._style] = f'h{styleName[-1]}'
+        elif styleName == 'Quotations':
+            self._blockquoteTags.add(self._style)
+
+    def _start_text_properties(self, attrs):
+        """Register the current style as emphasis, strong emphasis, or language style."""
+        if attrs.get('fo:font-style', None) == 'italic':
+            self._emTags.add(self._style)
+        if attrs.get('fo:font-weight', None) == 'bold':
+            self._strongTags.add(self._style)
+        if attrs.get('fo:language', False):
+            lngCode = attrs['fo:language']
+            ctrCode = attrs['fo:country']
+            if ctrCode != 'none':
+                locale = f'{lngCode}-{ctrCode}'
+            else:
+                locale = lngCode
+            self._languageTags[self._style] = locale
+
+    def _start_space(self, attrs):
+        """Pass a space element."""
+        self._client.handle_starttag('s', [()])
+
+    def _end_paragraph(self):
+        """End a paragraph, closing the open spans."""
+        if self._commentParagraphCount is None:
+            while self._span:
+                self._client.handle_endtag(self._span.pop())
+            if self._blockquote:
+                self._client.handle_endtag('blockquote')
+                self._blockquote = False
+            elif self._heading:
+                self._client.handle_endtag(self._heading)
+                self._heading = None
+            else:
+                self._client.handle_endtag('p')
+            self._paragraph = False
+
+    def _end_span(self):
+        """End the innermost open span."""
+        if self._span:
+            self._client.handle_endtag(self._span.pop())
+
+    def _end_section(self):
+        """End a section."""
+        self._client.handle_endtag('div')
+
+    def _end_annotation(self):
+        """Pass the collected comment."""
+        self._client.handle_comment(self._comment)
+        self._commentParagraphCount = None
+
+    def _end_heading(self):
+        """End a heading."""
+        self._client.handle_endtag(self._heading)
+        self._heading = None
+
+    def _end_list_item(self):
+        """End a list item."""
+        self._list = False
+
+    def _end_style(self):
+        """End a style definition."""
+        self._style = None
@@ -0,0 +1,34 @@
+"""Provide a mixin class for formatted ODT import with linear-time scene splitting.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-cnv
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+from pywriter.odt_r.odt_r_formatted import OdtRFormatted
+from ywcnvlib.splitter_cnv import SplitterCnv
+from ywcnvlib.phase_timer import PHASE_TIMER
+from ywcnvlib.phase_timer import SCENE_SPLITTING
+
+
+class OdtRFormattedCnv(OdtRFormatted):
+    """Mixin class for formatted ODT import with linear-time scene splitting.
+
+    Public methods:
+        read() -- Parse the file and get the instance variables.
+
+    Use it as a base class between an OdtRFormatted subclass and OdtReaderCnv:
+    class OdtRProofCnv(OdtRProof, OdtRFormattedCnv, OdtReaderCnv)
+    """
+
+    def read(self):
+        """Parse the file and get the instance variables.
+
+        Split scenes by inserted chapter and scene dividers.
+        Raise the "Error" exception in case of error. 
+        Overrides the superclass method, skipping the OdtRFormatted method.
+        """
+        self.novel.languages = []
+        super(OdtRFormatted, self).read()
+        with PHASE_TIMER.phase(SCENE_SPLITTING):
+            sceneSplitter = SplitterCnv()
+            self.scenesSplit = sceneSplitter.split_scenes(self)
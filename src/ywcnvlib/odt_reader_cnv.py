@@ -0,0 +1,61 @@
+"""Provide a mixin class for ODT import with a streaming parser or from an open document.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-cnv
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+from pywriter.odt_r.odt_reader import OdtReader
+from ywcnvlib.odt_parser_cnv import OdtParserCnv
+from ywcnvlib.odt_document_parser import OdtDocumentParser
+from ywcnvlib.phase_timer import PHASE_TIMER
+from ywcnvlib.phase_timer import XML_PARSE
+from ywcnvlib.phase_timer import DOCUMENT_READ
+
+
+class OdtReaderCnv(OdtReader):
+    """Mixin class for ODT import with a streaming parser or from an open document.
+
+    Public methods:
+        read() -- Parse the file or the document, and get the instance variables.
+
+    Public instance variables:
+        document -- Writer document model to read instead of the file, or None.
+
+    The file is parsed by OdtParserCnv, the document is walked by OdtDocumentParser.
+    Both call the same handler methods as the superclass parser,
+    so the OdtReader subclasses work unchanged.
+    The file path still determines the yWriter project to write back to.
+
+    Use it as a base class after an OdtReader subclass:
+    class OdtRProofCnv(OdtRProof, OdtReaderCnv)
+    """
+
+    def __init__(self, filePath, **kwargs):
+        """Initialize instance variables.
+
+        Positional arguments:
+            filePath -- str: path to the ODT file.
+
+        Optional arguments:
+            kwargs -- keyword arguments (not used here).
+
+        Extends the superclass constructor.
+        """
+        super().__init__(filePath, **kwargs)
+        self.document = None
+
+    def read(self):
+        """Parse the file or the document, and get the instance variables.
+
+        Raise the "Error" exception in case of error. 
+        Overrides the superclass method.
+        """
+        if self.document is not None:
+            with PHASE_TIMER.phase(DOCUMENT_READ):
+                parser = OdtDocumentParser(self)
+                parser.feed_document(self.document)
+            return
+
+        with PHASE_TIMER.phase(XML_PARSE):
+            parser = OdtParserCnv(self)
+            parser.feed_file(self.filePath)
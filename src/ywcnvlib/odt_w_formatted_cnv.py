@@ -0,0 +1,119 @@
+"""Provide a mixin class for ODT export with single-pass markup translation.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-cnv
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import re
+from pywriter.odt_w.odt_w_formatted import OdtWFormatted
+from ywcnvlib.markup_translator import MarkupTranslator
+
+ODT_ESCAPES = [
+    ('&', '&amp;'),
+    ('>', '&gt;'),
+    ('<', '&lt;'),
+    ("'", '&apos;'),
+    ('"', '&quot;'),
+    ]
+
+
+class OdtWFormattedCnv(OdtWFormatted):
+    """Mixin class for ODT export with single-pass markup translation.
+
+    The translation tables are compiled once per language set and author.
+    If the language codes or the author's name contain markup,
+    the superclass conversion is used.
+
+    The text consists of the file header, the chapters, and the file footer.
+    Paragraphs starting with '> ' get the quotation style fragment by fragment,
+    so the text is never processed as a whole.
+
+    Use it as a base class between an OdtWFormatted subclass and OdfFileCnv:
+    class OdtWManuscriptCnv(OdtWManuscript, OdtWFormattedCnv, OdfFileCnv, FileExportCnv)
+    """
+    READS_SCENE_CONTENT = True
+    # Formatted exports write the scene contents.
+
+    _translators = {}
+    # Compiled translation tables, shared by all exporters. Key: (class, languages, author's name).
+
+    _QUOTATION_MARKS = ('"First_20_line_20_indent">&gt; ', '"Text_20_body">&gt; ')
+    # Paragraph beginnings replaced by the quotation style.
+
+    _ANNOTATED_QUOTATION = re.compile(r'"Text_20_body"\>(\<office\:annotation\>.+?\<\/office\:annotation\>)\&gt\; ')
+    # Quotation paragraph beginning with a comment.
+
+    def _convert_from_yw(self, text, quick=False):
+        """Return text, converted from yw7 markup to target format.
+
+        Positional arguments:
+            text -- string to convert.
+
+        Optional arguments:
+            quick -- bool: if True, apply a conversion mode for one-liners without formatting.
+
+        Overrides the superclass method.
+        """
+        if text and not quick:
+            translator = self._get_translator()
+            if translator is not None:
+                return translator.translate(text)
+
+        return super()._convert_from_yw(text, quick)
+
+    def _get_fragments(self):
+        """Generate the text fragments in file order, with the quotations styled.
+
+        Overrides the superclass method.
+        """
+        yield from map(self._style_quotations, self._get_fileHeader())
+        yield from map(self._style_quotations, self._get_chapter_fragments())
+        yield self._style_quotations(self._fileFooter)
+
+    def _get_text(self):
+        """Return the file's text as a string.
+
+        Overrides the superclass method.
+        """
+        return ''.join(self._get_fragments())
+
+    def _get_translator(self):
+        """Return the compiled MarkupTranslator for the novel, or None if not applicable."""
+        languages = self.novel.languages
+        key = (self.__class__, tuple(languages), self.novel.authorName)
+        try:
+            return self._translators[key]
+
+        except KeyError:
+            pass
+
+        if MarkupTranslator.is_translatable(languages, self.novel.authorName):
+            translator = MarkupTranslator(*self._get_translation_table())
+        else:
+            translator = None
+        self._translators[key] = translator
+        return translator
+
+    def _get_translation_table(self):
+        """Return a tuple: list of tags to be balanced, list of replacements in order of application."""
+        tags = ['i', 'b']
+        odtReplacements = list(ODT_ESCAPES)
+        odtReplacements.extend(self._get_replacements())
+        for i, language in enumerate(self.novel.languages, 1):
+            tags.append(f'lang={language}')
+            odtReplacements.append((f'[lang={language}]', f'<text:span text:style-name="T{i}">'))
+            odtReplacements.append((f'[/lang={language}]', '</text:span>'))
+        return tags, odtReplacements
+
+    def _style_quotations(self, text):
+        """Return text with the paragraphs starting with '> ' in the quotation style.
+
+        Positional arguments:
+            text -- str: rendered template, containing whole paragraphs.
+        """
+        if not '&gt; ' in text:
+            return text
+
+        for quotMark in self._QUOTATION_MARKS:
+            text = text.replace(quotMark, '"Quotations">')
+        return self._ANNOTATED_QUOTATION.sub('"Quotations">\\1', text)
@@ -0,0 +1,259 @@
+"""Provide a class for opt-in timing of the conversion phases.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-cnv
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+FACTORY_LOOKUP = 'factory lookup'
+YW7_DECODE = 'yw7 decode'
+XML_PARSE = 'XML parse'
+DOCUMENT_READ = 'document read'
+NOVEL_POPULATION = 'Novel population'
+SCENE_SPLITTING = 'Splitter'
+TEMPLATE_RENDERING = 'template rendering'
+ODF_PACKAGING = 'ODF packaging'
+ZIP_WRITE = 'zip write'
+YW7_POSTPROCESSING = 'yw7 post-processing'
+PHASES = (FACTORY_LOOKUP, YW7_DECODE, XML_PARSE, DOCUMENT_READ, NOVEL_POPULATION, SCENE_SPLITTING,
+          TEMPLATE_RENDERING, ODF_PACKAGING, ZIP_WRITE, YW7_POSTPROCESSING)
+# Conversion phases in report order.
+
+
+class PhaseTimer:
+    """Opt-in wall time and allocation measurement of the conversion phases.
+
+    Public methods:
+        enable(logPath, traceMemory) -- Switch the measurement on.
+        disable() -- Switch the measurement off.
+        start(title) -- Begin measuring a conversion.
+        stop() -- End measuring a conversion, and report the results.
+        phase(name) -- Return a context manager that measures a phase.
+        subscribe(callback) -- Have the reports passed to callback.
+        unsubscribe(callback) -- Stop passing the reports to callback.
+
+    Public instance variables:
+        enabled -- bool: if True, measure the phases of the conversions started.
+        logPath -- str: path of the log file the reports are appended to. If None, do not log.
+        traceMemory -- bool: if True, measure the allocation with tracemalloc.
+
+    A phase entered within another phase interrupts the outer one,
+    so each phase is measured without the phases nested in it.
+    The allocation is the net growth of the memory traced by tracemalloc during the phase.
+    Tracing the memory slows down the conversion considerably, so the times are less accurate.
+    When disabled, phase() returns a context manager that does nothing.
+    Phases measured in concurrent threads are added up.
+    """
+
+    def __init__(self):
+        """Initialize instance variables."""
+        self.enabled = False
+        self.logPath = None
+        self.traceMemory = True
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._title = None
+        self._startDate = None
+        self._startTime = None
+        self._tracing = False
+        self._results = {}
+        # [seconds, allocated bytes, calls] per phase. Key: phase name.
+
+    def enable(self, logPath=None, traceMemory=True):
+        """Switch the measurement on.
+
+        Optional arguments:
+            logPath -- str: path of the log file the reports are appended to. If None, do not log.
+            traceMemory -- bool: if True, measure the allocation with tracemalloc.
+        """
+        self.enabled = True
+        self.logPath = logPath
+        self.traceMemory = traceMemory
+
+    def disable(self):
+        """Switch the measurement off."""
+        self.enabled = False
+
+    def subscribe(self, callback):
+        """Have the reports passed to callback.
+
+        Positional arguments:
+            callback -- function taking the report dictionary returned by stop().
+        """
+        if not callback in self._subscribers:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        """Stop passing the reports to callback."""
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def start(self, title):
+        """Begin measuring a conversion, if enabled.
+
+        Positional arguments:
+            title -- str: conversion description for the report, e.g. the source file path.
+        """
+        if not self.enabled:
+            return
+
+        self._title = title
+        self._startDate = datetime.now()
+        self._results = {}
+        self._tracing = self.traceMemory and not tracemalloc.is_tracing()
+        if self._tracing:
+            tracemalloc.start()
+        self._startTime = time.perf_counter()
+
+    def stop(self):
+        """End measuring a conversion, and report the results.
+
+        Write the report to the log file, and pass it to the subscribers.
+        Return the report, or None if no measurement was started.
+        The report is a dictionary:
+            title -- str: conversion description.
+            date -- str: start time in ISO format.
+            total -- float: wall time in seconds.
+            peakMemory -- int: peak traced memory in bytes; 0 if the memory is not traced.
+            phases -- list of dictionaries with phase name, seconds, allocated bytes, and number of calls.
+        """
+        if self._startTime is None:
+            return None
+
+        total = time.perf_counter() - self._startTime
+        __, peakMemory = tracemalloc.get_traced_memory()
+        if self._tracing:
+            tracemalloc.stop()
+        phases = []
+        for name in sorted(self._results, key=lambda name: PHASES.index(name) if name in PHASES else len(PHASES)):
+            seconds, allocated, calls = self._results[name]
+            phases.append(dict(name=name, seconds=seconds, allocated=allocated, calls=calls))
+        report = dict(
+            title=self._title,
+            date=self._startDate.isoformat(sep=' ', timespec='seconds'),
+            total=total,
+            peakMemory=peakMemory,
+            phases=phases,
+            )
+        self._startTime = None
+        self._results = {}
+        self._write_log(report)
+        for callback in list(self._subscribers):
+            try:
+                callback(report)
+            except:
+                pass
+        return report
+
+    def phase(self, name):
+        """Return a context manager that measures a phase.
+
+        Positional arguments:
+            name -- str: phase name, preferably one of PHASES.
+        """
+        if self._startTime is None:
+            return _NO_PHASE
+
+        return _Phase(self, name)
+
+    def _get_stack(self):
+        """Return the list of the current thread's open phases, with their start times and traced memory."""
+        try:
+            return self._local.stack
+
+        except AttributeError:
+            self._local.stack = []
+            return self._local.stack
+
+    def _enter(self, name):
+        """Interrupt the current phase, if any, and begin the named one."""
+        stack = self._get_stack()
+        now = time.perf_counter()
+        memory, __ = tracemalloc.get_traced_memory()
+        if stack:
+            self._add(stack[-1], now, memory, 0)
+        stack.append([name, now, memory])
+
+    def _exit(self):
+        """End the current phase, and resume the interrupted one, if any."""
+        stack = self._get_stack()
+        now = time.perf_counter()
+        memory, __ = tracemalloc.get_traced_memory()
+        self._add(stack.pop(), now, memory, 1)
+        if stack:
+            stack[-1][1] = now
+            stack[-1][2] = memory
+
+    def _add(self, entry, now, memory, calls):
+        """Add the time and allocation since the entry's last start to its phase."""
+        name, startTime, startMemory = entry
+        with self._lock:
+            result = self._results.setdefault(name, [0.0, 0, 0])
+            result[0] += now - startTime
+            result[1] += memory - startMemory
+            result[2] += calls
+
+    def _write_log(self, report):
+        """Append the report to the log file. Ignore errors, so the conversion is not affected."""
+        if not self.logPath:
+            return
+
+        try:
+            with open(self.logPath, 'a', encoding='utf-8') as f:
+                f.write(f'{report["date"]} {report["title"]}\n')
+                f.write('\n'.join(format_report(report)))
+                f.write('\n\n')
+        except:
+            pass
+
+
+def format_report(report):
+    """Return a list of text lines with the phases of a report returned by PhaseTimer.stop().
+
+    The time not spent in any phase, e.g. for user dialogs, is listed as "other".
+    """
+    lines = []
+    measured = 0.0
+    for phase in report['phases']:
+        measured += phase['seconds']
+        lines.append(f'{phase["name"]:24}{phase["seconds"]:10.3f} s{phase["allocated"] / 0x400:12.0f} KiB'
+                     f'{phase["calls"]:8} calls')
+    lines.append(f'{"other":24}{report["total"] - measured:10.3f} s')
+    lines.append(f'{"total":24}{report["total"]:10.3f} s{report["peakMemory"] / 0x400:12.0f} KiB peak')
+    return lines
+
+
+class _Phase:
+    """Context manager that measures a phase of an enabled timer."""
+
+    def __init__(self, timer, name):
+        self._timer = timer
+        self._name = name
+
+    def __enter__(self):
+        self._timer._enter(self._name)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._timer._exit()
+        return False
+
+
+class _NoPhase:
+    """Context manager that does nothing, for a disabled timer."""
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NO_PHASE = _NoPhase()
+
+PHASE_TIMER = PhaseTimer()
+# Timer shared by all converter classes.
@@ -0,0 +1,70 @@
+"""Provide a class for compiled string templates.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-cnv
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+from string import Template
+
+
+class RenderPlan:
+    """A string.Template, compiled into literal text and placeholders.
+    
+    Public methods:
+        render(mapping) -- Return the template text with the placeholders substituted.
+
+    Public instance variables:
+        placeholders -- frozenset of the placeholder names the template references.
+        isStatic -- bool: True if the template text does not need any substitution.
+
+    Rendering gives the same result as Template.safe_substitute(),
+    but the template text is parsed only once.
+    """
+
+    def __init__(self, template):
+        """Parse the template text.
+        
+        Positional arguments:
+            template -- str: text with string.Template placeholders.
+        """
+        self._parts = []
+        # list of tuples: (literal text, placeholder name, placeholder text)
+        placeholders = set()
+        literal = []
+        position = 0
+        for match in Template.pattern.finditer(template):
+            literal.append(template[position:match.start()])
+            position = match.end()
+            name = match.group('named') or match.group('braced')
+            if name is not None:
+                self._parts.append((''.join(literal), name, match.group()))
+                placeholders.add(name)
+                literal = []
+            elif match.group('escaped') is not None:
+                literal.append(Template.delimiter)
+            else:
+                literal.append(match.group())
+        literal.append(template[position:])
+        self._tail = ''.join(literal)
+        self.placeholders = frozenset(placeholders)
+        self.isStatic = not self._parts
+
+    def render(self, mapping):
+        """Return the template text with the placeholders substituted.
+        
+        Positional arguments:
+            mapping -- dictionary with the placeholder names as keys.
+
+        Look up only the placeholders the template references.
+        Leave placeholders that are missing in the mapping unchanged.
+        Exceptions raised while computing a value are not caught.
+        """
+        text = []
+        for literal, name, placeholder in self._parts:
+            text.append(literal)
+            if name in mapping:
+                text.append(str(mapping[name]))
+            else:
+                text.append(placeholder)
+        text.append(self._tail)
+        return ''.join(text)
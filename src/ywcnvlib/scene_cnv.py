@@ -0,0 +1,231 @@
+"""Provide a compact scene class with lazy content loading, word and letter counting, and language scanning.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-cnv
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+from pywriter.model.novel import LANGUAGE_TAG
+from pywriter.model.scene import *
+from ywcnvlib.element_cnv import BasicElementCnv
+from ywcnvlib.element_cnv import intern_list
+
+
+def count_words(text):
+    """Return a tuple: (word count, letter count) of a scene text.
+
+    Positional arguments:
+        text -- str: scene content, or None.
+
+    Count words and letters like in LibreOffice.
+    This is a module-level function, so it can be passed to a process pool.
+    """
+    if not text:
+        return 0, 0
+
+    wordText = ADDITIONAL_WORD_LIMITS.sub(' ', text)
+    wordText = NO_WORD_LIMITS.sub('', wordText)
+    wordCount = len(wordText.split())
+    letterCount = len(NON_LETTERS.sub('', text))
+    return wordCount, letterCount
+
+
+def get_languages(text):
+    """Return a list of the language codes used in a scene text, in order of appearance.
+
+    Positional arguments:
+        text -- str: scene content, or None.
+    """
+    if not text:
+        return []
+
+    return list(dict.fromkeys([m.group(1) for m in LANGUAGE_TAG.finditer(text)]))
+
+
+class SceneCnv(BasicElementCnv):
+    """Compact yWriter scene representation with lazy content loading, word and letter counting, and language scanning.
+    
+    Public methods:
+        count_words() -- Count the words and letters of the scene content.
+        set_content_source(store, scId) -- Have the scene content read from a store on first access.
+
+    Public instance variables:
+        isCounted -- bool: True if wordCount and letterCount are up to date (read only).
+        languages -- list of the language codes used in the scene content (read only).
+
+    Assigning the scene content does not count anything.
+    Words and letters are counted on first access of wordCount or letterCount, 
+    and the result is cached until the scene content changes.
+    The same applies to the languages.
+
+    If a content source is set, the scene content is read from it on first access of sceneContent.
+    Counting words and scanning languages read the content without keeping it.
+
+    The instance variables are those of the pywriter Scene class, held in slots.
+    The tags and the character, location, and item IDs are stored as tuples of interned strings.
+    """
+    STATUS = Scene.STATUS
+    ACTION_MARKER = Scene.ACTION_MARKER
+    REACTION_MARKER = Scene.REACTION_MARKER
+    NULL_DATE = Scene.NULL_DATE
+    NULL_TIME = Scene.NULL_TIME
+
+    __slots__ = ('_sceneContent', '_wordCount', '_letterCount', 'scType', 'doNotExport', 'status', 'notes', '_tags',
+                 'field1', 'field2', 'field3', 'field4', 'appendToPrev', 'isReactionScene', 'isSubPlot',
+                 'goal', 'conflict', 'outcome', '_characters', '_locations', '_items',
+                 'date', 'time', 'day', 'lastsMinutes', 'lastsHours', 'lastsDays', 'image', 'scnArcs', 'scnMode',
+                 '_languages', '_contentStore', '_contentKey')
+
+    def __init__(self):
+        """Initialize instance variables.
+        
+        Extends the superclass constructor.
+        """
+        super().__init__()
+        self._sceneContent = None
+        self._wordCount = 0
+        self._letterCount = 0
+        self.scType = None
+        self.doNotExport = None
+        self.status = None
+        self.notes = None
+        self._tags = None
+        self.field1 = None
+        self.field2 = None
+        self.field3 = None
+        self.field4 = None
+        self.appendToPrev = None
+        self.isReactionScene = None
+        self.isSubPlot = None
+        self.goal = None
+        self.conflict = None
+        self.outcome = None
+        self._characters = None
+        self._locations = None
+        self._items = None
+        self.date = None
+        self.time = None
+        self.day = None
+        self.lastsMinutes = None
+        self.lastsHours = None
+        self.lastsDays = None
+        self.image = None
+        self.scnArcs = None
+        self.scnMode = None
+        self._languages = None
+        self._contentStore = None
+        self._contentKey = None
+
+    def __getstate__(self):
+        """Return the instance variables for pickling, with the scene content read from its source.
+
+        Overrides the superclass method.
+        """
+        if self._contentStore is not None:
+            self.sceneContent = self._contentStore.get(self._contentKey)
+        return super().__getstate__()
+
+    def set_content_source(self, store, scId):
+        """Have the scene content read from a store on first access.
+
+        Positional arguments:
+            store -- SceneContentStore instance.
+            scId -- str: scene ID in the store.
+
+        Invalidate the word and letter counts.
+        """
+        self.sceneContent = None
+        self._contentStore = store
+        self._contentKey = scId
+
+    def _get_content(self):
+        """Return the scene content, reading it from its source without keeping it."""
+        if self._contentStore is not None:
+            return self._contentStore.get(self._contentKey)
+
+        return self._sceneContent
+
+    @property
+    def sceneContent(self):
+        if self._contentStore is not None:
+            self.sceneContent = self._contentStore.get(self._contentKey)
+        return self._sceneContent
+
+    @sceneContent.setter
+    def sceneContent(self, text):
+        """Set the scene content, and invalidate the word and letter counts."""
+        self._sceneContent = text
+        self._contentStore = None
+        self._contentKey = None
+        self._wordCount = None
+        self._letterCount = None
+        self._languages = None
+
+    @property
+    def tags(self):
+        return self._tags
+
+    @tags.setter
+    def tags(self, tags):
+        self._tags = intern_list(tags)
+
+    @property
+    def characters(self):
+        return self._characters
+
+    @characters.setter
+    def characters(self, crIds):
+        self._characters = intern_list(crIds)
+
+    @property
+    def locations(self):
+        return self._locations
+
+    @locations.setter
+    def locations(self, lcIds):
+        self._locations = intern_list(lcIds)
+
+    @property
+    def items(self):
+        return self._items
+
+    @items.setter
+    def items(self, itIds):
+        self._items = intern_list(itIds)
+
+    @property
+    def wordCount(self):
+        if self._wordCount is None:
+            self.count_words()
+        return self._wordCount
+
+    @wordCount.setter
+    def wordCount(self, count):
+        self._wordCount = count
+
+    @property
+    def letterCount(self):
+        if self._letterCount is None:
+            self.count_words()
+        return self._letterCount
+
+    @letterCount.setter
+    def letterCount(self, count):
+        self._letterCount = count
+
+    @property
+    def languages(self):
+        if self._languages is None:
+            self._languages = get_languages(self._get_content())
+        return self._languages
+
+    @property
+    def isCounted(self):
+        return self._wordCount is not None and self._letterCount is not None
+
+    def count_words(self):
+        """Count the words and letters of the scene content, if not up to date."""
+        wordCount, letterCount = count_words(self._get_content())
+        if self._wordCount is None:
+            self._wordCount = wordCount
+        if self._letterCount is None:
+            self._letterCount = letterCount
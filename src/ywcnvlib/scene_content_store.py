@@ -0,0 +1,96 @@
+"""Provide a class for reading scene contents on demand from a memory-mapped yw7 file.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-cnv
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import mmap
+import re
+import xml.etree.ElementTree as ET
+from pywriter.pywriter_globals import *
+from ywcnvlib.phase_timer import PHASE_TIMER
+from ywcnvlib.phase_timer import YW7_DECODE
+
+
+class SceneContentStore:
+    """Byte ranges of the SceneContent elements of a UTF-8 encoded yw7 file.
+
+    Public methods:
+        get(scId) -- Decode and return the content of a scene.
+        close() -- Release the memory-mapped file.
+
+    Public instance variables:
+        filePath -- str: path to the yw7 file.
+
+    The file is scanned once when the store is created.
+    It stays memory-mapped until the store is closed,
+    so a scene content occupies memory only while a caller holds it.
+    Decoding a content gives the same text as the xml parser would.
+    """
+    _SCAN = re.compile(rb'<(/?)SCENE>|<ID>([^<]*)</ID>|(<SceneContent>.*?</SceneContent>|<SceneContent */>)'
+                       rb'|<!\[CDATA\[.*?\]\]>', re.DOTALL)
+    # Scene boundaries, element IDs, and SceneContent elements.
+    # Other CDATA sections are skipped, because they might contain anything.
+
+    _ILLEGAL_CHARACTERS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+    # Control characters not allowed in xml.
+
+    def __init__(self, filePath):
+        """Map the file into memory, and locate the scene contents.
+
+        Positional arguments:
+            filePath -- str: path to the yw7 file.
+
+        Raise OSError, if the file cannot be mapped.
+        """
+        self.filePath = filePath
+        self._ranges = {}
+        # key: scene ID; value: (start, end) of the SceneContent element.
+        with open(filePath, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with PHASE_TIMER.phase(YW7_DECODE):
+            self._scan()
+
+    def __contains__(self, scId):
+        return scId in self._ranges
+
+    def _scan(self):
+        """Locate the SceneContent elements, and assign them to their scenes."""
+        inScene = False
+        scId = None
+        contentRange = None
+        for match in self._SCAN.finditer(self._map):
+            if match.group(2) is not None:
+                if inScene and scId is None:
+                    scId = match.group(2).decode('utf-8')
+            elif match.group(3) is not None:
+                if inScene:
+                    contentRange = match.span(3)
+            elif match.group(1) is not None:
+                if inScene and scId is not None and contentRange is not None:
+                    self._ranges[scId] = contentRange
+                inScene = not match.group(1)
+                scId = None
+                contentRange = None
+
+    def get(self, scId):
+        """Decode and return the content of a scene, or None if the scene has no content.
+
+        Positional arguments:
+            scId -- str: scene ID.
+
+        Raise the "Error" exception, if the store is closed.
+        """
+        start, end = self._ranges[scId]
+        if self._map is None:
+            raise Error(f'{_("Cannot read file")}: "{norm_path(self.filePath)}".')
+
+        with PHASE_TIMER.phase(YW7_DECODE):
+            text = self._ILLEGAL_CHARACTERS.sub('', self._map[start:end].decode('utf-8'))
+            return ET.fromstring(text).text
+
+    def close(self):
+        """Release the memory-mapped file."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
@@ -0,0 +1,132 @@
+"""Provide a client class for the local conversion service.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-cnv
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import json
+import re
+import socket
+from pywriter.pywriter_globals import *
+
+EXPORT = 'export'
+IMPORT = 'import'
+PING = 'ping'
+SHUTDOWN = 'shutdown'
+# Job actions of the service.
+
+WRITTEN = 'written'
+SKIPPED = 'skipped'
+FAILED = 'failed'
+# Conversion status values of the results.
+
+LOOPBACK_HOSTS = ('localhost', '127.0.0.1', '::1')
+# Hosts a TCP service may listen on.
+
+_TCP_ADDRESS = re.compile(r'([\w.:-]+):([0-9]+)')
+# "host:port" as opposed to a socket file path.
+
+
+def parse_address(text):
+    """Return the service address: a socket file path, or a (host, port) tuple.
+
+    Positional arguments:
+        text -- str: socket file path, or "host:port" for a TCP socket.
+
+    Use TCP where Unix domain sockets are not available, e.g. on older Windows versions.
+    """
+    match = _TCP_ADDRESS.fullmatch(text.strip())
+    if match is not None:
+        return match.group(1), int(match.group(2))
+
+    return text.strip()
+
+
+class ServiceClient:
+    """Client for the conversion service's JSON job API.
+
+    Public methods:
+        submit(request) -- Send a job to the service, and return the response.
+        export_project(sourcePath, suffixes, overwrite) -- Export a yWriter project, and return the results.
+        import_document(sourcePath, overwrite) -- Import a document into its yWriter project, and return the result.
+
+    Public instance variables:
+        address -- str: socket file path, or (host, port) tuple.
+        timeout -- float: seconds to wait for a connection and a response. None means no limit.
+
+    Each request is a JSON object on a line of its own, and so is each response.
+    A new connection is opened per request.
+    Raise OSError, if the service is not running, so the caller can convert in-process instead.
+    """
+
+    def __init__(self, address, timeout=None):
+        """Initialize instance variables.
+
+        Positional arguments:
+            address -- str: socket file path, "host:port", or (host, port) tuple.
+
+        Optional arguments:
+            timeout -- float: seconds to wait for a connection and a response.
+        """
+        if isinstance(address, str):
+            address = parse_address(address)
+        self.address = address
+        self.timeout = timeout
+
+    def submit(self, request):
+        """Send a job to the service, and return the response.
+
+        Positional arguments:
+            request -- dict: job with "action" and the action's arguments.
+
+        Return a dictionary.
+        Raise OSError, if the service cannot be reached or closes the connection.
+        Raise the "Error" exception, if the service rejects the job.
+        """
+        if isinstance(self.address, str):
+            connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            connection = socket.socket(socket.AF_INET6 if ':' in self.address[0] else socket.AF_INET, socket.SOCK_STREAM)
+        with connection:
+            connection.settimeout(self.timeout)
+            connection.connect(self.address)
+            connection.sendall(f'{json.dumps(request)}\n'.encode('utf-8'))
+            with connection.makefile('rb') as stream:
+                line = stream.readline()
+        if not line:
+            raise ConnectionError('Conversion service closed the connection.')
+
+        response = json.loads(line.decode('utf-8'))
+        if 'error' in response:
+            raise Error(response['error'])
+
+        return response
+
+    def export_project(self, sourcePath, suffixes, overwrite=True):
+        """Export a yWriter project, and return a list of results, one per suffix.
+
+        Positional arguments:
+            sourcePath -- str: absolute path of the yWriter project file.
+            suffixes -- list of export target file suffixes, e.g. '_manuscript'.
+
+        Optional arguments:
+            overwrite -- bool: if True, overwrite existing target files; otherwise skip them.
+
+        The results are dictionaries with source, suffix, target, status, message, and warnings.
+        Error messages begin with "!".
+        """
+        return self.submit(dict(action=EXPORT, source=sourcePath, suffixes=suffixes, overwrite=overwrite))['results']
+
+    def import_document(self, sourcePath, overwrite=True):
+        """Import a document into its yWriter project, and return the result.
+
+        Positional arguments:
+            sourcePath -- str: absolute path of the document.
+
+        Optional arguments:
+            overwrite -- bool: if True, overwrite the existing project; otherwise skip the document.
+
+        The result is a dictionary with source, suffix, target, status, message, and warnings.
+        Error messages begin with "!".
+        """
+        return self.submit(dict(action=IMPORT, source=sourcePath, overwrite=overwrite))['results'][0]
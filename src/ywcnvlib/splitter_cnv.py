@@ -0,0 +1,171 @@
+"""Provide a class for linear-time splitting of scenes and chapters.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-cnv
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+from pywriter.pywriter_globals import *
+from pywriter.model.splitter import Splitter
+from ywcnvlib.element_cnv import ChapterCnv
+from ywcnvlib.scene_cnv import SceneCnv
+
+
+class SplitterCnv(Splitter):
+    """Helper class for scene and chapter splitting in linear time.
+
+    Public methods:
+        split_scenes(file) -- Split scenes by inserted chapter and scene dividers.
+
+    Scenes without dividers are skipped without touching their content.
+    New IDs are allocated by the novel, so the search for a free ID
+    does not start over for each new element.
+    Each resulting scene content is assigned once, and not counted before it is used.
+    The result is the same as with the superclass.
+    """
+    _WARNING = '(!)'
+
+    def split_scenes(self, file):
+        """Split scenes by inserted chapter and scene dividers.
+
+        Positional arguments:
+            file -- File instance with a NovelCnv instance whose scenes are to be split.
+
+        Return True if the structure has changed.
+        Overrides the superclass method.
+        """
+        novel = file.novel
+        scenesSplit = False
+        srtChapters = []
+        for chId in novel.srtChapters:
+            srtChapters.append(chId)
+            chapterId = chId
+            srtScenes = []
+            for scId in novel.chapters[chId].srtScenes:
+                srtScenes.append(scId)
+                text = novel.scenes[scId].sceneContent
+                if not text:
+                    continue
+
+                if not text.startswith(self.PART_SEPARATOR) and not f'\n{self.PART_SEPARATOR}' in text:
+                    continue
+
+                sceneId = scId
+                newLines = []
+                inScene = True
+                sceneSplitCount = 0
+                for line in text.split('\n'):
+                    if not line.startswith(self.PART_SEPARATOR):
+                        if not inScene:
+                            sceneSplitCount += 1
+                            sceneId = novel.get_new_id('scenes')
+                            self._create_scene(novel, sceneId, novel.scenes[scId], sceneSplitCount, '', '')
+                            srtScenes.append(sceneId)
+                            scenesSplit = True
+                            inScene = True
+                        newLines.append(line)
+                        continue
+
+                    heading = line.strip('# ').split(self.DESC_SEPARATOR)
+                    title = heading[0]
+                    try:
+                        desc = heading[1]
+                    except:
+                        desc = ''
+                    if line.startswith(self.SCENE_SEPARATOR):
+                        novel.scenes[sceneId].sceneContent = '\n'.join(newLines)
+                        newLines = []
+                        sceneSplitCount += 1
+                        sceneId = novel.get_new_id('scenes')
+                        self._create_scene(novel, sceneId, novel.scenes[scId], sceneSplitCount, title, desc)
+                        srtScenes.append(sceneId)
+                        scenesSplit = True
+                        inScene = True
+                        continue
+
+                    if inScene:
+                        novel.scenes[sceneId].sceneContent = '\n'.join(newLines)
+                        newLines = []
+                        sceneSplitCount = 0
+                        inScene = False
+                    novel.chapters[chapterId].srtScenes = srtScenes
+                    srtScenes = []
+                    chapterId = novel.get_new_id('chapters')
+                    if line.startswith(self.CHAPTER_SEPARATOR):
+                        if not title:
+                            title = _('New Chapter')
+                        self._create_chapter(novel, chapterId, title, desc, 0)
+                        scenesSplit = True
+                    else:
+                        if not title:
+                            title = _('New Part')
+                        self._create_chapter(novel, chapterId, title, desc, 1)
+                    srtChapters.append(chapterId)
+                if inScene:
+                    novel.scenes[sceneId].sceneContent = '\n'.join(newLines)
+            novel.chapters[chapterId].srtScenes = srtScenes
+        novel.srtChapters = srtChapters
+        return scenesSplit
+
+    def _create_chapter(self, novel, chapterId, title, desc, level):
+        """Add a new chapter to the novel.
+
+        Positional arguments:
+            novel -- Novel instance.
+            chapterId -- str: ID of the new chapter.
+            title -- str: chapter title.
+            desc -- str: chapter description.
+            level -- int: 0 for a chapter, 1 for a part.
+        """
+        newChapter = ChapterCnv()
+        newChapter.title = title
+        newChapter.desc = desc
+        newChapter.chLevel = level
+        newChapter.chType = 0
+        novel.chapters[chapterId] = newChapter
+
+    def _create_scene(self, novel, sceneId, parent, splitCount, title, desc):
+        """Add a new scene to the novel, taking over the parent scene's properties.
+
+        Positional arguments:
+            novel -- Novel instance.
+            sceneId -- str: ID of the new scene.
+            parent -- Scene instance the new scene is split off.
+            splitCount -- int: number of the new scene within the parent scene.
+            title -- str: scene title. If empty, derive it from the parent scene's title.
+            desc -- str: scene description.
+
+        Mark the parent scene's description and goals, because they may no longer apply.
+        """
+        newScene = SceneCnv()
+        if title:
+            newScene.title = title
+        elif parent.title:
+            if len(parent.title) > self._CLIP_TITLE:
+                title = f'{parent.title[:self._CLIP_TITLE]}...'
+            else:
+                title = parent.title
+            newScene.title = f'{title} Split: {splitCount}'
+        else:
+            newScene.title = f'{_("New Scene")} Split: {splitCount}'
+        if desc:
+            newScene.desc = desc
+        if parent.desc and not parent.desc.startswith(self._WARNING):
+            parent.desc = f'{self._WARNING}{parent.desc}'
+        if parent.goal and not parent.goal.startswith(self._WARNING):
+            parent.goal = f'{self._WARNING}{parent.goal}'
+        if parent.conflict and not parent.conflict.startswith(self._WARNING):
+            parent.conflict = f'{self._WARNING}{parent.conflict}'
+        if parent.outcome and not parent.outcome.startswith(self._WARNING):
+            parent.outcome = f'{self._WARNING}{parent.outcome}'
+
+        if parent.status > 2:
+            parent.status = 2
+        newScene.status = parent.status
+        newScene.scType = parent.scType
+        newScene.date = parent.date
+        newScene.time = parent.time
+        newScene.day = parent.day
+        newScene.lastsDays = parent.lastsDays
+        newScene.lastsHours = parent.lastsHours
+        newScene.lastsMinutes = parent.lastsMinutes
+        novel.scenes[sceneId] = newScene
@@ -0,0 +1,60 @@
+"""Provide a non-interactive user interface class for batch conversion.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-cnv
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+from pywriter.ui.ui import Ui
+
+
+class UiBatch(Ui):
+    """UI subclass that never prompts, and collects the messages.
+
+    Public methods:
+        ask_yes_no(text) -- Return the preset answer without asking.
+        set_info_how(message) -- Store the result message.
+        show_warning(message) -- Collect a warning.
+
+    Public instance variables:
+        answer -- bool: answer to all yes/no questions, e.g. whether to overwrite existing files.
+        questions -- list of the questions answered.
+        warnings -- list of the warnings issued during conversion.
+    """
+
+    def __init__(self, title, answer=True):
+        """Initialize instance variables.
+
+        Positional arguments:
+            title -- str: application title.
+
+        Optional arguments:
+            answer -- bool: answer to all yes/no questions.
+
+        Extends the superclass constructor.
+        """
+        super().__init__(title)
+        self.answer = answer
+        self.questions = []
+        self.warnings = []
+
+    def ask_yes_no(self, text):
+        """Return the preset answer without asking.
+
+        Overrides the superclass method.
+        """
+        self.questions.append(text)
+        return self.answer
+
+    def set_info_how(self, message):
+        """Store the result message without printing it.
+
+        Overrides the superclass method.
+        """
+        self.infoHowText = message
+
+    def show_warning(self, message):
+        """Collect a warning.
+
+        Overrides the superclass method.
+        """
+        self.warnings.append(message)
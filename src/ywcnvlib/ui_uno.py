@@ -9,6 +9,7 @@ from com.sun.star.awt.MessageBoxButtons import BUTTONS_OK, BUTTONS_OK_CANCEL, BU
 from com.sun.star.awt.MessageBoxType import MESSAGEBOX, INFOBOX, WARNINGBOX, ERRORBOX, QUERYBOX
 from pywriter.ui.ui import Ui
 from ywcnvlib.uno_tools import *
+from ywcnvlib.phase_timer import format_report
 
 
 class UiUno(Ui):
@@ -27,6 +28,10 @@ class UiUno(Ui):
         else:
             msgbox(message, type_msg=INFOBOX)
 
+    def show_timing(self, report):
+        """Display the phase timing report of a conversion."""
+        msgbox('\n'.join(format_report(report)), title=report['title'], type_msg=INFOBOX)
+
     def show_warning(self, message):
         """Display a warning message box."""
         msgbox(message, buttons=BUTTONS_OK, type_msg=WARNINGBOX)
@@ -0,0 +1,1028 @@
+"""Provide a class for yWriter 7 project import and export with a streaming reader and writer.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-cnv
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import os
+import codecs
+import copy
+import re
+from datetime import datetime
+import xml.etree.ElementTree as ET
+from pywriter.pywriter_globals import *
+from pywriter.yw.yw7_file import Yw7File
+from ywcnvlib.element_cnv import BasicElementCnv
+from ywcnvlib.element_cnv import ChapterCnv
+from ywcnvlib.element_cnv import CharacterCnv
+from ywcnvlib.element_cnv import WorldElementCnv
+from ywcnvlib.element_cnv import get_state
+from ywcnvlib.scene_cnv import SceneCnv
+from ywcnvlib.novel_cache import NovelCache
+from ywcnvlib.novel_index import NovelIndex
+from ywcnvlib.scene_content_store import SceneContentStore
+from ywcnvlib.phase_timer import PHASE_TIMER
+from ywcnvlib.phase_timer import YW7_DECODE
+from ywcnvlib.phase_timer import XML_PARSE
+from ywcnvlib.phase_timer import NOVEL_POPULATION
+from ywcnvlib.phase_timer import YW7_POSTPROCESSING
+
+
+class Yw7FileCnv(Yw7File):
+    """yWriter 7 project file representation with a single-pass streaming reader.
+
+    Public methods:
+        read() -- Parse the yWriter xml file and get the instance variables.
+        write() -- Build the yWriter xml file.
+        close() -- Release the memory-mapped project file of the lazy mode.
+
+    Public class variables:
+        novelCache -- NovelCache instance shared by all project files; None means no caching.
+
+    Public instance variables:
+        keepTree -- bool: if False, discard each xml element once its data is read.
+        lazyContent -- bool: if True, and the xml tree is not kept, read the scene contents on demand.
+
+    The reader decodes the file chunk by chunk, filters illegal control characters
+    on the fly, and fills the novel while the xml parser runs.
+    Set keepTree to False for project files that are read, but never written back.
+    Such files are read via the novel cache, if the file is unchanged since the last reading.
+    The novel's cross reference index, if any, is built before caching, and restored with the novel.
+
+    The novel's elements are compact, slotted objects.
+
+    In the lazy mode, the reader records the byte range of each scene content,
+    and keeps the UTF-8 encoded project file memory-mapped.
+    A scene content is decoded when sceneContent is first read,
+    so the novel's memory footprint is that of the outline.
+    The novel cache is not used then, and the file is released by close().
+    Files with another encoding are read completely.
+
+    The writer serializes the xml tree in one pass directly to the file,
+    without having to re-read and post-process it.
+    If the xml tree is kept, the writer compares the novel with its state after reading.
+    Then only the changed scenes, chapters, and characters are rebuilt,
+    and an unchanged project is not written at all.
+    Other changes, e.g. added scenes or a changed project description, cause a full rebuild.
+    The adjustments made while reading, e.g. scene types inherited from the chapter,
+    count as changes, so they are written back.
+    The unchanged elements are written as read. So the written file is the same as with a full rebuild,
+    if the project file was last written by this class. Otherwise, the unchanged elements
+    keep the formatting of the writing application, e.g. yWriter's field order.
+
+    The xml tree holds plain text; the writer escapes it, as ElementTree does.
+    """
+    _CHUNK_SIZE = 0x40000
+    # Bytes to read before parsing.
+
+    _ILLEGAL_CHARACTERS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+    # Control characters not allowed in xml.
+
+    _ENCODING_DECLARATION = re.compile(rb'<\?xml[^>]*?encoding=["\']([A-Za-z0-9._-]+)["\']')
+    # Encoding declared in the xml declaration.
+
+    novelCache = NovelCache([BasicElementCnv, ChapterCnv, CharacterCnv, WorldElementCnv, SceneCnv, NovelIndex])
+
+    _PATCHABLE_TAGS = ('SCENE', 'CHAPTER', 'CHARACTER')
+    # Elements that can be rebuilt individually.
+
+    _COLLECTIONS = (
+        ('SCENE', 'scenes'),
+        ('CHAPTER', 'chapters'),
+        ('CHARACTER', 'characters'),
+        ('LOCATION', 'locations'),
+        ('ITEM', 'items'),
+        ('PROJECTNOTE', 'projectNotes'),
+        )
+    # Novel attributes holding the elements, by xml tag.
+
+    _UNTRACKED_ATTRIBUTES = ('languages', '_nextIds', '_wordCount', '_letterCount', '_languages', '_index',
+                             '_statistics', '_contentStore', '_contentKey')
+    # Derived attributes that are not written back to the project file.
+
+    def __init__(self, filePath, **kwargs):
+        """Initialize instance variables.
+
+        Positional arguments:
+            filePath -- str: path to the yw7 file.
+
+        Optional arguments:
+            kwargs -- keyword arguments (not used here).
+
+        Extends the superclass constructor.
+        """
+        super().__init__(filePath, **kwargs)
+        self.keepTree = True
+        self.lazyContent = False
+        self._cdataTags = set(self._CDATA_TAGS)
+        self._elementReaders = {
+            'PROJECT': self._read_project_element,
+            'LOCATION': self._read_location_element,
+            'ITEM': self._read_item_element,
+            'CHARACTER': self._read_character_element,
+            'PROJECTNOTE': self._read_projectnote_element,
+            'PROJECTVAR': self._read_projectvar_element,
+            'SCENE': self._read_scene_element,
+            'CHAPTER': self._read_chapter_element,
+            }
+        self._xmlElements = None
+        # Index of the patchable xml elements. Key: tag; value: dictionary with the element IDs as keys.
+        self._readStates = None
+        # States of the novel and its elements after reading or writing.
+        self._contentStore = None
+        # SceneContentStore instance of the lazy mode.
+
+    def read(self):
+        """Parse the yWriter xml file, fetching the Novel attributes.
+
+        Read the file in one pass, dispatching each top-level element
+        to its reader method as soon as the parser has completed it.
+        If the xml tree is not kept, restore the novel from the cache, if possible.
+        Raise the "Error" exception in case of error.
+        Overrides the superclass method.
+        """
+        for field in self.PRJ_KWVAR:
+            self.novel.kwVar[field] = None
+
+        if self.is_locked():
+            raise Error(f'{_("yWriter seems to be open. Please close first")}.')
+
+        if self.keepTree:
+            self._read_file()
+            self._index_elements()
+            return
+
+        if self.novelCache is None or self.lazyContent:
+            self._read_file()
+            return
+
+        signature = self.novelCache.get_signature(self.filePath)
+        with PHASE_TIMER.phase(NOVEL_POPULATION):
+            if self.novelCache.restore(self.filePath, signature, self.novel):
+                return
+
+        self._read_file()
+        with PHASE_TIMER.phase(NOVEL_POPULATION):
+            get_index = getattr(self.novel, 'get_index', None)
+            if get_index is not None:
+                get_index()
+        self.novelCache.store(self.filePath, signature, self.novel)
+
+    def _read_file(self):
+        """Parse the yWriter xml file, fetching the Novel attributes.
+
+        If the xml tree is kept, save the states for change detection
+        before the references are checked and the scene types are adjusted.
+        If the file cannot be decoded as sniffed, read it again with the declared encoding.
+        Raise the "Error" exception in case of error.
+        """
+        encoding = self._get_encoding()
+        self.close()
+        if self.lazyContent and not self.keepTree and encoding in ('utf-8', 'utf-8-sig'):
+            try:
+                self._contentStore = SceneContentStore(self.filePath)
+            except (OSError, ValueError):
+                pass
+        try:
+            try:
+                self._reset_lists()
+                root = self._parse_file(encoding)
+            except UnicodeDecodeError:
+                self.close()
+                self._reset_lists()
+                root = self._parse_file(self._get_declared_encoding())
+        except Exception as ex:
+            raise Error(f'{_("Can not process file")} - {str(ex)}')
+
+        self.tree = ET.ElementTree(root)
+        if self.keepTree:
+            self._track_changes()
+        with PHASE_TIMER.phase(NOVEL_POPULATION):
+            self._link_elements()
+            self.adjust_scene_types()
+
+    def close(self):
+        """Release the memory-mapped project file of the lazy mode.
+
+        Scene contents not read until then cannot be read any more.
+        """
+        if self._contentStore is not None:
+            self._contentStore.close()
+            self._contentStore = None
+
+    def write(self):
+        """Write back the changes made to the novel since reading.
+
+        Rebuild only the changed scenes, chapters, and characters, if possible.
+        Do not touch the project file, if nothing has changed.
+        Raise the "Error" exception in case of error.
+        Extends the superclass method.
+        """
+        with PHASE_TIMER.phase(YW7_POSTPROCESSING):
+            self._write_changes()
+
+    def _write_changes(self):
+        """Write back the changes made to the novel since reading.
+
+        Raise the "Error" exception in case of error.
+        """
+        if self.is_locked():
+            raise Error(f'{_("yWriter seems to be open. Please close first")}.')
+
+        if self.novel.languages is None:
+            self.novel.get_languages()
+        changes = self._get_changes()
+        if changes is None:
+            super().write()
+            self._index_elements()
+            self._track_changes()
+            return
+
+        if not any(changes.values()):
+            return
+
+        for scId in self.novel.scenes:
+            if self.novel.scenes[scId].scnArcs is not None:
+                self.novel.scenes[scId].kwVar['Field_SceneArcs'] = self.novel.scenes[scId].scnArcs
+            if self.novel.scenes[scId].scnMode is not None:
+                if self.novel.scenes[scId].scnMode == 0:
+                    self.novel.scenes[scId].kwVar['Field_SceneMode'] = None
+                else:
+                    self.novel.scenes[scId].kwVar['Field_SceneMode'] = str(self.novel.scenes[scId].scnMode)
+            self.novel.scenes[scId].kwVar['Field_SceneStyle'] = None
+        self._patch_element_tree(changes)
+        self._write_element_tree(self)
+        self._track_changes()
+
+    def _index_elements(self):
+        """Build the index of the patchable xml elements in the order of the project file."""
+        root = self.tree.getroot()
+        self._xmlElements = {}
+        for tag in self._PATCHABLE_TAGS:
+            self._xmlElements[tag] = {}
+            for xmlElement in root.iterfind(f'{tag}S/{tag}'):
+                self._xmlElements[tag][xmlElement.find('ID').text] = xmlElement
+
+    def _get_state(self, element):
+        """Return a dictionary with the tracked attributes of a novel or one of its elements."""
+        return {attr: value for attr, value in get_state(element).items() if not attr in self._UNTRACKED_ATTRIBUTES}
+
+    def _track_changes(self):
+        """Save the states of the novel and its elements for change detection."""
+        states = {'PROJECT': self._get_state(self.novel)}
+        for tag, collection in self._COLLECTIONS:
+            elements = getattr(self.novel, collection)
+            del states['PROJECT'][collection]
+            states[tag] = {elemId: self._get_state(elements[elemId]) for elemId in elements}
+        self._readStates = copy.deepcopy(states)
+
+    def _get_changes(self):
+        """Return a dictionary with lists of the changed element IDs, or None if a full rebuild is required.
+
+        Key: tag of the patchable elements.
+        A full rebuild is required if the project data, the structure,
+        or the locations, items, and project notes have changed.
+        """
+        if self._readStates is None or self.tree is None:
+            return None
+
+        if not self._has_project_variables():
+            return None
+
+        projectState = self._get_state(self.novel)
+        for __, collection in self._COLLECTIONS:
+            del projectState[collection]
+        if projectState != self._readStates['PROJECT']:
+            return None
+
+        srtIds = {
+            'SCENE': list(self.novel.scenes),
+            'CHAPTER': self.novel.srtChapters,
+            'CHARACTER': self.novel.srtCharacters,
+            }
+        changes = {}
+        for tag, collection in self._COLLECTIONS:
+            elements = getattr(self.novel, collection)
+            states = self._readStates[tag]
+            if list(elements) != list(states):
+                return None
+
+            changedIds = [elemId for elemId in elements if self._get_state(elements[elemId]) != states[elemId]]
+            if tag in self._PATCHABLE_TAGS:
+                if srtIds[tag] != list(self._xmlElements[tag]):
+                    return None
+
+                changes[tag] = changedIds
+            elif changedIds:
+                return None
+
+        return changes
+
+    def _has_project_variables(self):
+        """Return True if the project variables for the novel's locale and languages exist.
+
+        Otherwise, the PROJECTVARS section must be rebuilt.
+        """
+        if not (self.novel.languages or self.novel.languageCode or self.novel.countryCode):
+            return True
+
+        self.novel.check_locale()
+        xmlProjectvars = self.tree.getroot().find('PROJECTVARS')
+        if xmlProjectvars is None:
+            return False
+
+        prjVars = {}
+        for xmlProjectvar in xmlProjectvars.iterfind('PROJECTVAR'):
+            prjVars[xmlProjectvar.find('Title').text] = xmlProjectvar.find('Desc')
+        for title, code in (('Language', self.novel.languageCode), ('Country', self.novel.countryCode)):
+            if prjVars.get(title, None) is None or prjVars[title].text != code:
+                return False
+
+        for langCode in self.novel.languages:
+            if not f'lang={langCode}' in prjVars:
+                return False
+
+        return True
+
+    def _patch_element_tree(self, changes):
+        """Rebuild the changed scenes, chapters, and characters in the xml element tree.
+
+        Positional arguments:
+            changes -- dictionary with lists of the changed element IDs, as returned by _get_changes().
+
+        The changed elements are rebuilt by the superclass method in a temporary tree
+        that contains only them, referring to a novel that contains only them.
+        Scene and chapter elements are updated in place, character elements are replaced.
+        """
+        novel = self.novel
+        tree = self.tree
+        patchNovel = copy.copy(novel)
+        patchNovel.kwVar = dict(novel.kwVar)
+        patchNovel.languages = []
+        patchNovel.languageCode = ''
+        patchNovel.countryCode = ''
+        patchNovel.scenes = {scId: novel.scenes[scId] for scId in changes['SCENE']}
+        patchNovel.chapters = {chId: novel.chapters[chId] for chId in changes['CHAPTER']}
+        patchNovel.srtChapters = changes['CHAPTER']
+        patchNovel.characters = {crId: novel.characters[crId] for crId in changes['CHARACTER']}
+        patchNovel.srtCharacters = changes['CHARACTER']
+        patchNovel.locations = {}
+        patchNovel.srtLocations = []
+        patchNovel.items = {}
+        patchNovel.srtItems = []
+        patchNovel.projectNotes = {}
+        patchNovel.srtPrjNotes = []
+        patchRoot = ET.Element('YWRITER7')
+        for tag in ('PROJECT', 'LOCATIONS', 'ITEMS', 'CHARACTERS', 'PROJECTNOTES', 'SCENES', 'CHAPTERS'):
+            ET.SubElement(patchRoot, tag)
+        tails = {}
+        for tag in ('SCENE', 'CHAPTER'):
+            for elemId in changes[tag]:
+                xmlElement = self._xmlElements[tag][elemId]
+                tails[xmlElement] = xmlElement.tail
+                patchRoot.find(f'{tag}S').append(xmlElement)
+        self.novel = patchNovel
+        self.tree = ET.ElementTree(patchRoot)
+        try:
+            self._build_element_tree()
+        finally:
+            self.novel = novel
+            self.tree = tree
+        for xmlElement, tail in tails.items():
+            xmlElement.tail = tail
+            # Indenting the temporary tree changed the last element's tail.
+        root = tree.getroot()
+        if not root.tail or not root.tail.strip():
+            root.tail = '\n'
+            # The parser drops the line break after the root element; indenting adds it.
+        xmlCharacters = tree.getroot().find('CHARACTERS')
+        for xmlCharacter in patchRoot.find('CHARACTERS'):
+            crId = xmlCharacter.find('ID').text
+            xmlOldCharacter = self._xmlElements['CHARACTER'][crId]
+            xmlCharacter.tail = xmlOldCharacter.tail
+            xmlCharacters[list(xmlCharacters).index(xmlOldCharacter)] = xmlCharacter
+            self._xmlElements['CHARACTER'][crId] = xmlCharacter
+
+    def _get_encoding(self):
+        """Return the codec name for decoding the yw7 file, sniffing the byte order mark.
+
+        yWriter writes UTF-8 files, but older versions also wrote UTF-16.
+        """
+        try:
+            with open(self.filePath, 'rb') as f:
+                head = f.read(4)
+        except:
+            raise Error(f'{_("Cannot read file")}: "{norm_path(self.filePath)}".')
+
+        if head.startswith(codecs.BOM_UTF8):
+            return 'utf-8-sig'
+
+        if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+            return 'utf-16'
+
+        if head.startswith(b'<\x00'):
+            return 'utf-16-le'
+
+        if head.startswith(b'\x00<'):
+            return 'utf-16-be'
+
+        return 'utf-8'
+
+    def _reset_lists(self):
+        """Empty the novel's element lists before (re-)reading the file."""
+        self.novel.srtLocations = []
+        self.novel.srtItems = []
+        self.novel.srtCharacters = []
+        self.novel.srtPrjNotes = []
+        self.novel.srtChapters = []
+
+    def _get_declared_encoding(self):
+        """Return the codec name given in the xml declaration.
+
+        Raise the "Error" exception, if there is none.
+        """
+        with open(self.filePath, 'rb') as f:
+            match = self._ENCODING_DECLARATION.search(f.read(200))
+        if match is None:
+            raise Error(f'{_("Unknown encoding")}: "{norm_path(self.filePath)}".')
+
+        return match.group(1).decode('ascii')
+
+    def _parse_file(self, encoding):
+        """Parse the yw7 file chunk by chunk and return the xml root element.
+
+        Positional arguments:
+            encoding -- str: codec for decoding the file.
+
+        Hand each completed top-level element over to its reader method.
+        """
+        parser = ET.XMLPullParser(events=('start', 'end'))
+        decoder = codecs.getincrementaldecoder(encoding)()
+        root = None
+        section = None
+        depth = 0
+        with open(self.filePath, 'rb') as f:
+            while True:
+                with PHASE_TIMER.phase(YW7_DECODE):
+                    chunk = f.read(self._CHUNK_SIZE)
+                    text = self._ILLEGAL_CHARACTERS.sub('', decoder.decode(chunk, final=not chunk))
+                with PHASE_TIMER.phase(XML_PARSE):
+                    parser.feed(text)
+                    for event, element in parser.read_events():
+                        if event == 'start':
+                            depth += 1
+                            if depth == 1:
+                                root = element
+                            elif depth == 2:
+                                section = element
+                            continue
+
+                        if depth == 2 or depth == 3:
+                            readElement = self._elementReaders.get(element.tag, None)
+                            if readElement is not None:
+                                with PHASE_TIMER.phase(NOVEL_POPULATION):
+                                    readElement(element)
+                                if depth == 3 and not self.keepTree:
+                                    element.clear()
+                                    section.remove(element)
+                        depth -= 1
+                if not chunk:
+                    break
+
+        with PHASE_TIMER.phase(XML_PARSE):
+            parser.close()
+        return root
+
+    def _link_elements(self):
+        """Remove references to elements that do not exist in the project.
+
+        This is done after parsing, so the result does not depend on the order of the xml sections.
+        """
+        for scId in self.novel.scenes:
+            scene = self.novel.scenes[scId]
+            if scene.characters is not None:
+                scene.characters = [crId for crId in scene.characters if crId in self.novel.characters] or None
+            if scene.locations is not None:
+                scene.locations = [lcId for lcId in scene.locations if lcId in self.novel.locations] or None
+            if scene.items is not None:
+                scene.items = [itId for itId in scene.items if itId in self.novel.items] or None
+        for chId in self.novel.srtChapters:
+            chapter = self.novel.chapters[chId]
+            chapter.srtScenes = [scId for scId in chapter.srtScenes if scId in self.novel.scenes]
+
+    def _read_fields(self, xmlFields, element, fieldNames):
+        """Read the kwVar fields of an element.
+
+        Positional arguments:
+            xmlFields -- xml element containing the fields.
+            element -- BasicElement instance to update.
+            fieldNames -- list of the field names to read.
+        """
+        for xmlField in xmlFields:
+            if xmlField.tag in fieldNames:
+                element.kwVar[xmlField.tag] = xmlField.text
+
+    def _read_tags(self, xmlTags):
+        """Return a list of stripped tags, or None."""
+        if xmlTags.text is not None:
+            return self._strip_spaces(string_to_list(xmlTags.text))
+
+        return None
+
+    def _read_project_element(self, xmlProject):
+        """Read the novel attributes from the PROJECT xml element."""
+        for xmlElement in xmlProject:
+            tag = xmlElement.tag
+            if tag == 'Title':
+                self.novel.title = xmlElement.text
+            elif tag == 'AuthorName':
+                self.novel.authorName = xmlElement.text
+            elif tag == 'Bio':
+                self.novel.authorBio = xmlElement.text
+            elif tag == 'Desc':
+                self.novel.desc = xmlElement.text
+            elif tag == 'FieldTitle1':
+                self.novel.fieldTitle1 = xmlElement.text
+            elif tag == 'FieldTitle2':
+                self.novel.fieldTitle2 = xmlElement.text
+            elif tag == 'FieldTitle3':
+                self.novel.fieldTitle3 = xmlElement.text
+            elif tag == 'FieldTitle4':
+                self.novel.fieldTitle4 = xmlElement.text
+            elif tag == 'WordCountStart':
+                try:
+                    self.novel.wordCountStart = int(xmlElement.text)
+                except:
+                    self.novel.wordCountStart = 0
+            elif tag == 'WordTarget':
+                try:
+                    self.novel.wordTarget = int(xmlElement.text)
+                except:
+                    self.novel.wordTarget = 0
+            elif tag == 'Fields':
+                self._read_fields(xmlElement, self.novel, self.PRJ_KWVAR)
+
+        if self.novel.kwVar['Field_LanguageCode']:
+            self.novel.languageCode = self.novel.kwVar['Field_LanguageCode']
+        if self.novel.kwVar['Field_CountryCode']:
+            self.novel.countryCode = self.novel.kwVar['Field_CountryCode']
+
+    def _read_world_element(self, xmlElement, element, fieldNames):
+        """Read the attributes common to locations, items, and characters.
+
+        Positional arguments:
+            xmlElement -- LOCATION, ITEM, or CHARACTER xml element.
+            element -- WorldElement instance to update.
+            fieldNames -- list of the kwVar field names to read.
+
+        Return the element ID.
+        """
+        for fieldName in fieldNames:
+            element.kwVar[fieldName] = None
+        elemId = None
+        for xmlChild in xmlElement:
+            tag = xmlChild.tag
+            if tag == 'ID':
+                elemId = xmlChild.text
+            elif tag == 'Title':
+                element.title = xmlChild.text
+            elif tag == 'ImageFile':
+                element.image = xmlChild.text
+            elif tag == 'Desc':
+                element.desc = xmlChild.text
+            elif tag == 'AKA':
+                element.aka = xmlChild.text
+            elif tag == 'Tags':
+                tags = self._read_tags(xmlChild)
+                if tags is not None:
+                    element.tags = tags
+            elif tag == 'Fields':
+                self._read_fields(xmlChild, element, fieldNames)
+        return elemId
+
+    def _read_location_element(self, xmlLocation):
+        """Read a location from a LOCATION xml element."""
+        location = WorldElementCnv()
+        lcId = self._read_world_element(xmlLocation, location, self.LOC_KWVAR)
+        self.novel.srtLocations.append(lcId)
+        self.novel.locations[lcId] = location
+
+    def _read_item_element(self, xmlItem):
+        """Read an item from an ITEM xml element."""
+        item = WorldElementCnv()
+        itId = self._read_world_element(xmlItem, item, self.ITM_KWVAR)
+        self.novel.srtItems.append(itId)
+        self.novel.items[itId] = item
+
+    def _read_character_element(self, xmlCharacter):
+        """Read a character from a CHARACTER xml element."""
+        character = CharacterCnv()
+        crId = self._read_world_element(xmlCharacter, character, self.CRT_KWVAR)
+        character.isMajor = False
+        for xmlChild in xmlCharacter:
+            tag = xmlChild.tag
+            if tag == 'Notes':
+                character.notes = xmlChild.text
+            elif tag == 'Bio':
+                character.bio = xmlChild.text
+            elif tag == 'Goals':
+                character.goals = xmlChild.text
+            elif tag == 'FullName':
+                character.fullName = xmlChild.text
+            elif tag == 'Major':
+                character.isMajor = True
+        self.novel.srtCharacters.append(crId)
+        self.novel.characters[crId] = character
+
+    def _read_projectnote_element(self, xmlProjectnote):
+        """Read a project note from a PROJECTNOTE xml element."""
+        projectNote = BasicElementCnv()
+        for fieldName in self.PNT_KWVAR:
+            projectNote.kwVar[fieldName] = None
+        pnId = None
+        for xmlChild in xmlProjectnote:
+            tag = xmlChild.tag
+            if tag == 'ID':
+                pnId = xmlChild.text
+            elif tag == 'Title':
+                projectNote.title = xmlChild.text
+            elif tag == 'Desc':
+                projectNote.desc = xmlChild.text
+            elif tag == 'Fields':
+                self._read_fields(xmlChild, projectNote, self.PNT_KWVAR)
+        if pnId is not None:
+            self.novel.srtPrjNotes.append(pnId)
+            self.novel.projectNotes[pnId] = projectNote
+
+    def _read_projectvar_element(self, xmlProjectvar):
+        """Read language and country settings from a PROJECTVAR xml element."""
+        title = None
+        desc = None
+        hasDesc = False
+        for xmlChild in xmlProjectvar:
+            if xmlChild.tag == 'Title':
+                title = xmlChild.text
+            elif xmlChild.tag == 'Desc':
+                desc = xmlChild.text
+                hasDesc = True
+        if title is None:
+            return
+
+        if title == 'Language':
+            if hasDesc:
+                self.novel.languageCode = desc
+        elif title == 'Country':
+            if hasDesc:
+                self.novel.countryCode = desc
+        elif title.startswith('lang='):
+            try:
+                __, langCode = title.split('=')
+            except ValueError:
+                return
+
+            if self.novel.languages is None:
+                self.novel.languages = []
+            self.novel.languages.append(langCode)
+
+    def _read_scene_element(self, xmlScene):
+        """Read a scene from a SCENE xml element."""
+        scene = SceneCnv()
+        for fieldName in self.SCN_KWVAR:
+            scene.kwVar[fieldName] = None
+        sceneContent = None
+        scene.scType = 0
+        scene.appendToPrev = False
+        scene.isReactionScene = False
+        scene.isSubPlot = False
+        scId = None
+        isUnused = False
+        exportCondSpecific = False
+        exportWhenRtf = False
+        dateTimeStr = None
+        day = None
+        hour = None
+        minute = None
+        for xmlChild in xmlScene:
+            tag = xmlChild.tag
+            if tag == 'ID':
+                scId = xmlChild.text
+            elif tag == 'Title':
+                scene.title = xmlChild.text
+            elif tag == 'Desc':
+                scene.desc = xmlChild.text
+            elif tag == 'SceneContent':
+                sceneContent = xmlChild.text
+            elif tag == 'Fields':
+                self._read_fields(xmlChild, scene, self.SCN_KWVAR)
+                for xmlField in xmlChild:
+                    if xmlField.tag == 'Field_SceneType':
+                        if xmlField.text == '1':
+                            scene.scType = 1
+                        elif xmlField.text == '2':
+                            scene.scType = 2
+            elif tag == 'Unused':
+                isUnused = True
+            elif tag == 'ExportCondSpecific':
+                exportCondSpecific = True
+            elif tag == 'ExportWhenRTF':
+                exportWhenRtf = True
+            elif tag == 'Status':
+                scene.status = int(xmlChild.text)
+            elif tag == 'Notes':
+                scene.notes = xmlChild.text
+            elif tag == 'Tags':
+                tags = self._read_tags(xmlChild)
+                if tags is not None:
+                    scene.tags = tags
+            elif tag == 'Field1':
+                scene.field1 = xmlChild.text
+            elif tag == 'Field2':
+                scene.field2 = xmlChild.text
+            elif tag == 'Field3':
+                scene.field3 = xmlChild.text
+            elif tag == 'Field4':
+                scene.field4 = xmlChild.text
+            elif tag == 'AppendToPrev':
+                scene.appendToPrev = True
+            elif tag == 'SpecificDateTime':
+                dateTimeStr = xmlChild.text
+            elif tag == 'Day':
+                day = xmlChild.text
+            elif tag == 'Hour':
+                hour = xmlChild.text
+            elif tag == 'Minute':
+                minute = xmlChild.text
+            elif tag == 'LastsDays':
+                scene.lastsDays = xmlChild.text
+            elif tag == 'LastsHours':
+                scene.lastsHours = xmlChild.text
+            elif tag == 'LastsMinutes':
+                scene.lastsMinutes = xmlChild.text
+            elif tag == 'ReactionScene':
+                scene.isReactionScene = True
+            elif tag == 'SubPlot':
+                scene.isSubPlot = True
+            elif tag == 'Goal':
+                scene.goal = xmlChild.text
+            elif tag == 'Conflict':
+                scene.conflict = xmlChild.text
+            elif tag == 'Outcome':
+                scene.outcome = xmlChild.text
+            elif tag == 'ImageFile':
+                scene.image = xmlChild.text
+            elif tag == 'Characters':
+                scene.characters = [xmlId.text for xmlId in xmlChild if xmlId.tag == 'CharID'] or None
+            elif tag == 'Locations':
+                scene.locations = [xmlId.text for xmlId in xmlChild if xmlId.tag == 'LocID'] or None
+            elif tag == 'Items':
+                scene.items = [xmlId.text for xmlId in xmlChild if xmlId.tag == 'ItemID'] or None
+
+        if isUnused and scene.scType == 0:
+            scene.scType = 3
+        scene.doNotExport = exportCondSpecific and not exportWhenRtf
+
+        if dateTimeStr is not None:
+            try:
+                dateTime = datetime.fromisoformat(dateTimeStr)
+            except:
+                scene.date = ''
+                scene.time = ''
+            else:
+                startDateTime = dateTime.isoformat().split('T')
+                scene.date = startDateTime[0]
+                scene.time = startDateTime[1]
+        else:
+            if day is not None:
+                try:
+                    int(day)
+                except ValueError:
+                    day = ''
+                scene.day = day
+            if hour is not None or minute is not None:
+                if hour is None:
+                    hour = '00'
+                if minute is None:
+                    minute = '00'
+                scene.time = f'{hour.zfill(2)}:{minute.zfill(2)}:00'
+
+        if self._contentStore is not None and scId in self._contentStore:
+            scene.set_content_source(self._contentStore, scId)
+        elif sceneContent is not None:
+            scene.sceneContent = sceneContent
+
+        scene.scnArcs = scene.kwVar.get('Field_SceneArcs', None)
+        try:
+            scene.scnMode = int(scene.kwVar.get('Field_SceneMode', None))
+        except:
+            scene.scnMode = None
+        self.novel.scenes[scId] = scene
+
+    def _read_chapter_element(self, xmlChapter):
+        """Read a chapter from a CHAPTER xml element."""
+        chapter = ChapterCnv()
+        for fieldName in self.CHP_KWVAR:
+            chapter.kwVar[fieldName] = None
+        chapter.chLevel = 0
+        chapter.chType = 0
+        chId = None
+        isUnused = False
+        yChapterType = None
+        yType = None
+        suppressChapterTitle = False
+        for xmlChild in xmlChapter:
+            tag = xmlChild.tag
+            if tag == 'ID':
+                chId = xmlChild.text
+            elif tag == 'Title':
+                chapter.title = xmlChild.text
+            elif tag == 'Desc':
+                chapter.desc = xmlChild.text
+            elif tag == 'SectionStart':
+                chapter.chLevel = 1
+            elif tag == 'Unused':
+                isUnused = True
+            elif tag == 'ChapterType':
+                yChapterType = xmlChild.text
+            elif tag == 'Type':
+                yType = xmlChild.text
+            elif tag == 'Fields':
+                chapter.isTrash = False
+                chapter.suppressChapterBreak = False
+                for xmlField in xmlChild:
+                    fieldTag = xmlField.tag
+                    if fieldTag == 'Field_SuppressChapterTitle':
+                        if xmlField.text == '1':
+                            suppressChapterTitle = True
+                    elif fieldTag == 'Field_IsTrash':
+                        if xmlField.text == '1':
+                            chapter.isTrash = True
+                    elif fieldTag == 'Field_SuppressChapterBreak':
+                        if xmlField.text == '1':
+                            chapter.suppressChapterBreak = True
+                self._read_fields(xmlChild, chapter, self.CHP_KWVAR)
+            elif tag == 'Scenes':
+                chapter.srtScenes = [xmlId.text for xmlId in xmlChild if xmlId.tag == 'ScID']
+
+        if yChapterType is not None:
+            if yChapterType == '2':
+                chapter.chType = 2
+            elif yChapterType == '1':
+                chapter.chType = 1
+            elif isUnused:
+                chapter.chType = 3
+        elif yType is not None:
+            if yType == '1':
+                chapter.chType = 1
+            elif isUnused:
+                chapter.chType = 3
+        if chapter.title is not None and chapter.title.startswith('@'):
+            suppressChapterTitle = True
+        chapter.suppressChapterTitle = suppressChapterTitle
+        self.novel.chapters[chId] = chapter
+        self.novel.srtChapters.append(chId)
+
+    def _postprocess_xml_file(self, filePath):
+        """Do nothing, because _write_element_tree() writes the file in its final form.
+
+        Positional arguments:
+            filePath -- str: path to the yw7 file.
+
+        Overrides the superclass method.
+        """
+        pass
+
+    def _write_element_tree(self, ywProject):
+        """Write the yWriter xml element tree to the project file.
+
+        Positional arguments:
+            ywProject -- Yw7File instance whose element tree is to be written.
+
+        Serialize the tree with CDATA sections and yWriter formatting in one pass
+        to a temporary file, then move it into place, keeping a backup of the old project file.
+        Raise the "Error" exception in case of error.
+        Overrides the superclass method.
+        """
+        filePath = ywProject.filePath
+        tempPath = f'{filePath}.tmp'
+        try:
+            with open(tempPath, 'w', encoding='utf-8') as f:
+                f.write('<?xml version="1.0" encoding="utf-8"?>\n')
+                root = ywProject.tree.getroot()
+                self._serialize_element(f.write, root)
+                if root.tail:
+                    f.write(self._fix_character_data(self._escape_text(self._normalize_newlines(root.tail))))
+        except:
+            if os.path.isfile(tempPath):
+                os.remove(tempPath)
+            raise Error(f'{_("Cannot write file")}: "{norm_path(filePath)}".')
+
+        backedUp = False
+        if os.path.isfile(filePath):
+            try:
+                os.replace(filePath, f'{filePath}.bak')
+            except:
+                os.remove(tempPath)
+                raise Error(f'{_("Cannot overwrite file")}: "{norm_path(filePath)}".')
+            else:
+                backedUp = True
+        try:
+            os.replace(tempPath, filePath)
+        except:
+            if backedUp:
+                os.replace(f'{filePath}.bak', filePath)
+            raise Error(f'{_("Cannot write file")}: "{norm_path(filePath)}".')
+
+    def _convert_from_yw(self, text, quick=False):
+        """Return text unchanged, or an empty string if text is None.
+
+        Positional arguments:
+            text -- string to convert.
+
+        Optional arguments:
+            quick -- bool: if True, apply a conversion mode for one-liners without formatting.
+
+        The xml tree holds plain text, because _serialize_element() escapes it.
+        Overrides the superclass method.
+        """
+        if text:
+            return text
+
+        return ''
+
+    def _serialize_element(self, write, xmlElement):
+        """Write an xml element with its subelements, but without its tail.
+
+        Positional arguments:
+            write -- function that writes a str to the file.
+            xmlElement -- xml element to serialize.
+
+        The text of the _CDATA_TAGS is written unescaped in CDATA sections,
+        any other text and the attribute values are escaped as by ElementTree.write().
+        Apart from that, the output has the same format as that of the superclass methods,
+        i.e. ElementTree.write() followed by _postprocess_xml_file().
+        """
+        tag = xmlElement.tag
+        attributes = ''.join([f' {key}="{self._escape_attribute(value)}"' for key, value in xmlElement.items()])
+        text = xmlElement.text
+        if not (text or len(xmlElement)):
+            if tag == 'CHAPTERS' and not attributes and not self.novel.chapters:
+                write('<CHAPTERS></CHAPTERS>')
+            else:
+                write(f'<{tag}{attributes} />')
+            return
+
+        write(f'<{tag}{attributes}>')
+        isCdata = False
+        if tag in self._cdataTags:
+            if attributes:
+                characterData = ''
+            else:
+                characterData = '<![CDATA['
+                isCdata = True
+            closingTag = f']]></{tag}>'
+        else:
+            characterData = ''
+            closingTag = f'</{tag}>'
+        if text:
+            text = self._normalize_newlines(text)
+            if not isCdata:
+                text = self._escape_text(text)
+            characterData = f'{characterData}{text}'
+        for xmlChild in xmlElement:
+            if characterData:
+                write(self._fix_character_data(characterData))
+            self._serialize_element(write, xmlChild)
+            if xmlChild.tail:
+                characterData = self._escape_text(self._normalize_newlines(xmlChild.tail))
+            else:
+                characterData = ''
+        write(self._fix_character_data(f'{characterData}{closingTag}'))
+
+    def _normalize_newlines(self, text):
+        """Return text with the line breaks converted to "\\n"."""
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return text
+
+    def _escape_text(self, text):
+        """Return text with the characters escaped that are not allowed in xml character data."""
+        if '&' in text:
+            text = text.replace('&', '&amp;')
+        if '<' in text:
+            text = text.replace('<', '&lt;')
+        if '>' in text:
+            text = text.replace('>', '&gt;')
+        return text
+
+    def _escape_attribute(self, text):
+        """Return text with the characters escaped that are not allowed in xml attribute values."""
+        text = self._escape_text(text)
+        if '"' in text:
+            text = text.replace('"', '&quot;')
+        if '\n' in text:
+            text = text.replace('\n', '&#10;')
+        return text
+
+    def _fix_character_data(self, text):
+        """Return text with the line breaks adjacent to CDATA section delimiters removed."""
+        return text.replace('[CDATA[ \n', '[CDATA[').replace('\n]]', ']]')
@@ -4,21 +4,187 @@ Copyright (c) 2023 Peter Triesberger
 For further information see https://github.com/peter88213/yw-cnv
 Published under the MIT License (https://opensource.org/licenses/mit-license.php)
 """
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
 from pywriter.pywriter_globals import *
 from pywriter.converter.yw7_converter import Yw7Converter
-from pywriter.model.novel import Novel
+from ywcnvlib.novel_cnv import NovelCnv
+from ywcnvlib.yw7_file_cnv import Yw7FileCnv
+from ywcnvlib.class_registry import EXPORT_TARGETS
+from ywcnvlib.class_registry import IMPORT_SOURCES
+from ywcnvlib.phase_timer import PHASE_TIMER
+from ywcnvlib.phase_timer import FACTORY_LOOKUP
 
 
 class YwCnvUno(Yw7Converter):
     """A converter for universal import and export.
     
     Public methods:
+        export_bundle(sourcePath, suffixes, maxWorkers, useProcesses) -- Export a yWriter project to several file formats.
         export_from_yw(sourceFile, targetFile) -- Convert from yWriter project to other file format.
+        import_to_yw(sourceFile, targetFile) -- Convert from any file format to yWriter project.
+        run(sourcePath, **kwargs) -- Create source and target objects and run conversion.
+
+    Public instance variables:
+        document -- Writer document model to import instead of the saved file, or None.
 
     Support yWriter 7 projects and most of the Novel subclasses 
     that can be read or written by OpenOffice/LibreOffice.
     - No message in case of success when converting from yWriter.
+    - Read yWriter projects with a streaming parser.
+    - Export with compiled templates.
+    - Write ODF packages without temporary files.
+    - Parse ODT documents with a streaming parser.
+    - Read ODS tables row by row.
+    - Measure the conversion phases, if PHASE_TIMER is enabled.
+      The report is passed to the user interface's show_timing() method, if any.
+    - Import the export target and import source classes on demand.
+    - Load the scene contents on demand for exports that do not write them.
+    - Import an open Writer document through the document model, if set.
     """
+    EXPORT_SOURCE_CLASSES = [Yw7FileCnv]
+    EXPORT_TARGET_CLASSES = EXPORT_TARGETS.classes
+    IMPORT_SOURCE_CLASSES = IMPORT_SOURCES.classes
+    IMPORT_TARGET_CLASSES = [Yw7FileCnv]
+
+    def __init__(self):
+        """Set up the file factories, measuring their lookups as "factory lookup" phase.
+
+        Extends the superclass constructor.
+        """
+        super().__init__()
+        self.exportSourceFactory = TimedFactory(self.exportSourceFactory)
+        self.exportTargetFactory = TimedFactory(self.exportTargetFactory)
+        self.importSourceFactory = TimedFactory(self.importSourceFactory)
+        self.importTargetFactory = TimedFactory(self.importTargetFactory)
+        # User interface method the phase timing report is passed to.
+        self._showTiming = None
+        self.document = None
+
+    def run(self, sourcePath, **kwargs):
+        """Create source and target objects and run conversion.
+
+        Positional arguments: 
+            sourcePath -- str: the source file path.
+        
+        Required keyword arguments: 
+            suffix -- str: target file name suffix.
+
+        Measure the conversion phases, if the phase timer is enabled.
+        Extends the superclass method.
+        """
+        self._start_timing(sourcePath)
+        try:
+            super().run(sourcePath, **kwargs)
+        finally:
+            self._stop_timing()
+
+    def export_bundle(self, sourcePath, suffixes=None, maxWorkers=None, useProcesses=False):
+        """Export a yWriter project to several file formats, reading it only once.
+
+        Positional arguments:
+            sourcePath -- str: path of the yWriter project file.
+
+        Optional arguments:
+            suffixes -- list of target file suffixes, e.g. '_manuscript'. If not set, write all export targets.
+            maxWorkers -- int: number of concurrent writers. If not set, write one target after another.
+            useProcesses -- bool: if True, write in worker processes instead of threads.
+
+        Return a dictionary of result messages. Key: target file suffix. 
+        Error messages begin with "!".
+        Do not show any messages, and overwrite existing files without asking.
+        The targets share the project's data, which is not modified by writing.
+        Do not use worker processes within the office application, 
+        because they would start new instances of the office executable.
+        The phase timer does not measure the phases in worker processes.
+        """
+        if suffixes is None:
+            suffixes = [fileClass.SUFFIX for fileClass in self.EXPORT_TARGET_CLASSES]
+        self._start_timing(sourcePath)
+        try:
+            return self._export_bundle(sourcePath, suffixes, maxWorkers, useProcesses)
+
+        finally:
+            self._stop_timing()
+
+    def _export_bundle(self, sourcePath, suffixes, maxWorkers, useProcesses):
+        """Export a yWriter project to several file formats, and return a dictionary of result messages.
+
+        Positional arguments:
+            sourcePath -- str: path of the yWriter project file.
+            suffixes -- list of target file suffixes.
+            maxWorkers -- int: number of concurrent writers, or None.
+            useProcesses -- bool: if True, write in worker processes instead of threads.
+        """
+        results = {}
+        targets = []
+        source = None
+        try:
+            if not os.path.isfile(sourcePath):
+                raise Error(f'{_("File not found")}: "{norm_path(sourcePath)}".')
+
+            source, __ = self.exportSourceFactory.make_file_objects(sourcePath)
+            for suffix in suffixes:
+                try:
+                    __, target = self.exportTargetFactory.make_file_objects(sourcePath, suffix=suffix)
+                except Error as ex:
+                    results[suffix] = f'!{str(ex)}'
+                else:
+                    targets.append(target)
+            source.novel = NovelCnv()
+            source.keepTree = False
+            source.lazyContent = not useProcesses and not any(
+                [getattr(target, 'READS_SCENE_CONTENT', True) for target in targets])
+            source.read()
+        except Error as ex:
+            if source is not None:
+                source.close()
+            for suffix in suffixes:
+                results[suffix] = f'!{str(ex)}'
+            return results
+
+        novel = source.novel
+        try:
+            novel.get_languages()
+            novel.check_locale()
+            if maxWorkers and useProcesses:
+                chunks = [targets[i::maxWorkers] for i in range(maxWorkers)]
+                with ProcessPoolExecutor(max_workers=maxWorkers) as executor:
+                    messages = list(executor.map(write_targets, [novel] * len(chunks), chunks))
+                targets = [target for chunk in chunks for target in chunk]
+                messages = [message for chunk in messages for message in chunk]
+            elif maxWorkers:
+                with ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+                    messages = list(executor.map(write_targets, [novel] * len(targets), [[target] for target in targets]))
+                messages = [message for chunk in messages for message in chunk]
+            else:
+                messages = write_targets(novel, targets)
+        finally:
+            source.close()
+        for target, message in zip(targets, messages):
+            results[target.SUFFIX] = message
+        return results
+
+    def _start_timing(self, title):
+        """Begin measuring the conversion phases, if the phase timer is enabled.
+
+        Positional arguments:
+            title -- str: conversion description for the report.
+
+        Have the report passed to the user interface, if it has a show_timing() method.
+        """
+        self._showTiming = getattr(self.ui, 'show_timing', None)
+        if self._showTiming is not None:
+            PHASE_TIMER.subscribe(self._showTiming)
+        PHASE_TIMER.start(title)
+
+    def _stop_timing(self):
+        """End measuring the conversion phases, and report the results."""
+        PHASE_TIMER.stop()
+        if self._showTiming is not None:
+            PHASE_TIMER.unsubscribe(self._showTiming)
+            self._showTiming = None
 
     def export_from_yw(self, source, target):
         """Convert from yWriter project to other file format.
@@ -28,11 +194,15 @@ class YwCnvUno(Yw7Converter):
             target -- Any Novel subclass instance.
 
         Show only error messages.
+        Discard the source's xml tree while reading, because it is not written back.
+        Load the scene contents on demand, if the target does not write them.
         Overrides the superclass method.
         """
         try:
             self.check(source, target)
-            source.novel = Novel()
+            source.novel = NovelCnv()
+            source.keepTree = False
+            source.lazyContent = not getattr(target, 'READS_SCENE_CONTENT', True)
             source.read()
             target.novel = source.novel
             target.write()
@@ -41,3 +211,91 @@ class YwCnvUno(Yw7Converter):
             self.ui.set_info_how(f'!{str(ex)}')
         else:
             self.newFile = target.filePath
+        finally:
+            source.close()
+
+    def import_to_yw(self, source, target):
+        """Convert from any file format to yWriter project.
+
+        Positional arguments:
+            source -- Any Novel subclass instance.
+            target -- YwFile subclass instance.
+
+        Operation results are displayed.
+        If a document is set, and the source can read it, read the document instead of the file.
+        Overrides the superclass method.
+        """
+        self.ui.set_info_what(
+            _('Input: {0} "{1}"\nOutput: {2} "{3}"').format(source.DESCRIPTION, norm_path(source.filePath), target.DESCRIPTION, norm_path(target.filePath)))
+        self.newFile = None
+        try:
+            self.check(source, target)
+            target.novel = NovelCnv()
+            target.read()
+            source.novel = target.novel
+            if self.document is not None and hasattr(source, 'document'):
+                source.document = self.document
+            source.read()
+            target.novel = source.novel
+            target.write()
+        except Exception as ex:
+            message = f'!{str(ex)}'
+        else:
+            message = f'{_("File written")}: "{norm_path(target.filePath)}".'
+            self.newFile = target.filePath
+            if source.scenesSplit:
+                self.ui.show_warning(_('New scenes created during conversion.'))
+        finally:
+            self.ui.set_info_how(message)
+
+
+class TimedFactory:
+    """File factory wrapper that measures the file object creation.
+
+    Public methods:
+        make_file_objects(sourcePath, **kwargs) -- Instantiate a source and a target object for conversion.
+    """
+
+    def __init__(self, factory):
+        """Initialize instance variables.
+
+        Positional arguments:
+            factory -- FileFactory instance to be wrapped.
+        """
+        self._factory = factory
+
+    def make_file_objects(self, sourcePath, **kwargs):
+        """Instantiate a source and a target object for conversion, measuring the "factory lookup" phase.
+
+        Positional arguments:
+            sourcePath -- str: path to the source file to convert.
+
+        Return a tuple with two elements:
+        - sourceFile: a file instance or None
+        - targetFile: a file instance or None
+        Raise the "Error" exception in case of error.
+        """
+        with PHASE_TIMER.phase(FACTORY_LOOKUP):
+            return self._factory.make_file_objects(sourcePath, **kwargs)
+
+
+def write_targets(novel, targets):
+    """Write a list of export targets and return a list of result messages.
+
+    Positional arguments:
+        novel -- Novel instance with the project data.
+        targets -- list of FileExport instances.
+
+    Error messages begin with "!".
+    This is a module-level function, so that worker processes can call it.
+    """
+    messages = []
+    for target in targets:
+        try:
+            target.novel = novel
+            target.write()
+        except Exception as ex:
+            messages.append(f'!{str(ex)}')
+        else:
+            messages.append(f'{_("File written")}: "{norm_path(target.filePath)}".')
+    return messages
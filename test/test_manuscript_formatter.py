@@ -0,0 +1,242 @@
+"""Test the manuscript formatter against a stub Writer document.
+
+Requires the pywriter package on the Python path, as for building the extension.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-cnv
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import os
+import re
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+from ywcnvlib.manuscript_formatter import ManuscriptFormatter
+
+
+class Paragraph:
+    """Paragraph of the stub document."""
+
+    def __init__(self, text, paraStyleName='Text body'):
+        self.text = text
+        self.ParaStyleName = paraStyleName
+        self.NumberingStyleName = ''
+
+
+class TextRange:
+    """Found range at the beginning of a paragraph."""
+
+    def __init__(self, paragraph, length):
+        self._paragraph = paragraph
+        self._length = length
+
+    @property
+    def ParaStyleName(self):
+        return self._paragraph.ParaStyleName
+
+    @ParaStyleName.setter
+    def ParaStyleName(self, value):
+        self._paragraph.ParaStyleName = value
+
+    @property
+    def NumberingStyleName(self):
+        return self._paragraph.NumberingStyleName
+
+    @NumberingStyleName.setter
+    def NumberingStyleName(self, value):
+        self._paragraph.NumberingStyleName = value
+
+    def getString(self):
+        return self._paragraph.text[:self._length]
+
+    def setString(self, text):
+        self._paragraph.text = f'{text}{self._paragraph.text[self._length:]}'
+        self._length = len(text)
+
+
+class Ranges:
+    """Container of found ranges."""
+
+    def __init__(self, ranges):
+        self._ranges = ranges
+
+    def getCount(self):
+        return len(self._ranges)
+
+    def getByIndex(self, i):
+        return self._ranges[i]
+
+
+class Descriptor:
+    """Search or replace descriptor."""
+
+    def __init__(self):
+        self.SearchStyles = False
+        self.SearchRegularExpression = False
+        self.searchString = None
+        self.replaceString = None
+
+    def setSearchString(self, text):
+        self.searchString = text
+
+    def setReplaceString(self, text):
+        self.replaceString = text
+
+
+class Style:
+    """Paragraph style whose display name is the programmatic name."""
+
+    def __init__(self, name):
+        self.DisplayName = name
+
+
+class StyleFamily:
+
+    def getByName(self, name):
+        return Style(name)
+
+
+class StyleFamilies:
+
+    def getByName(self, name):
+        assert name == 'ParagraphStyles'
+        return StyleFamily()
+
+
+class UndoManager:
+    """Record the undo contexts."""
+
+    def __init__(self):
+        self.log = []
+
+    def enterUndoContext(self, title):
+        self.log.append(('enter', title))
+
+    def leaveUndoContext(self):
+        self.log.append(('leave',))
+
+
+class StubDocument:
+    """Writer document model stub with the interfaces used by ManuscriptFormatter.
+
+    Searching applies the regular expression to each paragraph, as Writer does.
+    """
+
+    def __init__(self, paragraphs):
+        self.paragraphs = paragraphs
+        self.undoManager = UndoManager()
+        self.lockLog = []
+        self.error = None
+
+    def getUndoManager(self):
+        return self.undoManager
+
+    def lockControllers(self):
+        self.lockLog.append('lock')
+
+    def unlockControllers(self):
+        self.lockLog.append('unlock')
+
+    def getStyleFamilies(self):
+        return StyleFamilies()
+
+    def createReplaceDescriptor(self):
+        return Descriptor()
+
+    def createSearchDescriptor(self):
+        return Descriptor()
+
+    def replaceAll(self, descriptor):
+        assert descriptor.SearchStyles
+        for paragraph in self.paragraphs:
+            if paragraph.ParaStyleName == descriptor.searchString:
+                paragraph.ParaStyleName = descriptor.replaceString
+
+    def findAll(self, descriptor):
+        if self.error is not None:
+            raise self.error
+
+        assert descriptor.SearchRegularExpression
+        regex = re.compile(descriptor.searchString)
+        ranges = []
+        for paragraph in self.paragraphs:
+            match = regex.search(paragraph.text)
+            if match is not None:
+                ranges.append(TextRange(paragraph, match.end()))
+        return Ranges(ranges)
+
+
+def create_document():
+    """Return a stub document with a scene divider, a quotation, and a list."""
+    return StubDocument([
+        Paragraph('First scene.'),
+        Paragraph('', 'Heading 4'),
+        Paragraph('* * *', 'Heading 4'),
+        Paragraph('', 'Heading 4'),
+        Paragraph('> Quoted text.'),
+        Paragraph('- First item'),
+        Paragraph('- Second item'),
+        Paragraph('* * *'),
+        Paragraph('Text with > and - inside.'),
+        ])
+
+
+class Formatting(unittest.TestCase):
+    """Reformat the paragraphs of a stub document."""
+
+    def setUp(self):
+        self.document = create_document()
+        self.formatter = ManuscriptFormatter(self.document)
+
+    def get_paragraphs(self):
+        return [(p.text, p.ParaStyleName, p.NumberingStyleName) for p in self.document.paragraphs]
+
+    def test_blank_lines(self):
+        self.formatter.to_blank_lines()
+        paragraphs = self.get_paragraphs()
+        self.assertEqual(paragraphs[1:4], [('', 'Heading 5', '')] * 3)
+        self.assertEqual(paragraphs[4][0], '> Quoted text.')
+        self.assertEqual(paragraphs[7], ('* * *', 'Text body', ''))
+
+    def test_quotations(self):
+        self.formatter.indent_paragraphs()
+        paragraphs = self.get_paragraphs()
+        self.assertEqual(paragraphs[4], ('Quoted text.', 'Quotations', ''))
+        self.assertEqual(paragraphs[2], ('* * *', 'Heading 4', ''))
+        self.assertEqual(paragraphs[5][0], '- First item')
+
+    def test_bullets(self):
+        self.formatter.replace_bullets()
+        paragraphs = self.get_paragraphs()
+        self.assertEqual(paragraphs[5], ('First item', 'Text body', 'List 1'))
+        self.assertEqual(paragraphs[6], ('Second item', 'Text body', 'List 1'))
+        self.assertEqual(paragraphs[8], ('Text with > and - inside.', 'Text body', ''))
+
+    def test_post_process(self):
+        self.formatter.post_process()
+        paragraphs = self.get_paragraphs()
+        self.assertEqual(paragraphs[2], ('', 'Heading 5', ''))
+        self.assertEqual(paragraphs[4], ('Quoted text.', 'Quotations', ''))
+        self.assertEqual(paragraphs[5], ('First item', 'Text body', 'List 1'))
+        self.assertEqual(paragraphs[7], ('* * *', 'Text body', ''))
+
+    def test_single_undo_step(self):
+        self.formatter.post_process()
+        self.assertEqual(len(self.document.undoManager.log), 2)
+        self.assertEqual(self.document.undoManager.log[0][0], 'enter')
+        self.assertEqual(self.document.undoManager.log[1], ('leave',))
+        self.assertEqual(self.document.lockLog, ['lock', 'unlock'])
+
+    def test_error(self):
+        """The undo context is left and the controllers are unlocked on error."""
+        self.document.error = RuntimeError('Search failed')
+        with self.assertRaises(RuntimeError):
+            self.formatter.post_process()
+        self.assertEqual(len(self.document.undoManager.log), 2)
+        self.assertEqual(self.document.undoManager.log[1], ('leave',))
+        self.assertEqual(self.document.lockLog, ['lock', 'unlock'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,284 @@
+"""Compare the document model parser with the file parser.
+
+Requires the pywriter package on the Python path, as for building the extension.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-cnv
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import zipfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+from ywcnvlib.odt_parser_cnv import OdtParserCnv
+from ywcnvlib.odt_document_parser import OdtDocumentParser
+from ywcnvlib.odt_document_parser import PARAGRAPH_SERVICE
+from ywcnvlib.odt_document_parser import TABLE_SERVICE
+
+NAMESPACE_DECLARATIONS = ('xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0" '
+                          'xmlns:style="urn:oasis:names:tc:opendocument:xmlns:style:1.0" '
+                          'xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0" '
+                          'xmlns:table="urn:oasis:names:tc:opendocument:xmlns:table:1.0" '
+                          'xmlns:fo="urn:oasis:names:tc:opendocument:xmlns:xsl-fo-compatible:1.0" '
+                          'xmlns:dc="http://purl.org/dc/elements/1.1/" '
+                          'xmlns:meta="urn:oasis:names:tc:opendocument:xmlns:meta:1.0"')
+
+CONTENT_XML = f'''<?xml version="1.0" encoding="UTF-8"?>
+<office:document-content {NAMESPACE_DECLARATIONS}>
+<office:automatic-styles>
+<style:style style:name="T1" style:family="text"><style:text-properties fo:font-style="italic"/></style:style>
+</office:automatic-styles>
+<office:body>
+<office:text>
+<text:section text:name="ScID:1">
+<text:p text:style-name="Standard">Before the table.</text:p>
+<table:table table:name="Table1">
+<table:table-column table:number-columns-repeated="2"/>
+<table:table-row>
+<table:table-cell><text:p text:style-name="Standard">A1</text:p></table:table-cell>
+<table:table-cell><text:p text:style-name="Standard">B1 <text:span text:style-name="T1">italic</text:span></text:p></table:table-cell>
+</table:table-row>
+<table:table-row>
+<table:table-cell><text:p text:style-name="Standard">A2</text:p><text:p text:style-name="Standard">A2 continued</text:p></table:table-cell>
+<table:table-cell><text:p text:style-name="Standard">B2</text:p></table:table-cell>
+</table:table-row>
+</table:table>
+<text:p text:style-name="Standard">After the table.</text:p>
+</text:section>
+</office:text>
+</office:body>
+</office:document-content>
+'''
+
+STYLES_XML = f'''<?xml version="1.0" encoding="UTF-8"?>
+<office:document-styles {NAMESPACE_DECLARATIONS}>
+<office:styles>
+<style:default-style style:family="paragraph"><style:text-properties fo:language="en" fo:country="US"/></style:default-style>
+</office:styles>
+</office:document-styles>
+'''
+
+META_XML = f'''<?xml version="1.0" encoding="UTF-8"?>
+<office:document-meta {NAMESPACE_DECLARATIONS}>
+<office:meta><dc:title>Test document</dc:title></office:meta>
+</office:document-meta>
+'''
+
+
+class Recorder:
+    """Parser client that records the calls."""
+
+    def __init__(self):
+        self.events = []
+
+    def handle_starttag(self, tag, attrs):
+        self.events.append(('start', tag, attrs))
+
+    def handle_endtag(self, tag):
+        self.events.append(('end', tag))
+
+    def handle_data(self, data):
+        self.events.append(('data', data))
+
+    def handle_comment(self, data):
+        self.events.append(('comment', data))
+
+
+class Enumeration:
+
+    def __init__(self, elements):
+        self._elements = iter(elements)
+        self._next = next(self._elements, None)
+
+    def hasMoreElements(self):
+        return self._next is not None
+
+    def nextElement(self):
+        element = self._next
+        self._next = next(self._elements, None)
+        return element
+
+
+class Locale:
+
+    def __init__(self, language, country):
+        self.Language = language
+        self.Country = country
+
+
+class Posture:
+
+    def __init__(self, value):
+        self.value = value
+
+
+class TextProperties:
+    """Character properties of a style or text portion."""
+
+    def __init__(self, italic=False):
+        self.CharLocale = Locale('en', 'US')
+        self.CharPosture = Posture('ITALIC' if italic else 'NONE')
+        self.CharWeight = 100.0
+
+    def getPropertyDefault(self, name):
+        return getattr(self, name)
+
+
+class Portion(TextProperties):
+
+    def __init__(self, text, italic=False):
+        super().__init__(italic)
+        self.TextPortionType = 'Text'
+        self._text = text
+
+    def getString(self):
+        return self._text
+
+
+class Section:
+
+    def __init__(self, name):
+        self._name = name
+
+    def getName(self):
+        return self._name
+
+    def getParentSection(self):
+        return None
+
+
+class TextElement:
+
+    def __init__(self, service):
+        self._service = service
+
+    def supportsService(self, service):
+        return service == self._service
+
+
+class Paragraph(TextElement):
+
+    def __init__(self, portions, section):
+        super().__init__(PARAGRAPH_SERVICE)
+        self.ParaStyleName = 'Standard'
+        self.OutlineLevel = 0
+        self.NumberingIsNumber = False
+        self.TextSection = section
+        self._portions = portions
+
+    def createEnumeration(self):
+        return Enumeration(self._portions)
+
+
+class Text:
+    """Text of the document or of a table cell."""
+
+    def __init__(self, elements):
+        self._elements = elements
+
+    def createEnumeration(self):
+        return Enumeration(self._elements)
+
+
+class Table(TextElement):
+    """Text table with cells named by column letter and row number."""
+
+    def __init__(self, rows):
+        super().__init__(TABLE_SERVICE)
+        self._cells = {}
+        for row, cells in enumerate(rows, 1):
+            for column, cell in zip('ABCDEFGH', cells):
+                self._cells[f'{column}{row}'] = Text(cell)
+
+    def getCellNames(self):
+        return list(self._cells)
+
+    def getCellByName(self, name):
+        return self._cells[name]
+
+
+class Properties:
+
+    def __init__(self):
+        self.Title = 'Test document'
+        self.Author = ''
+        self.Description = ''
+
+
+class StyleFamily:
+
+    def getByName(self, name):
+        return TextProperties()
+
+
+class StyleFamilies:
+
+    def getByName(self, name):
+        return StyleFamily()
+
+
+class StubDocument:
+    """Writer document model stub with the same content as CONTENT_XML."""
+
+    def __init__(self):
+        section = Section('ScID:1')
+        self._text = Text([
+            Paragraph([Portion('Before the table.')], section),
+            Table([
+                [
+                    [Paragraph([Portion('A1')], section)],
+                    [Paragraph([Portion('B1 '), Portion('italic', True)], section)],
+                ],
+                [
+                    [Paragraph([Portion('A2')], section), Paragraph([Portion('A2 continued')], section)],
+                    [Paragraph([Portion('B2')], section)],
+                ],
+                ]),
+            Paragraph([Portion('After the table.')], section),
+            ])
+
+    def getStyleFamilies(self):
+        return StyleFamilies()
+
+    def getDocumentProperties(self):
+        return Properties()
+
+    def getText(self):
+        return self._text
+
+
+class DocumentParser(unittest.TestCase):
+    """Parse the same content from a file and from a document model."""
+
+    def setUp(self):
+        self.testDir = tempfile.mkdtemp()
+        self.filePath = os.path.join(self.testDir, 'test.odt')
+        with zipfile.ZipFile(self.filePath, 'w') as odtFile:
+            odtFile.writestr('content.xml', CONTENT_XML)
+            odtFile.writestr('styles.xml', STYLES_XML)
+            odtFile.writestr('meta.xml', META_XML)
+
+    def tearDown(self):
+        shutil.rmtree(self.testDir)
+
+    def test_same_events(self):
+        fileRecorder = Recorder()
+        OdtParserCnv(fileRecorder).feed_file(self.filePath)
+        documentRecorder = Recorder()
+        OdtDocumentParser(documentRecorder).feed_document(StubDocument())
+        self.assertEqual(documentRecorder.events, fileRecorder.events)
+
+    def test_table_text(self):
+        recorder = Recorder()
+        OdtDocumentParser(recorder).feed_document(StubDocument())
+        data = [event[1] for event in recorder.events if event[0] == 'data']
+        self.assertEqual(data, ['Test document', 'Before the table.', 'A1', 'B1 ', 'italic', 'A2', 'A2 continued',
+                                'B2', 'After the table.'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+"""Regression test for the yw7 delta writer.
+
+Requires the pywriter package on the Python path, as for building the extension.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-cnv
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+from ywcnvlib.yw7_file_cnv import Yw7FileCnv
+from ywcnvlib.novel_cnv import NovelCnv
+from ywcnvlib.element_cnv import ChapterCnv
+from ywcnvlib.element_cnv import CharacterCnv
+from ywcnvlib.scene_cnv import SceneCnv
+
+
+LINK = 'http://example.com/?a=1&b=2'
+BIO = 'Likes <b> & </b>.'
+PROJECT_FIELDS = ('    <Fields>\n'
+                  '      <Field_ChapterHeadingPrefix>Chapter &amp; &lt;</Field_ChapterHeadingPrefix>\n'
+                  '    </Fields>\n'
+                  '  </PROJECT>')
+# Project fields written by yWriter, but not by the superclass.
+
+
+def create_novel():
+    """Return a novel with a normal chapter, and a notes chapter containing a normal scene.
+
+    The character's link and bio contain characters to be escaped in xml.
+    """
+    novel = NovelCnv()
+    novel.title = 'Test project'
+    novel.authorName = 'Author'
+    character = CharacterCnv()
+    character.title = 'Character'
+    character.bio = BIO
+    character.goals = 'Goals'
+    character.kwVar['Field_Link'] = LINK
+    novel.characters['1'] = character
+    novel.srtCharacters.append('1')
+    for chId, chType, scIds in (('1', 0, ('1', '2')), ('2', 1, ('3',))):
+        chapter = ChapterCnv()
+        chapter.title = f'Chapter {chId}'
+        chapter.chLevel = 0
+        chapter.chType = chType
+        chapter.srtScenes = list(scIds)
+        novel.chapters[chId] = chapter
+        novel.srtChapters.append(chId)
+        for scId in scIds:
+            scene = SceneCnv()
+            scene.title = f'Scene {scId}'
+            scene.desc = f'Description of scene {scId}.'
+            scene.sceneContent = f'Content of scene {scId}.\nSecond paragraph.'
+            scene.scType = 0
+            scene.status = 1
+            novel.scenes[scId] = scene
+    return novel
+
+
+class DeltaWrite(unittest.TestCase):
+    """Write back a changed project with and without rebuilding the whole xml tree."""
+
+    def setUp(self):
+        self.testDir = tempfile.mkdtemp()
+        self.deltaPath = os.path.join(self.testDir, 'delta.yw7')
+        self.fullPath = os.path.join(self.testDir, 'full.yw7')
+        ywFile = Yw7FileCnv(self.deltaPath)
+        ywFile.novel = create_novel()
+        ywFile.write()
+        with open(self.deltaPath, encoding='utf-8') as f:
+            text = f.read()
+        with open(self.deltaPath, 'w', encoding='utf-8') as f:
+            f.write(text.replace('  </PROJECT>', PROJECT_FIELDS))
+        shutil.copyfile(self.deltaPath, self.fullPath)
+
+    def tearDown(self):
+        shutil.rmtree(self.testDir)
+
+    def read_project(self, filePath):
+        ywFile = Yw7FileCnv(filePath)
+        ywFile.novel = NovelCnv()
+        ywFile.read()
+        return ywFile
+
+    def write_both(self, change):
+        """Apply change to both projects, write one of them with full rebuild, and compare the files."""
+        deltaFile = self.read_project(self.deltaPath)
+        change(deltaFile.novel)
+        deltaFile.write()
+        fullFile = self.read_project(self.fullPath)
+        change(fullFile.novel)
+        fullFile._readStates = None
+        # Force a full rebuild.
+        fullFile.write()
+        with open(self.deltaPath, 'rb') as f:
+            deltaBytes = f.read()
+        with open(self.fullPath, 'rb') as f:
+            fullBytes = f.read()
+        ET.fromstring(deltaBytes)
+        self.assertEqual(deltaBytes, fullBytes)
+
+    def test_changed_scene(self):
+        def change(novel):
+            novel.scenes['1'].title = 'Changed title'
+            novel.scenes['2'].sceneContent = 'Changed content.'
+        self.write_both(change)
+
+    def test_changed_chapter(self):
+        """The notes chapter's scene type, adjusted when reading, is written in both cases."""
+        def change(novel):
+            novel.chapters['1'].desc = 'Changed description.'
+        self.write_both(change)
+
+    def test_changed_character(self):
+        def change(novel):
+            novel.characters['1'].goals = 'Changed goals & <more>.'
+        self.write_both(change)
+
+    def test_escaped_text(self):
+        """Text read from unchanged elements is escaped again."""
+        def change(novel):
+            novel.scenes['1'].title = 'Changed title'
+        self.write_both(change)
+        ywFile = self.read_project(self.deltaPath)
+        self.assertEqual(ywFile.novel.characters['1'].kwVar['Field_Link'], LINK)
+        self.assertEqual(ywFile.novel.characters['1'].bio, BIO)
+        prefix = ywFile.tree.getroot().find('PROJECT/Fields/Field_ChapterHeadingPrefix').text
+        self.assertEqual(prefix, 'Chapter & <')
+
+    def test_trailing_newline(self):
+        ywFile = self.read_project(self.deltaPath)
+        ywFile.novel.scenes['1'].title = 'Changed title'
+        ywFile.write()
+        with open(self.deltaPath, 'rb') as f:
+            self.assertTrue(f.read().endswith(b'</YWRITER7>\n'))
+
+
+if __name__ == '__main__':
+    unittest.main()
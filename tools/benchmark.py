@@ -0,0 +1,422 @@
+"""Run the yw-cnv benchmark suite without the office application.
+
+Usage: benchmark.py [options]
+
+Generate a synthetic yWriter 7 project, then time the module import,
+the project file reading and writing, every export and import, and full round trips.
+Write the results to a JSON file, and optionally compare them with a previous run.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-cnv
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import os
+import sys
+import argparse
+import json
+import platform
+import re
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+sys.path.insert(0, f'{os.getcwd()}/../../PyWriter/src')
+sys.path.insert(0, f'{os.getcwd()}/../src')
+from uno_stub import install_uno_stub
+install_uno_stub()
+from pywriter.pywriter_globals import *
+from ywcnvlib.novel_cnv import NovelCnv
+from ywcnvlib.yw7_file_cnv import Yw7FileCnv
+from ywcnvlib.yw_cnv_uno import YwCnvUno
+from make_yw7 import make_project
+from make_yw7 import add_arguments
+
+RESULT_FORMAT = 1
+# Increment when the layout of the result file changes.
+
+IMPORT_PATHS = [f'{os.getcwd()}/../src', f'{os.getcwd()}/../../PyWriter/src', os.path.dirname(os.path.abspath(__file__))]
+# Module search path of the import time measurement processes.
+
+IMPORT_TIME_CODE = """import sys
+import time
+sys.path[:0] = {paths!r}
+from uno_stub import install_uno_stub
+install_uno_stub()
+startTime = time.perf_counter()
+{statements}
+print(time.perf_counter() - startTime)
+"""
+# Script that measures the import time in a new process.
+
+DISPATCHER_IMPORTS = """from pywriter.pywriter_globals import *
+from ywcnvlib.uno_tools import *
+from ywcnvlib.yw_cnv_uno import YwCnvUno
+from ywcnvlib.yw7_file_cnv import Yw7FileCnv
+from ywcnvlib.ui_uno import UiUno
+from ywcnvlib.manuscript_formatter import ManuscriptFormatter
+from ywcnvlib.phase_timer import PHASE_TIMER
+from ywcnvlib.service_client import ServiceClient"""
+# Imports of the macro script.
+
+IMPORT_BENCHMARKS = (
+    ('import macro script', DISPATCHER_IMPORTS),
+    ('import macro script and manuscript export',
+     f'{DISPATCHER_IMPORTS}\nYwCnvUno.EXPORT_TARGET_CLASSES[2].resolve()'),
+    ('import macro script and all file classes',
+     f'{DISPATCHER_IMPORTS}\nfor fileClass in YwCnvUno.EXPORT_TARGET_CLASSES + YwCnvUno.IMPORT_SOURCE_CLASSES:'
+     '\n    fileClass.resolve()'),
+    )
+# Name and import statements of the import time benchmarks.
+
+
+class Benchmark:
+    """Time and memory measurement of the converter operations for one project.
+
+    Public methods:
+        run() -- Run all benchmarks and return a list of results.
+
+    Public instance variables:
+        repeat -- int: number of timed runs per benchmark.
+        results -- list of dictionaries with the benchmark name, run times, and peak memory.
+
+    Each benchmark consists of an untimed setup and a timed operation.
+    The peak memory is measured in an additional run with tracemalloc,
+    so that the tracing does not distort the run times.
+    The import times are measured in new processes, without peak memory.
+    """
+
+    def __init__(self, projectPath, workDir, repeat=3):
+        """Initialize instance variables.
+
+        Positional arguments:
+            projectPath -- str: path of the generated project, which is not modified.
+            workDir -- str: directory for the working copies and exported documents.
+
+        Optional arguments:
+            repeat -- int: number of timed runs per benchmark.
+        """
+        self.repeat = repeat
+        self.results = []
+        self._projectPath = projectPath
+        self._workDir = workDir
+        self._converter = YwCnvUno()
+
+    def run(self):
+        """Run all benchmarks and return a list of results."""
+        for name, statements in IMPORT_BENCHMARKS:
+            self._measure_import(name, statements)
+        self._measure('Yw7FileCnv.read', self._prepare_copy, self._read_project)
+        self._measure('Yw7FileCnv.read (cached)', self._prepare_cached_read, self._read_cached)
+        self._measure('Yw7FileCnv.read (lazy content)', self._prepare_lazy_read, self._read_lazy)
+        self._measure('Yw7FileCnv.write', self._prepare_write, self._write_project)
+        self._measure('Yw7FileCnv.write (one scene changed)', self._prepare_scene_write, self._write_project)
+        for fileClass in self._converter.EXPORT_TARGET_CLASSES:
+            self._measure(f'export {fileClass.__name__}', lambda: self._prepare_export(fileClass), self._write_target)
+        for fileClass in self._converter.IMPORT_SOURCE_CLASSES:
+            documentPath = self._export_document(fileClass.SUFFIX, fileClass.EXTENSION)
+            if documentPath is None:
+                continue
+
+            self._measure(f'import {fileClass.__name__}', lambda: self._prepare_import(fileClass, documentPath),
+                          self._import_source)
+        for fileClass in self._converter.IMPORT_SOURCE_CLASSES:
+            self._measure(f'round trip {fileClass.__name__}', lambda: self._prepare_round_trip(fileClass),
+                          self._round_trip)
+        return self.results
+
+    def _measure(self, name, setup, operation):
+        """Time an operation and measure its peak memory.
+
+        Positional arguments:
+            name -- str: benchmark name.
+            setup -- function that prepares a run. Its result is passed to operation.
+            operation -- function to be measured.
+        """
+        times = []
+        for __ in range(self.repeat):
+            arg = setup()
+            startTime = time.perf_counter()
+            operation(arg)
+            times.append(time.perf_counter() - startTime)
+        arg = setup()
+        tracemalloc.start()
+        try:
+            operation(arg)
+            __, peakMemory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        result = dict(
+            name=name,
+            times=times,
+            best=min(times),
+            median=statistics.median(times),
+            peakMemory=peakMemory,
+            )
+        self.results.append(result)
+        print(f'{name:50} {result["best"]:8.3f} s {peakMemory / 0x100000:8.1f} MiB')
+
+    def _measure_import(self, name, statements):
+        """Time module imports, each run in a new process.
+
+        Positional arguments:
+            name -- str: benchmark name.
+            statements -- str: import statements to be measured.
+        """
+        code = IMPORT_TIME_CODE.format(paths=IMPORT_PATHS, statements=statements)
+        times = []
+        for __ in range(self.repeat):
+            process = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+            if process.returncode:
+                raise Error(f'{name} failed: {process.stderr.strip()}')
+
+            times.append(float(process.stdout.split()[-1]))
+        result = dict(
+            name=name,
+            times=times,
+            best=min(times),
+            median=statistics.median(times),
+            peakMemory=None,
+            )
+        self.results.append(result)
+        print(f'{name:50} {result["best"]:8.3f} s')
+
+    def _get_copy_path(self):
+        """Return the path of the project's working copy."""
+        return f'{self._workDir}/{os.path.basename(self._projectPath)}'
+
+    def _prepare_copy(self):
+        """Return a Yw7FileCnv instance for a fresh working copy of the project."""
+        copyPath = self._get_copy_path()
+        shutil.copyfile(self._projectPath, copyPath)
+        if os.path.isfile(f'{copyPath}.bak'):
+            os.remove(f'{copyPath}.bak')
+        source = Yw7FileCnv(copyPath)
+        source.novel = NovelCnv()
+        return source
+
+    def _read_project(self, source):
+        """Read the project, keeping the xml tree."""
+        source.read()
+
+    def _prepare_cached_read(self):
+        """Return a Yw7FileCnv instance for a project that is in the novel cache."""
+        source = self._prepare_copy()
+        source.keepTree = False
+        source.read()
+        source = Yw7FileCnv(source.filePath)
+        source.novel = NovelCnv()
+        source.keepTree = False
+        return source
+
+    def _prepare_lazy_read(self):
+        """Return a Yw7FileCnv instance that reads the scene contents on demand."""
+        source = self._prepare_copy()
+        source.keepTree = False
+        source.lazyContent = True
+        return source
+
+    def _read_lazy(self, source):
+        """Read the project, and release the project file."""
+        source.read()
+        source.close()
+
+    def _read_cached(self, source):
+        """Read the project via the novel cache."""
+        source.read()
+
+    def _prepare_write(self):
+        """Return a read project with a changed project description, which requires a full rebuild."""
+        source = self._prepare_copy()
+        source.read()
+        source.novel.desc = f'{source.novel.desc}\nChanged.'
+        return source
+
+    def _prepare_scene_write(self):
+        """Return a read project with one changed scene."""
+        source = self._prepare_copy()
+        source.read()
+        scene = source.novel.scenes[next(iter(source.novel.scenes))]
+        scene.sceneContent = f'{scene.sceneContent}\nChanged.'
+        return source
+
+    def _write_project(self, source):
+        """Write the project back."""
+        source.write()
+
+    def _read_for_export(self):
+        """Return the project's data, prepared for export like in YwCnvUno.export_bundle()."""
+        source = self._prepare_copy()
+        source.keepTree = False
+        source.read()
+        source.novel.get_languages()
+        source.novel.check_locale()
+        return source.novel
+
+    def _prepare_export(self, fileClass):
+        """Return an export target instance with the project's data."""
+        novel = self._read_for_export()
+        __, target = self._converter.exportTargetFactory.make_file_objects(self._get_copy_path(),
+                                                                            suffix=fileClass.SUFFIX)
+        if os.path.isfile(target.filePath):
+            os.remove(target.filePath)
+        target.novel = novel
+        return target
+
+    def _write_target(self, target):
+        """Write the export target."""
+        target.write()
+
+    def _export_document(self, suffix, extension):
+        """Export the document to be imported, and return its path, or None if there is no such export."""
+        for fileClass in self._converter.EXPORT_TARGET_CLASSES:
+            if fileClass.SUFFIX == suffix and fileClass.EXTENSION == extension:
+                target = self._prepare_export(fileClass)
+                target.write()
+                documentPath = f'{self._workDir}/document{suffix}{extension}'
+                os.replace(target.filePath, documentPath)
+                return documentPath
+
+        print(f'No export for {suffix}{extension}.')
+        return None
+
+    def _prepare_import(self, fileClass, documentPath):
+        """Return the import source and target for a fresh working copy of the project."""
+        source = fileClass(f'{self._get_copy_path()[:-4]}{fileClass.SUFFIX}{fileClass.EXTENSION}')
+        shutil.copyfile(documentPath, source.filePath)
+        target = self._prepare_copy()
+        return source, target
+
+    def _import_source(self, files):
+        """Import the document into the project."""
+        source, target = files
+        self._converter.import_to_yw(source, target)
+        if self._converter.newFile is None:
+            raise Error(self._converter.ui.infoHowText)
+
+    def _prepare_round_trip(self, fileClass):
+        """Make a fresh working copy of the project, and return the import source class."""
+        self._prepare_copy()
+        return fileClass
+
+    def _round_trip(self, fileClass):
+        """Export the project to the import source format, and import it again."""
+        copyPath = self._get_copy_path()
+        for exportClass in self._converter.EXPORT_TARGET_CLASSES:
+            if exportClass.SUFFIX == fileClass.SUFFIX and exportClass.EXTENSION == fileClass.EXTENSION:
+                break
+
+        else:
+            raise Error(f'No export for {fileClass.SUFFIX}{fileClass.EXTENSION}.')
+
+        source, __ = self._converter.exportSourceFactory.make_file_objects(copyPath)
+        target = exportClass(f'{copyPath[:-4]}{exportClass.SUFFIX}{exportClass.EXTENSION}')
+        if os.path.isfile(target.filePath):
+            os.remove(target.filePath)
+        self._converter.export_from_yw(source, target)
+        if self._converter.newFile is None:
+            raise Error(self._converter.ui.infoHowText)
+
+        self._import_source((fileClass(target.filePath), Yw7FileCnv(copyPath)))
+
+
+def get_version():
+    """Return the version number given in the build script."""
+    try:
+        with open(f'{os.path.dirname(os.path.abspath(__file__))}/build.xml', encoding='utf-8') as f:
+            return re.search('<property name="version" value="(.+?)"', f.read()).group(1)
+
+    except:
+        return 'unknown'
+
+
+def compare(results, baselinePath, threshold):
+    """Print the results relative to a previous run. Return the number of regressions.
+
+    Positional arguments:
+        results -- list of result dictionaries.
+        baselinePath -- str: path of a previous result file.
+        threshold -- float: ratio of the best times above which a benchmark is regarded as slower.
+    """
+    with open(baselinePath, encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get('format') != RESULT_FORMAT:
+        raise Error(f'Incompatible result file: "{norm_path(baselinePath)}".')
+
+    if baseline['parameters'] != results['parameters']:
+        print('Warning: The baseline was measured with a different project.')
+    baselineTimes = {result['name']: result['best'] for result in baseline['results']}
+    regressions = 0
+    print(f'\nCompared with version {baseline["version"]} ({baseline["date"]}):')
+    for result in results['results']:
+        try:
+            ratio = result['best'] / baselineTimes[result['name']]
+        except (KeyError, ZeroDivisionError):
+            continue
+
+        if ratio > threshold:
+            regressions += 1
+            remark = 'SLOWER'
+        else:
+            remark = ''
+        print(f'{result["name"]:50} {ratio:8.2f} {remark}')
+    return regressions
+
+
+def main(args):
+    """Run the benchmarks as specified on the command line. Return the exit code."""
+    parameters = dict(
+        chapters=args.chapters,
+        scenes=args.scenes,
+        wordsPerScene=args.words,
+        languages=args.languages,
+        characters=args.characters,
+        locations=args.locations,
+        items=args.items,
+        markupDensity=args.markup,
+        seed=args.seed,
+        )
+    workDir = tempfile.mkdtemp(prefix='yw-cnv-benchmark_')
+    cacheDir = Yw7FileCnv.novelCache.cacheDir
+    try:
+        Yw7FileCnv.novelCache.cacheDir = f'{workDir}/cache'
+        projectPath = make_project(f'{workDir}/project/benchmark.yw7', **parameters)
+        os.makedirs(f'{workDir}/run')
+        benchmark = Benchmark(projectPath, f'{workDir}/run', repeat=args.repeat)
+        results = dict(
+            format=RESULT_FORMAT,
+            version=get_version(),
+            date=datetime.now().isoformat(timespec='seconds'),
+            python=platform.python_version(),
+            platform=platform.platform(),
+            parameters=parameters,
+            projectSize=os.path.getsize(projectPath),
+            results=benchmark.run(),
+            )
+    finally:
+        Yw7FileCnv.novelCache.cacheDir = cacheDir
+        Yw7FileCnv.novelCache.clear()
+        shutil.rmtree(workDir, ignore_errors=True)
+    outputDir = os.path.dirname(args.output)
+    if outputDir:
+        os.makedirs(outputDir, exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f'Results written to "{norm_path(args.output)}".')
+    if args.baseline and compare(results, args.baseline, args.threshold):
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run the yw-cnv benchmark suite.')
+    add_arguments(parser)
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per benchmark')
+    parser.add_argument('--output', default='benchmark.json', help='result file')
+    parser.add_argument('--baseline', help='result file of a previous run to compare with')
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help='time ratio above which a benchmark counts as slower than the baseline')
+    sys.exit(main(parser.parse_args()))
@@ -1,37 +1,117 @@
 """Build a Python script for the LibreOffice "convert yWriter" script.
-        
+
+The macro script is a small dispatcher module.
+The ywcnvlib and pywriter packages are copied into the "pythonpath" directory
+beside it, so the file classes are loaded only when a conversion needs them.
+Both packages become subpackages of a private package,
+so they do not clash with other extensions' copies of the pywriter package.
+The batch converter and conversion service scripts are inlined, because they run without the office application.
+
 Copyright (c) 2023 Peter Triesberger
 For further information see https://github.com/peter88213/PyWriter
 Published under the MIT License (https://opensource.org/licenses/mit-license.php)
 """
 import os
+import re
+import shutil
 import sys
 sys.path.insert(0, f'{os.getcwd()}/../../PyWriter/src')
 import inliner
 
 SRC = '../src/'
 BUILD = '../test/'
+PYWRITER_SRC = '../../PyWriter/src/'
 SOURCE_FILE = f'{SRC}cnvyw_.py'
 TARGET_FILE = f'{BUILD}cnvyw.py'
+BATCH_SOURCE_FILE = f'{SRC}cnvyw_batch_.py'
+BATCH_TARGET_FILE = f'{BUILD}cnvyw_batch.py'
+SERVICE_SOURCE_FILE = f'{SRC}cnvyw_service_.py'
+SERVICE_TARGET_FILE = f'{BUILD}cnvyw_service.py'
+PYTHONPATH = f'{BUILD}pythonpath/'
+PRIVATE_PACKAGE = 'cnvyw_lib'
+PACKAGES = ('ywcnvlib', 'pywriter')
+
+IMPORT_STATEMENT = re.compile(rf'^(\s*)(from|import) ({"|".join(PACKAGES)})\b', re.MULTILINE)
+GLOBALS_MODULE = f'{PYTHONPATH}{PRIVATE_PACKAGE}/pywriter/pywriter_globals.py'
 
 SCRIPT_CODE = """LOCALE_PATH = f'{os.path.dirname(sys.argv[0])}/locale/'"""
-UNO_CODE = """oPackageInfoProvider = CTX.getByName("/singletons/com.sun.star.deployment.PackageInformationProvider")
+UNO_CODE = """import uno
+CTX = uno.getComponentContext()
+oPackageInfoProvider = CTX.getByName("/singletons/com.sun.star.deployment.PackageInformationProvider")
 sPackageLocation = oPackageInfoProvider.getPackageLocation("org.peter88213.yw-cnv")
 packagePath = uno.fileUrlToSystemPath(sPackageLocation)
 LOCALE_PATH = f'{packagePath}/yw-cnv/locale/'"""
 
+TRANSLATION_CODE = re.compile(r"^try:\n    t = gettext\.translation\(.*?\n(?=\S)(?!except)", re.MULTILINE | re.DOTALL)
+LAZY_TRANSLATION_CODE = """_translation = None
+
+
+def _(message):
+    global _translation
+    if _translation is None:
+        try:
+            _translation = gettext.translation('pywriter', LOCALE_PATH, languages=[CURRENT_LANGUAGE]).gettext
+        except:
+            _translation = str
+    return _translation(message)
+
+
+"""
+# The message catalog is loaded when the first message is translated.
+
+
+def make_private(text):
+    """Return the source code with the package imports redirected to the private package."""
+    return IMPORT_STATEMENT.sub(rf'\1\2 {PRIVATE_PACKAGE}.\3', text)
+
+
+def copy_package(sourceDir, targetDir):
+    """Copy a package's modules, redirecting their package imports to the private package."""
+    for dirPath, dirNames, fileNames in os.walk(sourceDir):
+        dirNames[:] = [dirName for dirName in dirNames if dirName != '__pycache__']
+        targetPath = os.path.join(targetDir, os.path.relpath(dirPath, sourceDir))
+        os.makedirs(targetPath, exist_ok=True)
+        for fileName in fileNames:
+            if not fileName.endswith('.py'):
+                continue
+
+            with open(os.path.join(dirPath, fileName), 'r', encoding='utf-8') as f:
+                text = f.read()
+            with open(os.path.join(targetPath, fileName), 'w', encoding='utf-8') as f:
+                f.write(make_private(text))
+
 
 def main():
     os.makedirs(BUILD, exist_ok=True)
-    inliner.run(SOURCE_FILE, TARGET_FILE, 'ywcnvlib', '../src/', copyPyWriter=False)
-    inliner.run(TARGET_FILE, TARGET_FILE, 'pywriter', '../../PyWriter/src/', copyPyWriter=False)
+
+    # The packages are loaded module by module from the pythonpath directory:
+    shutil.rmtree(PYTHONPATH, ignore_errors=True)
+    os.makedirs(f'{PYTHONPATH}{PRIVATE_PACKAGE}')
+    with open(f'{PYTHONPATH}{PRIVATE_PACKAGE}/__init__.py', 'w', encoding='utf-8') as f:
+        f.write('"""Private copy of the ywcnvlib and pywriter packages for the yw-cnv extension."""\n')
+    copy_package(f'{SRC}ywcnvlib', f'{PYTHONPATH}{PRIVATE_PACKAGE}/ywcnvlib')
+    copy_package(f'{PYWRITER_SRC}pywriter', f'{PYTHONPATH}{PRIVATE_PACKAGE}/pywriter')
 
     # This is a hack to get the script's location within the UNO context:
-    with open(TARGET_FILE, 'r') as f:
+    with open(GLOBALS_MODULE, 'r', encoding='utf-8') as f:
         text = f.read()
         text = text.replace(SCRIPT_CODE, UNO_CODE)
-    with open(TARGET_FILE, 'w') as f:
+        text = TRANSLATION_CODE.sub(LAZY_TRANSLATION_CODE, text)
+    with open(GLOBALS_MODULE, 'w', encoding='utf-8') as f:
         f.write(text)
+
+    with open(SOURCE_FILE, 'r', encoding='utf-8') as f:
+        text = f.read()
+    with open(TARGET_FILE, 'w', encoding='utf-8') as f:
+        f.write(make_private(text))
+
+    # The batch converter runs without the office application:
+    inliner.run(BATCH_SOURCE_FILE, BATCH_TARGET_FILE, 'ywcnvlib', '../src/', copyPyWriter=False)
+    inliner.run(BATCH_TARGET_FILE, BATCH_TARGET_FILE, 'pywriter', '../../PyWriter/src/', copyPyWriter=False)
+
+    # So does the conversion service:
+    inliner.run(SERVICE_SOURCE_FILE, SERVICE_TARGET_FILE, 'ywcnvlib', '../src/', copyPyWriter=False)
+    inliner.run(SERVICE_TARGET_FILE, SERVICE_TARGET_FILE, 'pywriter', '../../PyWriter/src/', copyPyWriter=False)
     print('Done.')
 
 
@@ -8,6 +8,7 @@ import sys
 sys.path.insert(0, f'{os.getcwd()}/../../PyWriter/src')
 from build_cnvyw import main
 from build_cnvyw import TARGET_FILE
+from build_cnvyw import PYTHONPATH
 import pgettext
 
 APP = 'yw-cnv'
@@ -18,7 +19,7 @@ def make_pot(version='unknown'):
     # Generate a complete script.
     main()
 
-    # Generate a pot file from the script.
+    # Generate a pot file from the script and the modules it loads.
     if os.path.isfile(POT_FILE):
         os.replace(POT_FILE, f'{POT_FILE}.bak')
         backedUp = True
@@ -27,6 +28,10 @@ def make_pot(version='unknown'):
     try:
         pot = pgettext.PotFile(POT_FILE, app=APP, appVersion=version)
         pot.scan_file(TARGET_FILE)
+        for dirPath, __, fileNames in sorted(os.walk(PYTHONPATH)):
+            for fileName in sorted(fileNames):
+                if fileName.endswith('.py'):
+                    pot.scan_file(os.path.join(dirPath, fileName))
         print(f'Writing "{pot.filePath}"...\n')
         pot.write_pot()
         return True
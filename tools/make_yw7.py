@@ -0,0 +1,202 @@
+"""Generate a synthetic yWriter 7 project for benchmarking.
+
+Usage: make_yw7.py [options] filePath
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-cnv
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import os
+import sys
+import argparse
+import random
+sys.path.insert(0, f'{os.getcwd()}/../../PyWriter/src')
+sys.path.insert(0, f'{os.getcwd()}/../src')
+from ywcnvlib.element_cnv import ChapterCnv
+from ywcnvlib.element_cnv import CharacterCnv
+from ywcnvlib.element_cnv import WorldElementCnv
+from ywcnvlib.novel_cnv import NovelCnv
+from ywcnvlib.scene_cnv import SceneCnv
+from ywcnvlib.yw7_file_cnv import Yw7FileCnv
+
+VOCABULARY = ('the', 'a', 'and', 'of', 'to', 'in', 'was', 'he', 'she', 'it', 'that', 'his', 'her',
+              'with', 'on', 'for', 'as', 'at', 'by', 'from', 'night', 'house', 'river', 'letter', 'door',
+              'light', 'voice', 'window', 'morning', 'road', 'silence', 'stranger', 'garden', 'winter',
+              'looked', 'said', 'turned', 'waited', 'remembered', 'opened', 'walked', 'whispered',
+              'old', 'dark', 'quiet', 'cold', 'strange', 'little', 'long', 'slowly', 'again', 'never')
+# Words to build the scene texts from.
+
+DEFAULTS = dict(
+    chapters=20,
+    scenes=100,
+    wordsPerScene=1000,
+    languages=0,
+    characters=20,
+    locations=10,
+    items=10,
+    markupDensity=0.1,
+    seed=1,
+    )
+# Parameters of the generated project.
+
+LANGUAGE_CODES = ('de-DE', 'fr-FR', 'es-ES', 'it-IT', 'nl-NL', 'sv-SE', 'pl-PL', 'pt-PT')
+# Codes for the foreign language passages.
+
+
+def make_project(filePath, chapters=DEFAULTS['chapters'], scenes=DEFAULTS['scenes'],
+                 wordsPerScene=DEFAULTS['wordsPerScene'], languages=DEFAULTS['languages'],
+                 characters=DEFAULTS['characters'], locations=DEFAULTS['locations'], items=DEFAULTS['items'],
+                 markupDensity=DEFAULTS['markupDensity'], seed=DEFAULTS['seed']):
+    """Write a synthetic yWriter 7 project and return its file path.
+
+    Positional arguments:
+        filePath -- str: path of the project file to be created.
+
+    Optional arguments:
+        chapters -- int: number of chapters. Every tenth chapter is a part.
+        scenes -- int: number of scenes, distributed evenly over the chapters.
+        wordsPerScene -- int: number of words per scene.
+        languages -- int: number of foreign languages used in the scene texts.
+        characters -- int: number of characters.
+        locations -- int: number of locations.
+        items -- int: number of items.
+        markupDensity -- float: share of paragraphs with emphasis, comments, or foreign language passages.
+        seed -- int: random seed. The same parameters generate the same project.
+
+    Every twentieth scene is a notes scene, and every twenty-fifth scene is a "to do" scene.
+    Raise the "Error" exception in case of error.
+    """
+    rnd = random.Random(seed)
+    languageCodes = LANGUAGE_CODES[:languages]
+    novel = NovelCnv()
+    novel.title = 'Synthetic project'
+    novel.desc = make_text(rnd, 50, 0, ())
+    novel.authorName = 'yw-cnv benchmark'
+    novel.languageCode = 'en'
+    novel.countryCode = 'US'
+    for collection, srtIds, elementClass, count, prefix in (
+            (novel.characters, novel.srtCharacters, CharacterCnv, characters, 'Character'),
+            (novel.locations, novel.srtLocations, WorldElementCnv, locations, 'Location'),
+            (novel.items, novel.srtItems, WorldElementCnv, items, 'Item'),
+            ):
+        for i in range(1, count + 1):
+            elemId = str(i)
+            element = elementClass()
+            element.title = f'{prefix} {i}'
+            element.desc = make_text(rnd, 30, 0, ())
+            element.tags = [f'tag{i % 5}']
+            if elementClass is CharacterCnv:
+                element.fullName = f'{prefix} {i} Fullname'
+                element.isMajor = i <= max(1, count // 4)
+                element.notes = make_text(rnd, 20, 0, ())
+            collection[elemId] = element
+            srtIds.append(elemId)
+    scId = 0
+    for i in range(1, chapters + 1):
+        chId = str(i)
+        chapter = ChapterCnv()
+        chapter.title = f'Chapter {i}'
+        chapter.desc = make_text(rnd, 30, 0, ())
+        chapter.chType = 0
+        chapter.chLevel = 1 if i % 10 == 1 else 0
+        chapter.srtScenes = []
+        novel.chapters[chId] = chapter
+        novel.srtChapters.append(chId)
+        for __ in range(scenes * i // chapters - scenes * (i - 1) // chapters):
+            scId += 1
+            scene = SceneCnv()
+            scene.title = f'Scene {scId}'
+            scene.desc = make_text(rnd, 40, 0, ())
+            scene.sceneContent = make_text(rnd, wordsPerScene, markupDensity, languageCodes)
+            if scId % 20 == 0:
+                scene.scType = 1
+            elif scId % 25 == 0:
+                scene.scType = 2
+            else:
+                scene.scType = 0
+            scene.status = rnd.randint(1, 5)
+            scene.characters = rnd.sample(list(novel.srtCharacters), min(3, characters))
+            scene.locations = rnd.sample(list(novel.srtLocations), min(1, locations))
+            scene.items = rnd.sample(list(novel.srtItems), min(1, items))
+            scene.tags = [f'tag{scId % 7}']
+            scene.isReactionScene = scId % 2 == 0
+            scene.goal = make_text(rnd, 10, 0, ())
+            scene.day = str(scId // 5 + 1)
+            scene.time = f'{scId % 24:02}:00:00'
+            scene.lastsHours = '1'
+            novel.scenes[str(scId)] = scene
+            chapter.srtScenes.append(str(scId))
+    if os.path.isfile(filePath):
+        os.remove(filePath)
+    projectDir = os.path.dirname(filePath)
+    if projectDir:
+        os.makedirs(projectDir, exist_ok=True)
+    project = Yw7FileCnv(filePath)
+    project.novel = novel
+    project.write()
+    return filePath
+
+
+def make_text(rnd, words, markupDensity, languageCodes):
+    """Return a random text with yWriter markup.
+
+    Positional arguments:
+        rnd -- random.Random instance.
+        words -- int: number of words.
+        markupDensity -- float: share of paragraphs with markup.
+        languageCodes -- list of language codes for foreign language passages.
+    """
+    paragraphs = []
+    while words > 0:
+        length = min(words, rnd.randint(20, 120))
+        words -= length
+        sentence = rnd.choices(VOCABULARY, k=length)
+        sentence[0] = sentence[0].capitalize()
+        if rnd.random() < markupDensity:
+            start = rnd.randrange(length)
+            end = min(length, start + rnd.randint(1, 8)) - 1
+            markup = rnd.randrange(4 if languageCodes else 3)
+            if markup == 0:
+                sentence[start] = f'[i]{sentence[start]}'
+                sentence[end] = f'{sentence[end]}[/i]'
+            elif markup == 1:
+                sentence[start] = f'[b]{sentence[start]}'
+                sentence[end] = f'{sentence[end]}[/b]'
+            elif markup == 2:
+                sentence[end] = f'{sentence[end]} /* {" ".join(rnd.choices(VOCABULARY, k=5))} */'
+            else:
+                language = rnd.choice(languageCodes)
+                sentence[start] = f'[lang={language}]{sentence[start]}'
+                sentence[end] = f'{sentence[end]}[/lang={language}]'
+        paragraphs.append(f'{" ".join(sentence)}.')
+    return '\n'.join(paragraphs)
+
+
+def main(args):
+    """Generate a project as specified on the command line."""
+    print(make_project(args.filePath, chapters=args.chapters, scenes=args.scenes,
+                       wordsPerScene=args.words, languages=args.languages,
+                       characters=args.characters, locations=args.locations, items=args.items,
+                       markupDensity=args.markup, seed=args.seed))
+
+
+def add_arguments(parser):
+    """Add the project parameters to an argparse.ArgumentParser instance."""
+    parser.add_argument('--chapters', type=int, default=DEFAULTS['chapters'], help='number of chapters')
+    parser.add_argument('--scenes', type=int, default=DEFAULTS['scenes'], help='number of scenes')
+    parser.add_argument('--words', type=int, default=DEFAULTS['wordsPerScene'], help='words per scene')
+    parser.add_argument('--languages', type=int, default=DEFAULTS['languages'],
+                        help=f'number of foreign languages (max. {len(LANGUAGE_CODES)})')
+    parser.add_argument('--characters', type=int, default=DEFAULTS['characters'], help='number of characters')
+    parser.add_argument('--locations', type=int, default=DEFAULTS['locations'], help='number of locations')
+    parser.add_argument('--items', type=int, default=DEFAULTS['items'], help='number of items')
+    parser.add_argument('--markup', type=float, default=DEFAULTS['markupDensity'],
+                        help='share of paragraphs with markup (0..1)')
+    parser.add_argument('--seed', type=int, default=DEFAULTS['seed'], help='random seed')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate a synthetic yWriter 7 project.')
+    parser.add_argument('filePath', help='path of the project file to be created')
+    add_arguments(parser)
+    main(parser.parse_args())
@@ -0,0 +1,55 @@
+"""Make the office API importable for running the ywcnvlib modules without the office application.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw-cnv
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import re
+import sys
+import types
+
+UNO_CONSTANTS = {
+    'com.sun.star.awt.MessageBoxType': ('MESSAGEBOX', 'INFOBOX', 'WARNINGBOX', 'ERRORBOX', 'QUERYBOX'),
+    'com.sun.star.awt.MessageBoxButtons': ('BUTTONS_OK', 'BUTTONS_OK_CANCEL', 'BUTTONS_YES_NO',
+                                           'BUTTONS_YES_NO_CANCEL', 'BUTTONS_RETRY_CANCEL',
+                                           'BUTTONS_ABORT_IGNORE_RETRY'),
+    'com.sun.star.awt.MessageBoxResults': ('CANCEL', 'OK', 'YES', 'NO', 'RETRY', 'IGNORE'),
+    }
+# Office API constants imported by the ywcnvlib modules.
+
+
+class UnoStub:
+    """Placeholder for any office API object.
+
+    Each attribute and each call result is the placeholder itself.
+    """
+
+    def __getattr__(self, name):
+        return self
+
+    def __call__(self, *args, **kwargs):
+        return self
+
+
+def install_uno_stub():
+    """Make the uno and com.sun.star modules importable, if the office application is not available."""
+    try:
+        import uno
+        return
+
+    except ImportError:
+        pass
+
+    uno = types.ModuleType('uno')
+    uno.getComponentContext = UnoStub()
+    uno.fileUrlToSystemPath = lambda url: re.sub('^file://', '', url)
+    uno.systemPathToFileUrl = lambda path: f'file://{path}'
+    sys.modules['uno'] = uno
+    for moduleName in ('com', 'com.sun', 'com.sun.star', 'com.sun.star.awt', 'com.sun.star.beans'):
+        sys.modules[moduleName] = types.ModuleType(moduleName)
+    sys.modules['com.sun.star.beans'].PropertyValue = UnoStub
+    for moduleName, constants in UNO_CONSTANTS.items():
+        module = types.ModuleType(moduleName)
+        for value, constant in enumerate(constants):
+            setattr(module, constant, value)
+        sys.modules[moduleName] = module